@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Pure-Python .aseprite reader and sprite sheet exporter
+Decodes layers, cels, frames, tags and palettes straight from the file format
+(https://github.com/aseprite/aseprite/blob/main/docs/ase-file-specs.md), composites
+each frame, and exports a packed sheet plus Aseprite-compatible JSON (frame durations
+and frameTags) without needing the Aseprite binary. Files are exported in parallel.
+"""
+
+import json
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+SHEETS_DIR = Path("assets") / "sheets"
+MAX_SHEET = 8192     # one sheet per file, so frameTags stay valid; larger exports are refused
+
+HEADER_MAGIC = 0xA5E0
+FRAME_MAGIC = 0xF1FA
+
+CHUNK_OLD_PALETTE = 0x0004
+CHUNK_OLD_PALETTE_64 = 0x0011
+CHUNK_LAYER = 0x2004
+CHUNK_CEL = 0x2005
+CHUNK_TAGS = 0x2018
+CHUNK_PALETTE = 0x2019
+
+CEL_RAW = 0
+CEL_LINKED = 1
+CEL_COMPRESSED = 2
+CEL_TILEMAP = 3
+
+LAYER_VISIBLE = 1
+LAYER_BACKGROUND = 8
+LAYER_GROUP = 1
+
+TAG_DIRECTIONS = {0: "forward", 1: "reverse", 2: "pingpong", 3: "pingpong_reverse"}
+
+# Compressed cel data is fed to zlib in pieces of this size
+STREAM_CHUNK = 64 * 1024
+
+
+class AsepriteError(ValueError):
+    """Raised for files that are not valid .aseprite/.ase documents"""
+
+
+class _Reader:
+    """Little-endian field reader over a bytes object"""
+
+    def __init__(self, data: bytes, pos: int = 0):
+        self.data = data
+        self.pos = pos
+
+    def unpack(self, fmt: str):
+        values = struct.unpack_from("<" + fmt, self.data, self.pos)
+        self.pos += struct.calcsize("<" + fmt)
+        return values if len(values) > 1 else values[0]
+
+    def skip(self, n: int):
+        self.pos += n
+
+    def string(self) -> str:
+        length = self.unpack("H")
+        value = self.data[self.pos:self.pos + length].decode("utf-8", "replace")
+        self.pos += length
+        return value
+
+
+class AsepriteFile:
+    """Parsed document: header fields, layers, tags, palette and per-frame cels"""
+
+    def __init__(self, path, fileobj=None):
+        self.path = Path(path)
+        self.layers = []
+        self.tags = []
+        self.palette = np.zeros((256, 4), dtype=np.uint8)
+        self.frames = []   # [{"duration": ms, "cels": {layer_index: cel}}]
+        if fileobj is not None:
+            # e.g. AssetFS.open() for a file inside a mounted zip
+            self._read(fileobj)
+        else:
+            with open(self.path, "rb") as f:
+                self._read(f)
+
+    def _read(self, f):
+        header = f.read(128)
+        if len(header) < 128:
+            raise AsepriteError(f"{self.path}: truncated header")
+        r = _Reader(header)
+        _, magic, frame_count, self.width, self.height, self.depth, self.flags = r.unpack("IHHHHHI")
+        if magic != HEADER_MAGIC:
+            raise AsepriteError(f"{self.path}: bad magic {magic:#x}")
+        r.skip(2 + 4 + 4)
+        self.transparent_index = r.unpack("B")
+        if self.depth not in (8, 16, 32):
+            raise AsepriteError(f"{self.path}: unsupported color depth {self.depth}")
+
+        for _ in range(frame_count):
+            frame_bytes, magic, old_chunks, duration, _, new_chunks = struct.unpack("<IHHH2sI", f.read(16))
+            if magic != FRAME_MAGIC:
+                raise AsepriteError(f"{self.path}: bad frame magic {magic:#x}")
+            frame = {"duration": duration, "cels": {}}
+            self.frames.append(frame)
+            chunk_count = new_chunks or old_chunks
+            for _ in range(chunk_count):
+                size, kind = struct.unpack("<IH", f.read(6))
+                self._read_chunk(f, kind, size - 6, frame)
+
+    def _read_chunk(self, f, kind: int, length: int, frame: dict):
+        if kind == CHUNK_CEL:
+            self._read_cel(f, length, frame)
+            return
+
+        r = _Reader(f.read(length))
+        if kind == CHUNK_LAYER:
+            flags, layer_type, child_level, _, _, blend_mode, opacity = r.unpack("HHHHHHB")
+            r.skip(3)
+            self.layers.append({
+                "name": r.string(),
+                "visible": bool(flags & LAYER_VISIBLE),
+                "background": bool(flags & LAYER_BACKGROUND),
+                "group": layer_type == LAYER_GROUP,
+                "tilemap": layer_type == 2,
+                "level": child_level,
+                "blend_mode": blend_mode,
+                "opacity": opacity if self.flags & 1 else 255,
+            })
+        elif kind == CHUNK_TAGS:
+            count = r.unpack("H")
+            r.skip(8)
+            for _ in range(count):
+                start, end, direction, repeat = r.unpack("HHBH")
+                r.skip(6 + 4)
+                self.tags.append({"name": r.string(), "from": start, "to": end,
+                                  "direction": TAG_DIRECTIONS.get(direction, "forward"), "repeat": repeat})
+        elif kind == CHUNK_PALETTE:
+            _, first, last = r.unpack("III")
+            r.skip(8)
+            if last >= len(self.palette):
+                self.palette = np.resize(self.palette, (last + 1, 4))
+            for index in range(first, last + 1):
+                entry_flags = r.unpack("H")
+                self.palette[index] = r.unpack("BBBB")
+                if entry_flags & 1:
+                    r.string()
+        elif kind in (CHUNK_OLD_PALETTE, CHUNK_OLD_PALETTE_64) and not self.palette.any():
+            scale = 4 if kind == CHUNK_OLD_PALETTE_64 else 1
+            index = 0
+            for _ in range(r.unpack("H")):
+                skip, count = r.unpack("BB")
+                index += skip
+                for _ in range(count or 256):
+                    self.palette[index] = [min(255, c * scale) for c in r.unpack("BBB")] + [255]
+                    index += 1
+        # Anything else (user data, slices, color profile, tilesets) does not affect pixels
+
+    def _read_cel(self, f, length: int, frame: dict):
+        layer_index, x, y, opacity, cel_type, z_index = struct.unpack("<HhhBHh", f.read(11))
+        f.read(5)
+        remaining = length - 16
+        cel = {"x": x, "y": y, "opacity": opacity, "z_index": z_index}
+
+        if cel_type == CEL_LINKED:
+            cel["link"] = struct.unpack("<H", f.read(2))[0]
+            f.read(remaining - 2)
+        elif cel_type in (CEL_RAW, CEL_COMPRESSED):
+            w, h = struct.unpack("<HH", f.read(4))
+            remaining -= 4
+            channels = self.depth // 8
+            expected = w * h * channels
+            if cel_type == CEL_RAW:
+                raw = f.read(remaining)[:expected]
+            else:
+                raw = _inflate(f, remaining, expected)
+            cel["pixels"] = np.frombuffer(raw, dtype=np.uint8).reshape(h, w, channels)
+        else:
+            # Tilemap cels need the tileset chunk; rare in our packs, skipped
+            f.read(remaining)
+            return
+        frame["cels"][layer_index] = cel
+
+    def cel(self, frame_index: int, layer_index: int):
+        """Resolve linked cels to the cel holding the pixels"""
+        cel = self.frames[frame_index]["cels"].get(layer_index)
+        seen = set()
+        while cel is not None and "link" in cel and cel["link"] not in seen:
+            seen.add(cel["link"])
+            cel = self.frames[cel["link"]]["cels"].get(layer_index)
+        return cel
+
+    def to_rgba(self, pixels: np.ndarray, layer_index: int) -> np.ndarray:
+        """Convert a cel's native pixels to RGBA"""
+        if self.depth == 32:
+            return pixels
+        if self.depth == 16:
+            grey, alpha = pixels[..., 0], pixels[..., 1]
+            return np.stack([grey, grey, grey, alpha], axis=-1)
+        indices = pixels[..., 0]
+        rgba = self.palette[indices].copy()
+        # The transparent index is only transparent outside the background layer
+        if not self.layers[layer_index].get("background"):
+            rgba[indices == self.transparent_index, 3] = 0
+        return rgba
+
+    def visible_layers(self) -> list:
+        """Indices of image layers that are visible, including all of their parent groups"""
+        visible, parents = [], []
+        for index, layer in enumerate(self.layers):
+            parents = parents[:layer["level"]]
+            shown = layer["visible"] and all(self.layers[p]["visible"] for p in parents)
+            if layer["group"]:
+                parents.append(index)
+            elif shown and not layer["tilemap"]:
+                visible.append(index)
+        return visible
+
+    def render_frame(self, frame_index: int) -> np.ndarray:
+        """Composite a frame into a (height, width, 4) uint8 RGBA array (normal blend mode)"""
+        canvas = np.zeros((self.height, self.width, 4), dtype=np.float32)
+        order = self.visible_layers()
+        cels = [(layer, self.cel(frame_index, layer)) for layer in order]
+        cels = [(layer, cel) for layer, cel in cels if cel is not None and "pixels" in cel]
+        # Aseprite orders cels by layer index + z-index, ties broken by z-index
+        cels.sort(key=lambda item: (item[0] + item[1]["z_index"], item[1]["z_index"]))
+
+        for layer_index, cel in cels:
+            src = self.to_rgba(cel["pixels"], layer_index).astype(np.float32) / 255
+            h, w = src.shape[:2]
+            x0, y0 = max(cel["x"], 0), max(cel["y"], 0)
+            x1, y1 = min(cel["x"] + w, self.width), min(cel["y"] + h, self.height)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            src = src[y0 - cel["y"]:y1 - cel["y"], x0 - cel["x"]:x1 - cel["x"]]
+            alpha = src[..., 3:] * (cel["opacity"] / 255) * (self.layers[layer_index]["opacity"] / 255)
+
+            dst = canvas[y0:y1, x0:x1]
+            out_alpha = alpha + dst[..., 3:] * (1 - alpha)
+            safe = np.where(out_alpha > 0, out_alpha, 1)
+            dst[..., :3] = (src[..., :3] * alpha + dst[..., :3] * dst[..., 3:] * (1 - alpha)) / safe
+            dst[..., 3:] = out_alpha
+
+        return np.round(canvas * 255).astype(np.uint8)
+
+
+def _inflate(f, length: int, expected: int) -> bytes:
+    """Stream a zlib cel body from the file into a buffer of the expected size"""
+    inflater = zlib.decompressobj()
+    out = bytearray()
+    while length > 0:
+        piece = f.read(min(STREAM_CHUNK, length))
+        if not piece:
+            break
+        length -= len(piece)
+        out += inflater.decompress(piece, expected - len(out))
+        if len(out) >= expected:
+            break
+    if length > 0:
+        f.read(length)
+    out += inflater.flush()
+    if len(out) < expected:
+        raise AsepriteError(f"cel data too short: {len(out)} of {expected} bytes")
+    return bytes(out[:expected])
+
+
+def export_sheet(path, out_dir=SHEETS_DIR, root=None, trim: bool = True, padding: int = 1) -> dict:
+    """Export one .aseprite file as <name>.png + <name>.json (Aseprite hash format)
+
+    Raises AsepriteError if the frames don't fit on one MAX_SHEET sheet.
+    """
+    from PIL import Image
+
+    from atlas_packer import pack_rects
+
+    doc = AsepriteFile(path)
+    rel = Path(path).relative_to(root) if root else Path(Path(path).name)
+    out_png = Path(out_dir) / rel.with_suffix(".png")
+    out_png.parent.mkdir(parents=True, exist_ok=True)
+
+    frames, boxes = {}, {}
+    for index in range(len(doc.frames)):
+        name = f"{Path(path).stem} {index}.aseprite"
+        rgba = doc.render_frame(index)
+        box = (0, 0, doc.width, doc.height)
+        if trim:
+            ys, xs = np.nonzero(rgba[..., 3])
+            box = (xs.min(), ys.min(), xs.max() + 1, ys.max() + 1) if len(xs) else (0, 0, 1, 1)
+        frames[name] = rgba[box[1]:box[3], box[0]:box[2]]
+        boxes[name] = box
+
+    pages, oversized = pack_rects({n: (a.shape[1], a.shape[0]) for n, a in frames.items()},
+                                  max_size=MAX_SHEET, padding=padding)
+    if oversized or len(pages) > 1:
+        left_out = set(oversized).union(*(placed for _, _, placed in pages[1:]))
+        raise AsepriteError(f"{len(left_out)} of {len(frames)} frames don't fit on one {MAX_SHEET}px sheet: "
+                            + ", ".join(name for name in frames if name in left_out))
+    page_w, page_h, placed = pages[0] if pages else (1, 1, {})
+    sheet = np.zeros((page_h, page_w, 4), dtype=np.uint8)
+
+    json_frames = {}
+    for index, (name, rgba) in enumerate(frames.items()):
+        x, y = placed[name]
+        h, w = rgba.shape[:2]
+        sheet[y:y + h, x:x + w] = rgba
+        bx, by = int(boxes[name][0]), int(boxes[name][1])
+        json_frames[name] = {
+            "frame": {"x": x, "y": y, "w": w, "h": h},
+            "rotated": False,
+            "trimmed": (w, h) != (doc.width, doc.height),
+            "spriteSourceSize": {"x": bx, "y": by, "w": w, "h": h},
+            "sourceSize": {"w": doc.width, "h": doc.height},
+            "duration": doc.frames[index]["duration"],
+        }
+
+    Image.fromarray(sheet, "RGBA").save(out_png, "PNG")
+    meta = {
+        "frames": json_frames,
+        "meta": {
+            "app": "aseprite_reader.py",
+            "image": out_png.name,
+            "format": "RGBA8888",
+            "size": {"w": page_w, "h": page_h},
+            "scale": "1",
+            "frameTags": doc.tags,
+            "layers": [{"name": l["name"], "opacity": l["opacity"]} for l in doc.layers if not l["group"]],
+        },
+    }
+    with open(out_png.with_suffix(".json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1, ensure_ascii=False)
+    return {"source": Path(path).as_posix(), "sheet": out_png.as_posix(), "frames": len(frames),
+            "tags": len(doc.tags)}
+
+
+def _export_job(args):
+    path, out_dir, root, trim = args
+    try:
+        return export_sheet(path, out_dir, root, trim)
+    except Exception as e:
+        return {"source": Path(path).as_posix(), "error": str(e)}
+
+
+def export_all(root="assets", out_dir=SHEETS_DIR, trim: bool = True, jobs: int = None) -> list:
+    """Export every .aseprite/.ase file under root on a process pool"""
+    print("\n--- Exporting Aseprite Sheets ---\n")
+    start = time.perf_counter()
+
+    paths = sorted(p for p in Path(root).rglob("*") if p.suffix.lower() in (".aseprite", ".ase"))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(_export_job, [(p, out_dir, root, trim) for p in paths]))
+
+    for result in results:
+        if "error" in result:
+            print(f"  ✗ {result['source']}: {result['error']}")
+    done = [r for r in results if "error" not in r]
+    print(f"  Exported {len(done)}/{len(paths)} files, {sum(r['frames'] for r in done)} frames "
+          f"in {time.perf_counter() - start:.1f}s")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export .aseprite files to sprite sheets")
+    parser.add_argument("root", nargs="?", default="assets")
+    parser.add_argument("--out", default=str(SHEETS_DIR))
+    parser.add_argument("--no-trim", action="store_true", help="keep full canvas size per frame")
+    parser.add_argument("--jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    export_all(args.root, args.out, not args.no_trim, args.jobs)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Virtual asset filesystem over loose files and zip archives
+Each asset pack zip is mounted at the path its extracted copy used to live at, so
+existing references like "assets/Tiny Swords/..." resolve whether or not the pack is
+extracted. Archive indexes come from the central directory only (built once per
+mount); members are inflated only when requested and decoded images are cached.
+Loose files on disk always win over archive members, so local edits take effect.
+"""
+
+import fnmatch
+import io
+import threading
+import zipfile
+from collections import OrderedDict
+from pathlib import Path, PurePosixPath
+
+# Where each vendored pack's extracted copy lives; other zips mount at <dir>/<zip stem>/
+DEFAULT_MOUNTS = {
+    "assets/Tiny Swords.zip": "assets/Tiny Swords",
+    "assets/Tiny Swords (Free Pack) (1).zip": "assets/Tiny Swords Free Pack",
+    "assets/New enemy/Tiny Swords (Enemy Pack).zip": "assets/New enemy/Tiny Swords Enemy Pack",
+}
+
+IGNORED_MEMBERS = ("__MACOSX/", ".DS_Store")
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def _norm(path) -> str:
+    return PurePosixPath(str(path).replace("\\", "/")).as_posix()
+
+
+def _match_parts(parts: tuple, patterns: tuple) -> bool:
+    """Segment-wise glob match: fnmatch within one segment, only '**' spans directories"""
+    if not patterns:
+        return not parts
+    if patterns[0] == "**":
+        return any(_match_parts(parts[i:], patterns[1:]) for i in range(len(parts) + 1))
+    return (bool(parts) and fnmatch.fnmatchcase(parts[0], patterns[0])
+            and _match_parts(parts[1:], patterns[1:]))
+
+
+class _Archive:
+    """An open zip with a lock, since one ZipFile handle is not safe for concurrent reads"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.zip = zipfile.ZipFile(path)
+        self.lock = threading.Lock()
+
+    def read(self, member: str) -> bytes:
+        with self.lock:
+            return self.zip.read(member)
+
+
+class AssetFS:
+    """Read-only view of the assets tree with zip archives mounted in place"""
+
+    def __init__(self, root=".", mounts: dict = None, auto_mount: bool = True,
+                 cache_bytes: int = DEFAULT_CACHE_BYTES):
+        self.root = Path(root)
+        self.archives = []
+        self.members = {}  # virtual path -> (archive, member name, uncompressed size)
+        self.cache_bytes = cache_bytes
+        self.cache = OrderedDict()
+        self.cache_used = 0
+        self.cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        mounts = dict(DEFAULT_MOUNTS, **(mounts or {}))
+        if auto_mount:
+            for zip_path in sorted((self.root / "assets").rglob("*.zip")):
+                rel = _norm(zip_path.relative_to(self.root))
+                default = _norm(PurePosixPath(rel).parent / PurePosixPath(rel).stem)
+                self.mount(zip_path, mounts.get(rel, default))
+        else:
+            for rel, prefix in mounts.items():
+                if (self.root / rel).exists():
+                    self.mount(self.root / rel, prefix)
+
+    def mount(self, zip_path, prefix: str):
+        """Index a zip's members under a virtual directory prefix"""
+        try:
+            archive = _Archive(Path(zip_path))
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"Warning: could not mount {zip_path}: {e}")
+            return 0
+        self.archives.append(archive)
+        count = 0
+        for info in archive.zip.infolist():
+            name = info.filename
+            if info.is_dir() or any(part in name for part in IGNORED_MEMBERS):
+                continue
+            virtual = _norm(PurePosixPath(prefix) / name)
+            # First mount wins for overlapping packs
+            self.members.setdefault(virtual, (archive, name, info.file_size))
+            count += 1
+        return count
+
+    def _disk(self, path: str) -> Path:
+        return self.root / path
+
+    def exists(self, path) -> bool:
+        path = _norm(path)
+        return self._disk(path).is_file() or path in self.members
+
+    def source(self, path) -> str:
+        """Where a virtual path is served from: 'disk', 'zip:<archive>' or None"""
+        path = _norm(path)
+        if self._disk(path).is_file():
+            return "disk"
+        if path in self.members:
+            return f"zip:{self.members[path][0].path.as_posix()}"
+        return None
+
+    def size(self, path) -> int:
+        path = _norm(path)
+        disk = self._disk(path)
+        if disk.is_file():
+            return disk.stat().st_size
+        return self.members[path][2]
+
+    def read_bytes(self, path) -> bytes:
+        path = _norm(path)
+        disk = self._disk(path)
+        if disk.is_file():
+            return disk.read_bytes()
+        if path not in self.members:
+            raise FileNotFoundError(path)
+        archive, member, _ = self.members[path]
+        return archive.read(member)
+
+    def open(self, path):
+        """Binary file object for a virtual path"""
+        path = _norm(path)
+        disk = self._disk(path)
+        if disk.is_file():
+            return open(disk, "rb")
+        return io.BytesIO(self.read_bytes(path))
+
+    def image(self, path):
+        """Decoded PIL image for a virtual path, cached with a byte budget (LRU)"""
+        from PIL import Image
+
+        path = _norm(path)
+        with self.cache_lock:
+            if path in self.cache:
+                self.cache.move_to_end(path)
+                self.hits += 1
+                return self.cache[path]
+            self.misses += 1
+
+        with self.open(path) as f:
+            img = Image.open(f)
+            img.load()
+
+        cost = len(img.getbands()) * img.width * img.height
+        with self.cache_lock:
+            self.cache[path] = img
+            self.cache_used += cost
+            while self.cache_used > self.cache_bytes and len(self.cache) > 1:
+                _, old = self.cache.popitem(last=False)
+                self.cache_used -= len(old.getbands()) * old.width * old.height
+        return img
+
+    def files(self) -> list:
+        """Every virtual file path: loose files under assets/ plus mounted members"""
+        loose = {_norm(p.relative_to(self.root)) for p in (self.root / "assets").rglob("*") if p.is_file()}
+        return sorted(loose | set(self.members))
+
+    def glob(self, pattern: str) -> list:
+        """Glob over virtual paths with pathlib semantics, e.g. 'assets/Tiny Swords/**/*.png'
+
+        '*', '?' and [...] stay within one path segment; '**' matches any number of them.
+        """
+        patterns = tuple(_norm(pattern).split("/"))
+        return [p for p in self.files() if _match_parts(tuple(p.split("/")), patterns)]
+
+    def check_glob(self, patterns=("assets/*.png", "assets/*/*.png", "assets/**/*.png")) -> list:
+        """Patterns whose loose-file matches differ from pathlib's glob on disk (empty when correct)"""
+        mismatched = []
+        for pattern in patterns:
+            ours = {p for p in self.glob(pattern) if self._disk(p).is_file()}
+            disk = {_norm(p.relative_to(self.root)) for p in self.root.glob(pattern) if p.is_file()}
+            if ours != disk:
+                mismatched.append(pattern)
+        return mismatched
+
+    def extracted_copies(self) -> list:
+        """Loose files that are byte-identical to a mounted member (safe to delete)"""
+        import zlib
+
+        copies = []
+        for path, (archive, member, size) in self.members.items():
+            disk = self._disk(path)
+            if disk.is_file() and disk.stat().st_size == size:
+                if zlib.crc32(disk.read_bytes()) == archive.zip.getinfo(member).CRC:
+                    copies.append(path)
+        return sorted(copies)
+
+    def close(self):
+        for archive in self.archives:
+            archive.zip.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Inspect the virtual asset filesystem")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("mounts", help="list mounted archives")
+    ls = sub.add_parser("ls", help="list virtual paths matching a glob")
+    ls.add_argument("pattern")
+    sub.add_parser("redundant", help="list extracted files identical to their zip member")
+    sub.add_parser("check", help="check glob() against pathlib on the loose files")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    fs = AssetFS()
+    print(f"  Indexed {len(fs.members)} archive members in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    if args.command == "mounts":
+        for archive in fs.archives:
+            count = sum(1 for a, _, _ in fs.members.values() if a is archive)
+            print(f"  {archive.path.as_posix()}: {count} members")
+    elif args.command == "ls":
+        for path in fs.glob(args.pattern):
+            print(f"  {fs.source(path):<50} {path}")
+    elif args.command == "redundant":
+        copies = fs.extracted_copies()
+        total = sum(fs.size(p) for p in copies)
+        for path in copies:
+            print(f"  {path}")
+        print(f"\n  {len(copies)} extracted files ({total:,} bytes) are also served from archives")
+    elif args.command == "check":
+        mismatched = fs.check_glob()
+        for pattern in mismatched:
+            print(f"  ✗ glob({pattern!r}) differs from pathlib")
+        print(f"  glob check: {'failed' if mismatched else 'ok'}")
+        raise SystemExit(1 if mismatched else 0)
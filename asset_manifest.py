@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Unified asset manifest (v2) built by scanning assets/
+Keeps the curated named entries under "assets" (including build-cache hashes) and adds a
+"files" table describing every file on disk: byte size, SHA-256, kind, image dimensions
+read from headers only, decoded-memory estimate and a load-priority tier.
+Entries are reused for files whose size and mtime are unchanged since the last scan; the
+mtimes live in a local scan cache under .cache/, so the manifest only holds fields that
+depend on file contents and stays identical across checkouts.
+"""
+
+import json
+import re
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from build_cache import hash_file
+
+ASSETS_DIR = Path("assets")
+MANIFEST_PATH = ASSETS_DIR / "manifest.json"
+MANIFEST_VERSION = "2.0"
+SCAN_CACHE_PATH = Path(".cache") / "asset_scan.json"
+
+# Build outputs and reports that should not describe themselves, relative to the scanned root
+SKIPPED = {"manifest.json", "png_report.json", "dedupe_report.json", "preload_plan.json", "font/subset.json"}
+SKIPPED_NAMES = {".DS_Store"}
+
+KINDS = {
+    ".png": "image", ".jpg": "image", ".jpeg": "image", ".gif": "image", ".webp": "image", ".bmp": "image",
+    ".mp3": "audio", ".ogg": "audio", ".wav": "audio", ".mid": "audio",
+    ".ttf": "font", ".otf": "font", ".woff": "font", ".woff2": "font",
+    ".json": "data", ".aseprite": "source", ".ase": "source", ".zip": "archive",
+}
+
+# Load-priority tiers
+TIER_CRITICAL = 0    # needed for the first frame: fonts and UI chrome the page references
+TIER_GAMEPLAY = 1    # referenced by the web client, can stream after boot
+TIER_NAMED = 2       # listed in the curated manifest entries but not referenced yet
+TIER_UNUSED = 3      # not referenced anywhere: source files, archives, unused packs
+CRITICAL_HINTS = ("font/", "gui/", "ui elements/", "iconset")
+
+
+def image_size(path):
+    """(width, height) from the file header without decoding pixels, or None"""
+    with open(path, "rb") as f:
+        head = f.read(32)
+        if head[:8] == b"\x89PNG\r\n\x1a\n":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:2] == b"BM":
+            w, h = struct.unpack("<ii", head[18:26])
+            return w, abs(h)
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return _webp_size(head)
+        if head[:2] == b"\xff\xd8":
+            f.seek(2)
+            return _jpeg_size(f)
+    return None
+
+
+def _webp_size(head: bytes):
+    chunk = head[12:16]
+    if chunk == b"VP8X":
+        return (int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1)
+    if chunk == b"VP8L":
+        bits = int.from_bytes(head[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8 ":
+        w, h = struct.unpack("<HH", head[26:30])
+        return w & 0x3FFF, h & 0x3FFF
+    return None
+
+
+def _jpeg_size(f):
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue
+        length = struct.unpack(">H", f.read(2))[0]
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            h, w = struct.unpack(">xHH", f.read(5))
+            return w, h
+        f.seek(length - 2, 1)
+
+
+def referenced_paths(html_path="index.html") -> set:
+    """Asset paths the web client references literally"""
+    if not Path(html_path).exists():
+        return set()
+    text = Path(html_path).read_text(encoding="utf-8")
+    return set(re.findall(r"""['"`(](assets/[^'"`)]+?\.\w+)['"`)]""", text))
+
+
+def named_paths(manifest: dict) -> set:
+    """Paths mentioned by the curated named entries"""
+    paths = set()
+
+    def walk(node):
+        if isinstance(node, dict):
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, str) and node.startswith("assets/"):
+            paths.add(node)
+
+    walk(manifest.get("assets", {}))
+    return paths
+
+
+def priority_tier(path: str, kind: str, referenced: set, named: set) -> int:
+    if path in referenced:
+        lower = path.lower()
+        if kind == "font" or any(hint in lower for hint in CRITICAL_HINTS):
+            return TIER_CRITICAL
+        return TIER_GAMEPLAY
+    if path in named:
+        return TIER_NAMED
+    return TIER_UNUSED
+
+
+def scan_file(path: Path, previous: dict) -> dict:
+    """Describe one file, reusing the previous scan cache entry when size and mtime match
+
+    The returned entry carries "mtime" for the scan cache; build_manifest drops it.
+    """
+    stat = path.stat()
+    if previous.get("bytes") == stat.st_size and previous.get("mtime") == stat.st_mtime_ns and "sha256" in previous:
+        return dict(previous)
+
+    kind = KINDS.get(path.suffix.lower(), "other")
+    entry = {"bytes": stat.st_size, "mtime": stat.st_mtime_ns, "kind": kind, "sha256": hash_file(path)}
+
+    if kind == "image":
+        try:
+            size = image_size(path)
+        except (OSError, struct.error):
+            size = None
+        if size:
+            entry["width"], entry["height"] = size
+            # RGBA8 texture in memory, which is what both the browser and Godot upload
+            entry["decodedBytes"] = size[0] * size[1] * 4
+    return entry
+
+
+def scan_assets(root=ASSETS_DIR, previous_files: dict = None, jobs: int = 8) -> dict:
+    """{posix path: entry} for every file under root, scanned on a thread pool"""
+    previous_files = previous_files or {}
+    root = Path(root)
+    paths = sorted(p for p in root.rglob("*") if p.is_file() and p.name not in SKIPPED_NAMES
+                   and p.relative_to(root).as_posix() not in SKIPPED)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        entries = pool.map(lambda p: scan_file(p, previous_files.get(p.as_posix(), {})), paths)
+        return {p.as_posix(): e for p, e in zip(paths, entries)}
+
+
+def _load_json(path) -> dict:
+    if not Path(path).exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_manifest(root=ASSETS_DIR, html_path="index.html", manifest_path=MANIFEST_PATH, jobs: int = 8,
+                   cache_path=SCAN_CACHE_PATH) -> dict:
+    """Rescan root, update the scan cache and return the merged v2 manifest"""
+    manifest = _load_json(manifest_path)
+
+    scanned = scan_assets(root, _load_json(cache_path), jobs)
+    Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(scanned, f)
+
+    files = {path: {key: value for key, value in entry.items() if key != "mtime"} for path, entry in scanned.items()}
+    referenced = referenced_paths(html_path)
+    named = named_paths(manifest)
+
+    tiers = {}
+    for path, entry in files.items():
+        entry["tier"] = priority_tier(path, entry["kind"], referenced, named)
+        tier = tiers.setdefault(str(entry["tier"]), {"files": 0, "bytes": 0, "decodedBytes": 0})
+        tier["files"] += 1
+        tier["bytes"] += entry["bytes"]
+        tier["decodedBytes"] += entry.get("decodedBytes", 0)
+
+    manifest["version"] = MANIFEST_VERSION
+    manifest.setdefault("assets", {})
+    manifest["missing"] = sorted(p for p in referenced if p not in files)
+    manifest["tiers"] = dict(sorted(tiers.items()))
+    manifest["files"] = files
+    return manifest
+
+
+def write_manifest(root=ASSETS_DIR, html_path="index.html", manifest_path=MANIFEST_PATH, jobs: int = 8,
+                   cache_path=SCAN_CACHE_PATH) -> dict:
+    """Rescan and write the manifest in place"""
+    start = time.perf_counter()
+    manifest = build_manifest(root, html_path, manifest_path, jobs, cache_path)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    print(f"\nAsset manifest saved to: {manifest_path} "
+          f"({len(manifest['files'])} files in {time.perf_counter() - start:.2f}s)")
+    for tier, stats in manifest["tiers"].items():
+        print(f"  tier {tier}: {stats['files']:>5} files {stats['bytes']:>12,} bytes "
+              f"{stats['decodedBytes']:>13,} decoded")
+    if manifest["missing"]:
+        print(f"  {len(manifest['missing'])} paths referenced from {html_path} are missing")
+    return manifest
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scan assets/ and write the unified manifest")
+    parser.add_argument("--root", default=str(ASSETS_DIR))
+    parser.add_argument("--html", default="index.html")
+    parser.add_argument("--out", default=str(MANIFEST_PATH))
+    parser.add_argument("--cache", default=str(SCAN_CACHE_PATH), help="local size/mtime scan cache")
+    parser.add_argument("--jobs", type=int, default=8)
+    args = parser.parse_args()
+
+    write_manifest(args.root, args.html, args.out, args.jobs, args.cache)
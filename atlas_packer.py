@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Texture atlas packer for the game's sprites
+Packs loose PNGs into a few power-of-two atlases with a MaxRects (best short side fit)
+packer and writes TexturePacker-style JSON frame maps that Phaser/Pixi/Godot importers read.
+"""
+
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ATLAS_DIR = Path("assets") / "atlas"
+DEFAULT_SOURCES = [
+    Path("assets") / "characters",
+    Path("assets") / "enemies",
+    Path("assets") / "pickups",
+]
+
+
+class MaxRectsBin:
+    """One atlas page; free space is tracked as a list of maximal free rectangles"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.free = [(0, 0, width, height)]
+        self.used_w = 0
+        self.used_h = 0
+
+    def find(self, w: int, h: int):
+        """Best short side fit: the free rect that leaves the smallest leftover side"""
+        best = None
+        best_score = None
+        for fx, fy, fw, fh in self.free:
+            if w <= fw and h <= fh:
+                leftover = min(fw - w, fh - h), max(fw - w, fh - h)
+                if best_score is None or leftover < best_score:
+                    best, best_score = (fx, fy), leftover
+        return best
+
+    def insert(self, w: int, h: int):
+        """Place a w x h rect; returns (x, y) or None if it does not fit"""
+        pos = self.find(w, h)
+        if pos is None:
+            return None
+        self._split(pos[0], pos[1], w, h)
+        self.used_w = max(self.used_w, pos[0] + w)
+        self.used_h = max(self.used_h, pos[1] + h)
+        return pos
+
+    def _split(self, x: int, y: int, w: int, h: int):
+        kept, created = [], []
+        for free in self.free:
+            fx, fy, fw, fh = free
+            if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+                kept.append(free)
+                continue
+            # Up to four maximal rects around the placed one
+            if x > fx:
+                created.append((fx, fy, x - fx, fh))
+            if x + w < fx + fw:
+                created.append((x + w, fy, fx + fw - x - w, fh))
+            if y > fy:
+                created.append((fx, fy, fw, y - fy))
+            if y + h < fy + fh:
+                created.append((fx, y + h, fw, fy + fh - y - h))
+
+        # Untouched rects were already maximal, so only the new ones can be redundant
+        pruned = []
+        for i, rect in enumerate(created):
+            others = kept + pruned + created[i + 1:]
+            if not any(_contains(other, rect) for other in others):
+                pruned.append(rect)
+        self.free = kept + pruned
+
+
+def _contains(outer: tuple, inner: tuple) -> bool:
+    return (inner[0] >= outer[0] and inner[1] >= outer[1]
+            and inner[0] + inner[2] <= outer[0] + outer[2]
+            and inner[1] + inner[3] <= outer[1] + outer[3])
+
+
+def next_pow2(n: int) -> int:
+    return 1 << max(0, n - 1).bit_length()
+
+
+def pack_rects(sizes: dict, max_size: int = 2048, padding: int = 1):
+    """Pack {name: (w, h)} into as few max_size pages as possible
+
+    Returns (pages, oversized) where pages is a list of (page_w, page_h, {name: (x, y)})
+    with power-of-two page sizes, and oversized lists names larger than a page.
+    """
+    order = sorted(sizes, key=lambda n: (max(sizes[n]), sizes[n][0] * sizes[n][1]), reverse=True)
+    bins, placements, oversized = [], [], []
+
+    for name in order:
+        w, h = sizes[name]
+        pw, ph = w + padding, h + padding
+        if pw > max_size or ph > max_size:
+            oversized.append(name)
+            continue
+        for atlas_bin, placed in zip(bins, placements):
+            pos = atlas_bin.insert(pw, ph)
+            if pos is not None:
+                placed[name] = pos
+                break
+        else:
+            atlas_bin = MaxRectsBin(max_size, max_size)
+            bins.append(atlas_bin)
+            placements.append({name: atlas_bin.insert(pw, ph)})
+
+    pages = [(next_pow2(b.used_w), next_pow2(b.used_h), placed) for b, placed in zip(bins, placements)]
+    return pages, oversized
+
+
+def collect_sources(paths, fs=None) -> list:
+    """Expand files and directories into a sorted list of PNG paths
+
+    With an asset_fs.AssetFS, directories also include PNGs inside mounted zip archives.
+    """
+    sources = set()
+    for path in paths:
+        if fs is not None:
+            prefix = Path(path).as_posix().rstrip("/")
+            matches = fs.glob(f"{prefix}/**/*.png") if not prefix.endswith(".png") else [prefix]
+            sources.update(Path(p) for p in matches if fs.exists(p) and ATLAS_DIR not in Path(p).parents)
+            continue
+        path = Path(path)
+        if path.is_dir():
+            sources.update(p for p in path.rglob("*.png") if ATLAS_DIR not in p.parents)
+        elif path.suffix.lower() == ".png" and path.exists():
+            sources.add(path)
+    return sorted(sources)
+
+
+def html_image_refs(html_path="index.html", fs=None) -> list:
+    """PNG paths referenced from the web client"""
+    text = Path(html_path).read_text(encoding="utf-8")
+    refs = re.findall(r"""['"`](assets/[^'"`]+?\.png)['"`]""", text)
+    exists = fs.exists if fs is not None else lambda ref: Path(ref).exists()
+    return sorted({ref for ref in refs if exists(ref)})
+
+
+def build_atlases(sources, out_dir=ATLAS_DIR, max_size: int = 2048, padding: int = 1,
+                  trim: bool = False, prefix: str = "atlas", fs=None):
+    """Pack source images into atlases; writes <prefix>_N.png/.json and <prefix>_index.json
+
+    Pass an asset_fs.AssetFS as fs to read sources straight out of mounted archives.
+    """
+    from PIL import Image
+
+    print("\n--- Building Texture Atlases ---\n")
+    start = time.perf_counter()
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    images, offsets, source_sizes = {}, {}, {}
+    for path in sources:
+        name = Path(path).as_posix()
+        img = (fs.image(name) if fs is not None else Image.open(path)).convert("RGBA")
+        source_sizes[name] = img.size
+        offsets[name] = (0, 0)
+        if trim:
+            bbox = img.getchannel("A").getbbox()
+            if bbox:
+                img = img.crop(bbox)
+                offsets[name] = bbox[:2]
+        images[name] = img
+
+    pages, oversized = pack_rects({n: img.size for n, img in images.items()}, max_size, padding)
+    for name in oversized:
+        print(f"  Skipping {name}: {images[name].size} is larger than a {max_size}px page")
+
+    index = {"atlases": [], "frames": {}}
+    # PNG encoding dominates; PIL releases the GIL while encoding so pages save in parallel
+    saver = ThreadPoolExecutor()
+    saves = []
+    for page_no, (page_w, page_h, placed) in enumerate(pages):
+        page_name = f"{prefix}_{page_no}"
+        atlas = Image.new("RGBA", (page_w, page_h), (0, 0, 0, 0))
+        frames = {}
+        for name, (x, y) in placed.items():
+            img = images[name]
+            atlas.paste(img, (x, y))
+            w, h = img.size
+            ox, oy = offsets[name]
+            sw, sh = source_sizes[name]
+            frames[name] = {
+                "frame": {"x": x, "y": y, "w": w, "h": h},
+                "rotated": False,
+                "trimmed": (w, h) != (sw, sh),
+                "spriteSourceSize": {"x": ox, "y": oy, "w": w, "h": h},
+                "sourceSize": {"w": sw, "h": sh},
+            }
+            index["frames"][name] = {"atlas": f"{page_name}.png", **frames[name]["frame"]}
+
+        saves.append(saver.submit(atlas.save, out_dir / f"{page_name}.png", "PNG"))
+        with open(out_dir / f"{page_name}.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "frames": frames,
+                "meta": {"image": f"{page_name}.png", "format": "RGBA8888",
+                         "size": {"w": page_w, "h": page_h}, "scale": "1"},
+            }, f, indent=1)
+        index["atlases"].append({"image": f"{page_name}.png", "frames": len(frames),
+                                 "size": [page_w, page_h]})
+        print(f"  {page_name}.png  {page_w}x{page_h}  {len(frames)} frames")
+
+    for save in saves:
+        save.result()
+    saver.shutdown()
+
+    index["oversized"] = oversized
+    with open(out_dir / f"{prefix}_index.json", "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+
+    print(f"\n  Packed {len(images) - len(oversized)} images into {len(pages)} atlases "
+          f"in {time.perf_counter() - start:.2f}s")
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pack sprites into texture atlases")
+    parser.add_argument("sources", nargs="*", help="PNG files or directories (default: generated sprites)")
+    parser.add_argument("--html", help="also pack every PNG referenced from this HTML file")
+    parser.add_argument("--out", default=str(ATLAS_DIR))
+    parser.add_argument("--max-size", type=int, default=2048)
+    parser.add_argument("--padding", type=int, default=1)
+    parser.add_argument("--trim", action="store_true", help="crop transparent borders")
+    parser.add_argument("--zip", action="store_true", help="read sources through mounted asset zips")
+    args = parser.parse_args()
+
+    fs = None
+    if args.zip:
+        from asset_fs import AssetFS
+        fs = AssetFS()
+
+    paths = collect_sources(args.sources or DEFAULT_SOURCES, fs)
+    if args.html:
+        paths = sorted(set(paths) | {Path(p) for p in html_image_refs(args.html, fs)})
+    build_atlases(paths, args.out, args.max_size, args.padding, args.trim, fs=fs)
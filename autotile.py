@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Autotile compiler for the 32x32 terrain sheets
+Each sheet is sliced into tiles and every tile is classified once by its pixels: a
+side (N/E/S/W) or corner connects to the neighbouring tile if its border strip is
+opaque and looks like the tile's interior (no outline, no transparent gap). Those
+eight bits are the tile's blob mask. The 256 possible neighbourhoods reduce to 47
+blob masks (a corner only matters when both sides next to it connect). Terrain tiles
+are grouped by interior color first, and for each terrain the 47 are resolved to the
+best tile ahead of time, so choosing a tile while building a map is one table lookup:
+tile = lut[neighbour_mask]. bake_map() does that for a whole map with array shifts,
+without comparing any images.
+
+    python autotile.py                    # compile the default sheets into assets/tilesets
+    python autotile.py --benchmark 4096   # bake a random 4096x4096 map
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+TILE_SIZE = 32
+TILESET_DIR = Path("assets") / "tilesets"
+DEFAULT_SHEETS = [
+    Path("assets") / "ground-tiles-32x32.png",
+    Path("assets") / "dirt-tiles-32x32.png",
+    Path("assets") / "water-tiles-32x32.png",
+    Path("assets") / "wall-tiles-32x32.png",
+    Path("assets") / "wall-transition-tiles-32x32.png",
+    Path("assets") / "tiles-all-32x32.png",
+]
+
+# Blob mask bits, clockwise from north
+N, NE, E, SE, S, SW, W, NW = (1 << i for i in range(8))
+OFFSETS = {N: (-1, 0), NE: (-1, 1), E: (0, 1), SE: (1, 1), S: (1, 0), SW: (1, -1), W: (0, -1), NW: (-1, -1)}
+CORNERS = {NE: N | E, SE: S | E, SW: S | W, NW: N | W}
+
+STRIP = 4            # border strip depth in pixels, tested one line at a time
+CORNER = 3           # corner patch size in pixels
+MIN_OPAQUE = 0.9     # share of line pixels that must be opaque to connect
+COLOR_TOLERANCE = 20  # max channel difference between line and interior mean colors
+MIN_INTERIOR = 0.5   # tiles with less opaque interior are decoration, not terrain
+TERRAIN_DISTANCE = 16  # max channel difference between a tile's interior and its terrain's mean color
+
+
+def normalize(masks):
+    """Drop corner bits whose two adjacent sides are not both set (vectorized)"""
+    masks = np.asarray(masks, dtype=np.int32)
+    out = masks & (N | E | S | W)
+    for corner, sides in CORNERS.items():
+        out |= np.where((masks & corner).astype(bool) & ((masks & sides) == sides), corner, 0)
+    return out
+
+
+BLOB_MASKS = np.unique(normalize(np.arange(256)))          # the 47 canonical masks
+BLOB_INDEX = np.searchsorted(BLOB_MASKS, normalize(np.arange(256)))  # raw mask -> 0..46
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)])
+
+
+def slice_sheet(rgba: np.ndarray, tile: int = TILE_SIZE) -> np.ndarray:
+    """(H, W, 4) sheet -> (rows, cols, tile, tile, 4); partial tiles at the edges are dropped"""
+    rows, cols = rgba.shape[0] // tile, rgba.shape[1] // tile
+    rgba = rgba[:rows * tile, :cols * tile]
+    return rgba.reshape(rows, tile, cols, tile, 4).swapaxes(1, 2)
+
+
+def _border_lines(tile: int = TILE_SIZE) -> dict:
+    """{bit: [(tile, tile) bool per line]} lines parallel to each side, corner patches as one region"""
+    regions = {}
+    for bit, (dy, dx) in OFFSETS.items():
+        lines = []
+        for depth in range(CORNER if bit in CORNERS else STRIP):
+            mask = np.zeros((tile, tile), dtype=bool)
+            if bit in CORNERS:
+                size = CORNER
+                rows = slice(0, size) if dy < 0 else slice(tile - size, tile)
+                cols = slice(0, size) if dx < 0 else slice(tile - size, tile)
+                mask[rows, cols] = True
+                lines.append(mask)
+                break
+            row = depth if dy < 0 else tile - 1 - depth
+            col = depth if dx < 0 else tile - 1 - depth
+            if dy:
+                mask[row, CORNER:tile - CORNER] = True
+            else:
+                mask[CORNER:tile - CORNER, col] = True
+            lines.append(mask)
+        regions[bit] = lines
+    return regions
+
+
+def classify(tiles: np.ndarray):
+    """(rows, cols, t, t, 4) tiles -> (blob masks, interior fill, plainness, interior mean color)
+
+    A side connects if every line of its border strip is opaque and close to the interior's
+    mean color, within the line-to-line variation the interior itself shows. Testing line by
+    line catches 1px outlines that sit a pixel or two inside the edge.
+    """
+    tile = tiles.shape[2]
+    rgb = tiles[..., :3].astype(np.float32)
+    opaque = tiles[..., 3] >= 128
+
+    def stats(region):
+        weight = opaque & region
+        count = weight.sum(axis=(2, 3))
+        mean = (rgb * weight[..., None]).sum(axis=(2, 3)) / np.maximum(count, 1)[..., None]
+        return count / region.sum(), mean
+
+    interior = np.zeros((tile, tile), dtype=bool)
+    interior[tile // 4:3 * tile // 4, tile // 4:3 * tile // 4] = True
+    fill, interior_mean = stats(interior)
+    # Textured interiors (mortar rows, speckles) vary line to line; allow borders the same slack
+    variation = np.zeros(tiles.shape[:2], dtype=np.float32)
+    for index in range(tile // 4, 3 * tile // 4):
+        for axis in (0, 1):
+            line = np.zeros((tile, tile), dtype=bool)
+            if axis:
+                line[tile // 4:3 * tile // 4, index] = True
+            else:
+                line[index, tile // 4:3 * tile // 4] = True
+            variation = np.maximum(variation, np.abs(stats(line)[1] - interior_mean).max(axis=2))
+    tolerance = COLOR_TOLERANCE + variation
+
+    masks = np.zeros(tiles.shape[:2], dtype=np.int32)
+    difference = np.zeros(tiles.shape[:2], dtype=np.float32)
+    for bit, lines in _border_lines(tile).items():
+        connected = np.ones(tiles.shape[:2], dtype=bool)
+        for line in lines:
+            coverage, mean = stats(line)
+            delta = np.abs(mean - interior_mean).max(axis=2)
+            connected &= (coverage >= MIN_OPAQUE) & (delta <= tolerance)
+            difference += delta
+        masks |= np.where(connected, bit, 0)
+    # Lower is plainer: the variant whose borders match its interior most closely
+    return normalize(masks), fill, difference, interior_mean
+
+
+def group_terrains(fill: np.ndarray, plainness: np.ndarray, interior_mean: np.ndarray):
+    """Terrain id per tile (-1 for decoration) and the mean color of each terrain
+
+    Plainest tiles seed the groups; every other terrain tile joins the closest group whose
+    running mean is within TERRAIN_DISTANCE on every channel, or starts a new one.
+    """
+    rows, cols = fill.shape
+    labels = np.full((rows, cols), -1, dtype=np.int32)
+    sums, counts = [], []
+    order = sorted(((float(plainness[r, c]), r, c) for r in range(rows) for c in range(cols)
+                    if fill[r, c] >= MIN_INTERIOR))
+    for _, r, c in order:
+        color = interior_mean[r, c].astype(np.float64)
+        if sums:
+            distance = np.abs(np.array(sums) / np.array(counts)[:, None] - color).max(axis=1)
+            best = int(distance.argmin())
+            if distance[best] <= TERRAIN_DISTANCE:
+                sums[best] += color
+                counts[best] += 1
+                labels[r, c] = best
+                continue
+        labels[r, c] = len(sums)
+        sums.append(color)
+        counts.append(1)
+    return labels, [(total / count).round().astype(int).tolist() for total, count in zip(sums, counts)]
+
+
+def blob_table(masks: np.ndarray, members: np.ndarray, plainness: np.ndarray) -> list:
+    """One entry per canonical blob mask: the tile to use, its variants and whether it is exact
+
+    Only tiles selected by the boolean members grid (one terrain) are considered.
+    """
+    rows, cols = masks.shape
+    candidates = [(int(masks[r, c]), float(plainness[r, c]), r * cols + c)
+                  for r in range(rows) for c in range(cols) if members[r, c]]
+    if not candidates:
+        return []
+    cand_masks = np.array([m for m, _, _ in candidates])
+    table = []
+    for blob in BLOB_MASKS:
+        # Side mismatches matter more than corner mismatches when nothing matches exactly
+        diff = cand_masks ^ blob
+        cost = POPCOUNT[diff & (N | E | S | W)] * 4 + POPCOUNT[diff & (NE | SE | SW | NW)]
+        best = cost.min()
+        matches = sorted((candidates[i][1], candidates[i][2]) for i in np.flatnonzero(cost == best))
+        table.append({
+            "mask": int(blob),
+            "tile": matches[0][1],
+            "variants": [index for _, index in matches],
+            "exact": bool(best == 0),
+        })
+    return table
+
+
+def neighbour_masks(grid: np.ndarray) -> np.ndarray:
+    """Raw 8-bit neighbour mask for every cell of a boolean terrain grid (cells off the map count as empty)"""
+    grid = np.asarray(grid, dtype=bool)
+    padded = np.pad(grid, 1)
+    height, width = grid.shape
+    masks = np.zeros(grid.shape, dtype=np.uint8)
+    for bit, (dy, dx) in OFFSETS.items():
+        masks |= np.where(padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width], bit, 0).astype(np.uint8)
+    return masks
+
+
+def lookup_table(table: list) -> np.ndarray:
+    """256-entry array: raw neighbour mask -> tile index (-1 if the sheet has no terrain tiles)"""
+    tiles = np.array([entry["tile"] for entry in table] or [-1] * len(BLOB_MASKS), dtype=np.int32)
+    return tiles[BLOB_INDEX]
+
+
+def bake_map(grid: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    """Tile index per cell (-1 where there is no terrain) with one lookup per cell"""
+    grid = np.asarray(grid, dtype=bool)
+    return np.where(grid, lut[neighbour_masks(grid)], -1)
+
+
+def compile_sheet(path, out_dir=TILESET_DIR, tile: int = TILE_SIZE) -> dict:
+    """Classify one sheet and write <sheet>.json next to the other tilesets
+
+    Every terrain gets its own blob table and lut under "terrains". The top-level "blob" and
+    "lut" are only written for single-terrain sheets; a mixed sheet gets a warning instead,
+    since one table would pick edges from whichever terrain happened to match best.
+    """
+    from PIL import Image
+
+    with Image.open(path) as img:
+        rgba = np.asarray(img.convert("RGBA"))
+    if rgba.shape[0] % tile or rgba.shape[1] % tile:
+        print(f"  Warning: {path} is {rgba.shape[1]}x{rgba.shape[0]}, not a multiple of {tile}; cropping")
+    tiles = slice_sheet(rgba, tile)
+    masks, fill, plainness, interior_mean = classify(tiles)
+    labels, colors = group_terrains(fill, plainness, interior_mean)
+    rows, cols = masks.shape
+    terrains = []
+    for terrain, color in enumerate(colors):
+        table = blob_table(masks, labels == terrain, plainness)
+        terrains.append({"terrain": terrain, "color": color, "tiles": int((labels == terrain).sum()),
+                         "blob": table, "lut": lookup_table(table).tolist()})
+    if len(terrains) > 1:
+        print(f"  Warning: {path} mixes {len(terrains)} terrains; writing one table per terrain only")
+
+    tileset = {
+        "image": Path(path).as_posix(),
+        "tileSize": tile,
+        "columns": cols,
+        "rows": rows,
+        "bits": {"N": N, "NE": NE, "E": E, "SE": SE, "S": S, "SW": SW, "W": W, "NW": NW},
+        "tiles": [{"index": r * cols + c, "x": c * tile, "y": r * tile, "mask": int(masks[r, c]),
+                   "terrain": int(labels[r, c]) if labels[r, c] >= 0 else None}
+                  for r in range(rows) for c in range(cols) if tiles[r, c, ..., 3].any()],
+        # terrains[i]["lut"][raw 8-bit neighbour mask] -> tile index, ready for the client
+        "terrains": terrains,
+    }
+    if len(terrains) == 1:
+        tileset["blob"], tileset["lut"] = terrains[0]["blob"], terrains[0]["lut"]
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / f"{Path(path).stem}.json", "w", encoding="utf-8") as f:
+        json.dump(tileset, f, indent=1)
+    return tileset
+
+
+def compile_tilesets(sheets=DEFAULT_SHEETS, out_dir=TILESET_DIR) -> dict:
+    print("\n--- Compiling Autotile Sheets ---\n")
+    start = time.perf_counter()
+    compiled = {}
+    for path in sheets:
+        if not Path(path).exists():
+            print(f"  Skipped {path}: not found")
+            continue
+        tileset = compile_sheet(path, out_dir)
+        exact = "/".join(str(sum(entry["exact"] for entry in t["blob"])) for t in tileset["terrains"])
+        terrain = sum(t["terrain"] is not None for t in tileset["tiles"])
+        compiled[Path(path).stem] = f"{Path(path).stem}.json"
+        groups = len(tileset["terrains"])
+        print(f"  {Path(path).name:<36} {tileset['columns']}x{tileset['rows']} tiles, {terrain:>3} terrain in "
+              f"{groups} group{'s' * (groups != 1)}, {exact} of {len(BLOB_MASKS)} blob masks exact")
+
+    with open(Path(out_dir) / "tilesets.json", "w", encoding="utf-8") as f:
+        json.dump({"blobMasks": BLOB_MASKS.tolist(), "tilesets": compiled}, f, indent=1)
+    print(f"\n  {len(compiled)} tilesets in {time.perf_counter() - start:.2f}s, saved to {out_dir}")
+    return compiled
+
+
+def benchmark(size: int = 2048, seed: int = 0):
+    """Bake a random blobby map against a compiled table"""
+    rng = np.random.default_rng(seed)
+    # Upsampled noise gives connected regions rather than salt-and-pepper
+    coarse = rng.random((size // 8 + 1, size // 8 + 1)) < 0.5
+    grid = coarse.repeat(8, axis=0).repeat(8, axis=1)[:size, :size]
+    lut = np.arange(256, dtype=np.int32)[BLOB_INDEX]
+    start = time.perf_counter()
+    tiles = bake_map(grid, lut)
+    elapsed = time.perf_counter() - start
+    print(f"  {size}x{size} map ({grid.size:,} cells, {np.unique(tiles).size - 1} blob cases) "
+          f"baked in {elapsed * 1000:.1f} ms ({grid.size / elapsed / 1e6:.0f}M cells/s)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile 32x32 terrain sheets into blob autotile tables")
+    parser.add_argument("sheets", nargs="*", help="sheet PNGs (default: the terrain sheets in assets/)")
+    parser.add_argument("--out", default=str(TILESET_DIR))
+    parser.add_argument("--benchmark", type=int, metavar="SIZE", help="bake a random SIZE x SIZE map and exit")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+    else:
+        compile_tilesets(args.sheets or DEFAULT_SHEETS, args.out)
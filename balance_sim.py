@@ -0,0 +1,642 @@
+#!/usr/bin/env python3
+"""
+Headless Monte Carlo balance simulator driven by game_data.json
+Many independent runs advance together: enemies, projectiles and area effects are
+struct-of-arrays of shape (runs, slots) and every tick is a handful of array
+operations, whatever the number of entities. These rules are taken from the client
+(Enemy/Player/Game in index.html): spawn pacing and type weights, per-minute enemy
+scaling, getDmg/getCD/getRange, applyBook, the level curve, armor and invulnerability
+frames, the boss at BOSS.appearsAfterSeconds, and the orbit, radial, meteor, tornado
+and projectile weapons (counts, damage shares, speeds, lifetimes and radii from
+Player.fire and the Game fx loop). Runs end at the boss kill (victory), at death, or
+at the time limit.
+
+Simplifications, where the sim and the client differ:
+  - the player kites at full move speed away from nearby enemies (inverse-square
+    weighted, pushed back from the world edge) or stands still
+  - level-ups alternate between the weapon and the book at COMMON rarity; the
+    damage/count/cooldown upgrade a weapon level-up rolls is not applied, so every
+    weapon keeps its base projectile count (one orbiter, one lightning target)
+  - aura hits on its cooldown, not once per effect animation cycle
+  - melee hits once per cooldown on the side of the nearest enemy, not every frame
+    of a window in the cooldown on the side the player faces
+  - projectiles leave from the player, not the muzzle offset, and never pierce
+  - orbit contact and tornado damage are tested once per tick and scaled by the tick
+    length; tornado ticks never crit
+  - item drops, chests and pots are left out
+Use the numbers to compare loadouts and tuning changes, not as exact predictions.
+
+    python balance_sim.py --weapon spear --book power   # one loadout
+    python balance_sim.py --sweep                       # every weapon x book
+"""
+
+import json
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Client CONFIG values; client_config() re-reads them from index.html when it exists
+CONFIG = {
+    "ENEMY_BASE_HP": 22,
+    "ENEMY_BASE_ATK": 10,
+    "ENEMY_BASE_SPEED": 65,
+    "SCALING_PER_MIN": 0.30,
+    "WEAPON_BASE_DMG": 5,
+    "MAX_UPGRADE_LEVEL": 10,
+    "MAX_PLAYER_SPEED": 400,
+}
+
+DT = 0.1                 # seconds per tick
+DURATION = 20 * 60       # run length cap in seconds
+BUCKET = 30              # seconds per point on the DPS and XP curves
+MAX_ENEMIES = 192        # enemy slots per run (the client caps near 55-110 alive)
+MAX_PROJECTILES = 32
+PLAYER_RADIUS = 16
+ENEMY_RADIUS = 14
+BOSS_RADIUS = 50
+MAX_ZONES = 16           # meteors and tornadoes in flight per run
+PROJECTILE_RADIUS = 6
+PROJECTILE_SPEED = 360   # Player.fire 'projectile'
+PROJECTILE_LIFE = 1.3
+RADIAL_SPEED = 300       # Player.fire 'radial': 4 + level/4 arrows at 65% damage
+RADIAL_LIFE = 1.8
+RADIAL_DAMAGE = 0.65
+ORBIT_COUNT = 1          # getProjectileCount without count upgrades
+ORBIT_SPIN = 2.0         # radians per second per point of attack speed
+ORBIT_HIT = 20
+METEOR_RADIUS = 55       # 1 + level/4 meteors within +-range of the player, not aimed
+METEOR_STAGGER = 0.12    # delay between the meteors of one cast
+METEOR_FALL = 0.4        # from spawn to impact (life 0.75, lands at 0.35)
+TORNADO_RADIUS = 35      # drifts in the facing direction, damage over time while touching
+TORNADO_OFFSET = 35
+TORNADO_SPEED = 85
+TORNADO_DPS = 0.35       # share of weapon damage per second
+TORNADO_SLOW = 0.35      # seconds of half speed after each touch
+SPAWN_DISTANCE = 560     # just outside a 1280x720 view
+THREAT_RANGE = 180       # a kiting player only moves while enemies are this close
+WORLD_HALF = 2000        # CONFIG.WORLD_SIZE / 2
+INVULN = 0.35
+BASE_CRIT = 0.05
+COMMON_BONUS = 1         # RARITY.COMMON.bonus
+
+
+def client_config(html_path="index.html") -> dict:
+    """Numeric CONFIG entries from the client, falling back to the CONFIG above"""
+    config = dict(CONFIG)
+    path = Path(html_path)
+    if path.exists():
+        match = re.search(r"const CONFIG = \{(.*?)\n\};", path.read_text(encoding="utf-8"), re.S)
+        if match:
+            for key, value in re.findall(r"(\w+):\s*([\d.]+)", match.group(1)):
+                config[key] = float(value)
+    return config
+
+
+def level_requirement(level: np.ndarray) -> np.ndarray:
+    """XP needed to leave `level` (Game.checkLevelUp)"""
+    level = level.astype(np.float64)
+    early = np.floor(10 * 1.25 ** (level - 1))
+    late = np.floor(10 * 1.25 ** 9 * 1.15 ** (level - 10))
+    return np.where(level <= 10, early, late)
+
+
+class BalanceSim:
+    """Runs of one weapon (with a book per run) advanced together, one tick at a time"""
+
+    def __init__(self, game_data: dict, weapon: str, books: list, seed: int = 0, character: str = None,
+                 kite: bool = True, config: dict = None, dt: float = DT, duration: float = DURATION):
+        self.rng = np.random.default_rng(seed)
+        self.cfg = dict(CONFIG, **(config or {}))
+        self.dt, self.duration, self.kite, self.t = dt, duration, kite, 0.0
+
+        enemies = game_data["ENEMIES"]
+        self.types = list(enemies) + ["boss"]
+        self.type_hp = np.array([e["hpMultiplier"] for e in enemies.values()])
+        self.type_atk = np.array([e["atkMultiplier"] for e in enemies.values()])
+        self.type_spd = np.array([e["speedMultiplier"] for e in enemies.values()])
+        self.type_xp = np.array([e["xp"] for e in enemies.values()], dtype=np.float64)
+        self.type_time = np.array([e["appearsAfterSeconds"] for e in enemies.values()])
+        self.boss = game_data["BOSS"]
+        self.weapon = game_data["WEAPONS"][weapon]
+        self.book_data = game_data["BOOKS"]
+
+        R, E, P = len(books), MAX_ENEMIES, MAX_PROJECTILES
+        self.books = list(books)
+
+        # Enemies, struct-of-arrays (runs, slots)
+        self.ex, self.ey = np.zeros((R, E)), np.zeros((R, E))
+        self.ehp, self.eatk, self.espd = np.zeros((R, E)), np.zeros((R, E)), np.zeros((R, E))
+        self.exp, self.ebirth = np.zeros((R, E)), np.zeros((R, E))
+        self.erad = np.full((R, E), ENEMY_RADIUS, dtype=np.float64)
+        self.etype = np.zeros((R, E), dtype=np.int16)
+        self.eslow_t = np.zeros((R, E))
+        self.alive = np.zeros((R, E), dtype=bool)
+
+        # Projectiles (runs, slots)
+        self.px, self.py = np.zeros((R, P)), np.zeros((R, P))
+        self.pvx, self.pvy = np.zeros((R, P)), np.zeros((R, P))
+        self.pdmg, self.plife = np.zeros((R, P)), np.zeros((R, P))
+        self.palive = np.zeros((R, P), dtype=bool)
+
+        # Meteors and tornadoes (runs, slots): wait until active, then a one-off burst or a drifting DOT
+        Z = MAX_ZONES
+        self.zx, self.zy, self.zvx = np.zeros((R, Z)), np.zeros((R, Z)), np.zeros((R, Z))
+        self.zwait, self.zlife, self.zdmg = np.zeros((R, Z)), np.zeros((R, Z)), np.zeros((R, Z))
+        self.zradius = np.zeros((R, Z))
+        self.zburst, self.zalive = np.zeros((R, Z), dtype=bool), np.zeros((R, Z), dtype=bool)
+
+        # Player, one value per run
+        stats = game_data["CHARACTERS"][character]["stats"] if character else {}
+        self.max_hp = np.full(R, float(stats.get("hp", 100)))
+        self.hp = self.max_hp.copy()
+        self.speed = np.full(R, float(stats.get("speed", 200)))
+        self.dmg_mult = np.full(R, float(stats.get("dmgMult", 1)))
+        self.atk_spd = np.full(R, float(stats.get("atkSpd", 1)))
+        self.xp_mult = np.full(R, float(stats.get("xpMult", 1)))
+        self.dmg_reduce = float(stats.get("dmgReduce", 0))
+        self.range_mult = float(stats.get("range", 1))
+        self.cd_mult = float(stats.get("cooldown", 1))
+        self.enemy_buff = float(stats.get("enemyBuff", 0))
+        self.crit = np.full(R, BASE_CRIT + stats.get("crit", 0))
+        self.armor, self.regen, self.curse = np.zeros(R), np.zeros(R), np.zeros(R)
+        self.level, self.xp = np.ones(R, dtype=np.int32), np.zeros(R)
+        self.weapon_level, self.book_level = np.ones(R, dtype=np.int32), np.zeros(R, dtype=np.int32)
+        self.invuln, self.wtimer, self.spawn_t = np.zeros(R), np.zeros(R), np.zeros(R)
+        self.plx, self.ply = np.zeros(R), np.zeros(R)
+        self.heading = np.stack([np.ones(R), np.zeros(R)], axis=1)
+        self.facing = np.ones(R)
+        self.boss_spawned = np.zeros(R, dtype=bool)
+
+        # Outcomes and metrics
+        self.done = np.zeros(R, dtype=bool)
+        self.death_time = np.full(R, np.nan)
+        self.victory_time = np.full(R, np.nan)
+        self.boss_ttk = np.full(R, np.nan)
+        buckets = int(np.ceil(duration / BUCKET))
+        self.dealt, self.gained = np.zeros((R, buckets)), np.zeros((R, buckets))
+        self.kills = np.zeros(R, dtype=np.int64)
+        self.ttk_sum = np.zeros((R, len(self.types)))
+        self.ttk_count = np.zeros((R, len(self.types)))
+
+        has_book = np.array([b is not None for b in self.books])
+        self.book_level[has_book] = 1
+        self._apply_books(has_book)
+
+    # ------------------------------------------------------------- player
+
+    def _apply_books(self, mask: np.ndarray):
+        """Game.applyBook at COMMON rarity for every run in mask"""
+        for book_id in {b for b in self.books if b is not None}:
+            rows = mask & np.array([b == book_id for b in self.books])
+            if not rows.any():
+                continue
+            book = self.book_data[book_id]
+            v = book["val"] * (1 + COMMON_BONUS * 0.12)
+            stat = book["stat"]
+            if stat == "damage":
+                self.dmg_mult[rows] += v
+            elif stat == "atkSpd":
+                self.atk_spd[rows] += v
+            elif stat == "moveSpd":
+                self.speed[rows] = np.minimum(self.speed[rows] * (1 + v), self.cfg["MAX_PLAYER_SPEED"])
+            elif stat == "xp":
+                self.xp_mult[rows] += v
+            elif stat == "maxHp":
+                increase = self.max_hp[rows] * v
+                self.max_hp[rows] += increase
+                self.hp[rows] += increase
+            elif stat == "armor":
+                self.armor[rows] += v * 6
+            elif stat == "curse":
+                self.curse[rows] += v
+            elif stat == "regen":
+                self.regen[rows] += v
+            elif stat == "crit":
+                self.crit[rows] += v
+            # pickup and luck only matter for drops, which are not simulated
+
+    def _level_up(self):
+        for _ in range(3):
+            up = ~self.done & (self.xp >= level_requirement(self.level))
+            if not up.any():
+                return
+            self.xp[up] -= level_requirement(self.level)[up]
+            self.level[up] += 1
+            self.hp[up] = np.minimum(self.max_hp[up], self.hp[up] + self.max_hp[up] * 0.12)
+            cap = self.cfg["MAX_UPGRADE_LEVEL"]
+            has_book = np.array([b is not None for b in self.books])
+            book_turn = up & has_book & (self.level % 2 == 1) & (self.book_level < cap)
+            weapon_turn = up & ~book_turn & (self.weapon_level < cap)
+            book_turn |= up & ~weapon_turn & has_book & (self.book_level < cap)
+            self.weapon_level[weapon_turn] += 1
+            self.book_level[book_turn] += 1
+            self._apply_books(book_turn)
+
+    # ------------------------------------------------------------ enemies
+
+    def _place(self, rows, slots, t: float, types=None):
+        """Put new enemies (or the boss when types is None) on the spawn ring around the player"""
+        angle = self.rng.random(len(rows)) * 2 * np.pi
+        distance = SPAWN_DISTANCE if types is not None else 320
+        self.ex[rows, slots] = self.plx[rows] + np.cos(angle) * distance
+        self.ey[rows, slots] = self.ply[rows] + np.sin(angle) * distance
+        buff = 1 + self.curse[rows] * 0.15 + self.enemy_buff
+        if types is None:
+            self.ehp[rows, slots] = self.boss["hp"] * buff
+            self.eatk[rows, slots] = self.boss["atk"] * buff
+            self.espd[rows, slots] = self.boss["speed"]
+            self.exp[rows, slots] = 0
+            self.erad[rows, slots] = BOSS_RADIUS
+            self.etype[rows, slots] = len(self.types) - 1
+        else:
+            scale = 1 + (t / 60) * self.cfg["SCALING_PER_MIN"]
+            self.ehp[rows, slots] = np.round(self.cfg["ENEMY_BASE_HP"] * self.type_hp[types] * scale * buff)
+            self.eatk[rows, slots] = self.cfg["ENEMY_BASE_ATK"] * self.type_atk[types] * scale * buff
+            self.espd[rows, slots] = self.cfg["ENEMY_BASE_SPEED"] * self.type_spd[types]
+            self.exp[rows, slots] = self.type_xp[types]
+            self.erad[rows, slots] = ENEMY_RADIUS
+            self.etype[rows, slots] = types
+        self.ebirth[rows, slots] = t
+        self.eslow_t[rows, slots] = 0
+        self.alive[rows, slots] = True
+
+    def _free_slots(self, rows):
+        slots = np.argmin(self.alive[rows], axis=1)
+        free = ~self.alive[rows, slots]
+        return rows[free], slots[free]
+
+    def _spawn(self, t: float):
+        active = ~self.done
+        if t >= self.boss.get("appearsAfterSeconds", 600):
+            # Runs with every slot taken retry on later ticks
+            rows, slots = self._free_slots(np.flatnonzero(active & ~self.boss_spawned))
+            self._place(rows, slots, t)
+            self.boss_spawned[rows] = True
+            return  # normal mode stops regular spawns once the boss is out
+
+        spawn_mult = (1 + self.curse * 0.5) * (1 + (t / 60) * 0.08)
+        rate = 1.2 / spawn_mult * (2.5 if t >= 480 else 1)
+        max_alive = np.floor((55 + self.curse * 12) * spawn_mult)
+        available = np.flatnonzero(self.type_time <= t)
+        weights = 1.7 ** np.arange(len(available))
+        self.spawn_t -= self.dt
+        for _ in range(4):
+            due = active & (self.spawn_t <= 0) & (self.alive.sum(axis=1) < max_alive)
+            if not due.any():
+                break
+            rows, slots = self._free_slots(np.flatnonzero(due))
+            types = available[self.rng.choice(len(available), size=len(rows), p=weights / weights.sum())]
+            self._place(rows, slots, t, types)
+            self.spawn_t[due] += (rate / (1 + t / 100))[due]
+
+    # ------------------------------------------------------------ weapons
+
+    def _hit(self, mask: np.ndarray, damage: np.ndarray, slow: float = 0):
+        """Damage every enemy in the (runs, slots) mask by its run's damage"""
+        rows, cols = np.nonzero(mask)
+        self._damage(rows, cols, damage[rows], slow)
+
+    def _damage(self, rows, cols, amount, slow: float = 0, crit: bool = True):
+        """Apply per-hit damage (with crits unless crit is False); repeated (run, slot) pairs all land"""
+        if not len(rows):
+            return
+        if crit:
+            amount = amount * np.where(self.rng.random(len(rows)) < self.crit[rows], 2, 1)
+        np.subtract.at(self.ehp, (rows, cols), amount)
+        if slow:
+            self.eslow_t[rows, cols] = slow
+        np.add.at(self.dealt, (rows, min(int(self.t // BUCKET), self.dealt.shape[1] - 1)), amount)
+
+    def _launch(self, rows, angles, damage, speed: float, life: float):
+        """Fire projectiles from the player for the given runs"""
+        slots = np.argmin(self.palive[rows], axis=1)
+        free = ~self.palive[rows, slots]
+        rows, slots, angles = rows[free], slots[free], angles[free]
+        self.px[rows, slots], self.py[rows, slots] = self.plx[rows], self.ply[rows]
+        self.pvx[rows, slots] = np.cos(angles) * speed
+        self.pvy[rows, slots] = np.sin(angles) * speed
+        self.pdmg[rows, slots] = damage[rows]
+        self.plife[rows, slots] = life
+        self.palive[rows, slots] = True
+
+    def _zone(self, rows, x, y, vx, wait, life, damage, radius: float, burst: bool):
+        """Add a meteor (burst) or tornado for the given runs; x, y, vx, wait, life, damage are per row"""
+        slots = np.argmin(self.zalive[rows], axis=1)
+        free = ~self.zalive[rows, slots]
+        rows, slots = rows[free], slots[free]
+        per_row = [np.broadcast_to(np.asarray(v, dtype=np.float64), free.shape)[free]
+                   for v in (x, y, vx, wait, life, damage)]
+        (self.zx[rows, slots], self.zy[rows, slots], self.zvx[rows, slots],
+         self.zwait[rows, slots], self.zlife[rows, slots], self.zdmg[rows, slots]) = per_row
+        self.zradius[rows, slots] = radius
+        self.zburst[rows, slots] = burst
+        self.zalive[rows, slots] = True
+
+    def _fire(self, dx, dy, distance):
+        w, level = self.weapon, self.weapon_level
+        damage = self.cfg["WEAPON_BASE_DMG"] * 1.18 ** (level - 1) * self.dmg_mult
+        reach = w["range"] * self.range_mult * (1 + (level - 1) * 0.025)
+        kind = w["type"]
+        if kind == "orbit":
+            # The client tests orbit contact every frame, whatever the cooldown, and enemies
+            # have no invulnerability, so each tick lands dt * 60 frames of hits
+            angles = (self.t * ORBIT_SPIN * self.atk_spd[:, None]
+                      + np.arange(ORBIT_COUNT) * 2 * np.pi / ORBIT_COUNT)
+            ox = np.cos(angles)[:, None, :] * reach[:, None, None]
+            oy = np.sin(angles)[:, None, :] * reach[:, None, None]
+            touch = np.hypot(dx[..., None] - ox, dy[..., None] - oy) < ORBIT_HIT + self.erad[..., None]
+            self._hit(self.alive & ~self.done[:, None] & touch.any(axis=2), damage * 1.3 * self.dt * 60)
+            return
+
+        self.wtimer -= self.dt
+        fire = ~self.done & (self.wtimer <= 0)
+        cooldown = np.maximum(0.08, w["cd"] * self.cd_mult / self.atk_spd * (1 - (level - 1) * 0.015))
+        self.wtimer = np.where(fire, np.maximum(self.wtimer, -self.dt) + cooldown, self.wtimer)
+        if not fire.any():
+            return
+        in_range = self.alive & (distance < reach[:, None] + self.erad) & fire[:, None]
+        nearest = np.argmin(np.where(in_range, distance, np.inf), axis=1)
+        has_target = in_range.any(axis=1)
+        rows = np.flatnonzero(has_target)
+
+        if kind == "aura":
+            self._hit(in_range, damage)
+        elif kind == "melee":
+            facing = np.sign(dx[np.arange(len(dx)), nearest])
+            self._hit(in_range & (dx * facing[:, None] > 0), damage)
+        elif kind == "lightning":
+            pick = np.argmax(np.where(in_range, self.rng.random(in_range.shape), -1), axis=1)
+            mask = np.zeros_like(in_range)
+            mask[rows, pick[rows]] = True
+            self._hit(mask, damage)
+        elif kind == "meteor":
+            # Cast whether or not anything is in range; impacts land where they were dropped
+            rows = np.flatnonzero(fire)
+            count = 1 + level[rows] // 4
+            for i in range(count.max(initial=0)):
+                cast = rows[count > i]
+                offset = (self.rng.random((2, len(cast))) - 0.5) * 2 * reach[cast]
+                self._zone(cast, self.plx[cast] + offset[0], self.ply[cast] + offset[1], 0,
+                           i * METEOR_STAGGER + METEOR_FALL, 0, damage[cast], METEOR_RADIUS, burst=True)
+        elif kind == "tornado":
+            rows = np.flatnonzero(fire)
+            facing = self.facing[rows]
+            self._zone(rows, self.plx[rows] + facing * TORNADO_OFFSET, self.ply[rows], facing * TORNADO_SPEED,
+                       0, 3.2 + level[rows] * 0.12, damage[rows] * TORNADO_DPS, TORNADO_RADIUS, burst=False)
+        elif kind == "radial":
+            rows = np.flatnonzero(fire)
+            count = 4 + level[rows] // 4
+            for k in range(count.max(initial=0)):
+                volley = count > k
+                angles = k * 2 * np.pi / count[volley]
+                self._launch(rows[volley], angles, damage * RADIAL_DAMAGE, RADIAL_SPEED, RADIAL_LIFE)
+        else:  # projectile and anything new: one shot at the nearest enemy
+            angles = np.arctan2(dy[rows, nearest[rows]], dx[rows, nearest[rows]])
+            self._launch(rows, angles, damage, PROJECTILE_SPEED, PROJECTILE_LIFE)
+
+    def _zones(self):
+        """Meteors hit everything within their radius once on impact (enemy size ignored, as in
+        the client); tornadoes drift and deal damage per second to every enemy they touch"""
+        if not self.zalive.any():
+            return
+        self.zwait -= self.dt
+        active = self.zalive & (self.zwait <= 0)
+        drifting = active & ~self.zburst
+        self.zx += self.zvx * self.dt * drifting
+        self.zlife -= self.dt * drifting
+        rows, zones = np.nonzero(active)
+        used = np.flatnonzero(self.alive.any(axis=0))
+        end = used[-1] + 1 if len(used) else 0
+        if len(rows) and end:
+            burst = self.zburst[rows, zones]
+            gap = np.hypot(self.ex[rows, :end] - self.zx[rows, zones, None],
+                           self.ey[rows, :end] - self.zy[rows, zones, None])
+            reach = self.zradius[rows, zones, None] + np.where(burst[:, None], 0, self.erad[rows, :end])
+            hit, cols = np.nonzero((gap < reach) & self.alive[rows, :end])
+            meteor = burst[hit]
+            hit_rows, hit_zones = rows[hit], zones[hit]
+            self._damage(hit_rows[meteor], cols[meteor], self.zdmg[hit_rows[meteor], hit_zones[meteor]])
+            # Tornado ticks only crit with probability dt in the client; left out
+            self._damage(hit_rows[~meteor], cols[~meteor], self.zdmg[hit_rows[~meteor], hit_zones[~meteor]] * self.dt,
+                         slow=TORNADO_SLOW, crit=False)
+        self.zalive &= ~(active & self.zburst) & ~(drifting & (self.zlife <= 0))
+
+    def _projectiles(self):
+        if not self.palive.any():
+            return
+        x0, y0 = self.px.copy(), self.py.copy()
+        self.px += self.pvx * self.dt
+        self.py += self.pvy * self.dt
+        self.plife -= self.dt
+        # Only live projectiles, each against its own run's enemies: (shots, slots). Spawns
+        # take the lowest free slot, so slots past the last live enemy are skipped too
+        rows, shots = np.nonzero(self.palive)
+        used = np.flatnonzero(self.alive.any(axis=0))
+        end = used[-1] + 1 if len(used) else 0
+        # Swept test: closest point of this tick's path to each enemy, so fast shots cannot tunnel
+        sx, sy = (self.px - x0)[rows, shots, None], (self.py - y0)[rows, shots, None]
+        rx, ry = self.ex[rows, :end] - x0[rows, shots, None], self.ey[rows, :end] - y0[rows, shots, None]
+        along = np.clip((rx * sx + ry * sy) / np.maximum(sx * sx + sy * sy, 1e-9), 0, 1)
+        gap2 = (rx - along * sx) ** 2 + (ry - along * sy) ** 2
+        hits = (gap2 < (self.erad[rows, :end] + PROJECTILE_RADIUS) ** 2) & self.alive[rows, :end]
+        landed = hits.any(axis=1)
+        if landed.any():
+            # Each projectile stops at the first enemy along its path
+            first = np.argmin(np.where(hits, along, np.inf), axis=1)[landed]
+            rows, shots = rows[landed], shots[landed]
+            self._damage(rows, first, self.pdmg[rows, shots])
+            self.palive[rows, shots] = False
+        self.palive &= self.plife > 0
+
+    def _kite(self):
+        """Run from the nearby enemies, weighted by inverse square distance, inside the world"""
+        dx, dy = self.ex - self.plx[:, None], self.ey - self.ply[:, None]
+        d2 = np.maximum(dx * dx + dy * dy, 1.0)
+        weight = np.where(self.alive & (d2 < THREAT_RANGE ** 2), d2 ** -1.5, 0)
+        away = -np.stack([(dx * weight).sum(axis=1), (dy * weight).sum(axis=1)], axis=1)
+        away *= THREAT_RANGE ** 2
+        for axis, position in enumerate((self.plx, self.ply)):
+            margin = np.maximum(WORLD_HALF - np.abs(position), 1.0)
+            away[:, axis] -= np.sign(position) * np.where(margin < THREAT_RANGE, (THREAT_RANGE / margin) ** 2, 0)
+        heading = self.heading * 0.5 + away
+        self.heading = heading / np.maximum(np.linalg.norm(heading, axis=1, keepdims=True), 1e-9)
+        moving = ~self.done & (weight > 0).any(axis=1)
+        # Player.facing follows the last horizontal movement
+        self.facing = np.where(moving & (self.heading[:, 0] != 0), np.sign(self.heading[:, 0]), self.facing)
+        self.plx = np.clip(self.plx + self.heading[:, 0] * self.speed * self.dt * moving, -WORLD_HALF, WORLD_HALF)
+        self.ply = np.clip(self.ply + self.heading[:, 1] * self.speed * self.dt * moving, -WORLD_HALF, WORLD_HALF)
+
+    # --------------------------------------------------------------- tick
+
+    def step(self):
+        t, dt = self.t, self.dt
+        if self.kite:
+            self._kite()
+
+        self._spawn(t)
+
+        # Chase the player, stopping at contact distance
+        dx, dy = self.ex - self.plx[:, None], self.ey - self.ply[:, None]
+        distance = np.hypot(dx, dy)
+        self.eslow_t -= dt
+        step = self.espd * np.where(self.eslow_t > 0, 0.5, 1.0) * dt
+        reach = self.erad + PLAYER_RADIUS
+        move = np.minimum(step, np.maximum(distance - reach, 0)) / np.maximum(distance, 1e-9)
+        move *= self.alive
+        self.ex -= dx * move
+        self.ey -= dy * move
+        dx, dy = dx * (1 - move), dy * (1 - move)
+        distance = np.hypot(dx, dy)
+
+        # Contact damage: the hardest hitter lands, then invulnerability frames (Player.takeDmg)
+        touching = self.alive & (distance <= reach + 1)
+        attack = np.where(touching, self.eatk, 0).max(axis=1)
+        self.invuln -= dt
+        hit = ~self.done & (attack > 0) & (self.invuln <= 0)
+        taken = attack * (1 - self.dmg_reduce) * (1 - np.minimum(0.65, self.armor * 0.025))
+        self.hp -= np.where(hit, taken, 0)
+        self.invuln[hit] = INVULN
+
+        self._fire(dx, dy, distance)
+        self._projectiles()
+        self._zones()
+
+        # Kills, XP and time-to-kill
+        killed = self.alive & (self.ehp <= 0)
+        if killed.any():
+            rows, cols = np.nonzero(killed)
+            gained = np.bincount(rows, weights=self.exp[rows, cols], minlength=len(self.hp)) * self.xp_mult
+            self.xp += gained
+            self.gained[:, min(int(t // BUCKET), self.gained.shape[1] - 1)] += gained
+            self.kills += np.bincount(rows, minlength=len(self.hp))
+            types = self.etype[rows, cols]
+            np.add.at(self.ttk_sum, (rows, types), t - self.ebirth[rows, cols])
+            np.add.at(self.ttk_count, (rows, types), 1)
+            boss_rows = rows[types == len(self.types) - 1]
+            self.victory_time[boss_rows] = t
+            self.boss_ttk[boss_rows] = t - self.ebirth[boss_rows, cols[types == len(self.types) - 1]]
+            self.done[boss_rows] = True
+            self.alive &= ~killed
+        self._level_up()
+
+        self.hp = np.minimum(self.max_hp, self.hp + self.regen * dt)
+        died = ~self.done & (self.hp <= 0)
+        self.death_time[died] = t
+        self.done |= died
+        self.alive &= ~self.done[:, None]
+        self.palive &= ~self.done[:, None]
+        self.zalive &= ~self.done[:, None]
+        self.t += dt
+
+    def run(self):
+        while self.t < self.duration and not self.done.all():
+            self.step()
+        return self
+
+
+def summarize(sim: BalanceSim, rows) -> dict:
+    """Mean metrics over the given runs of a finished simulation"""
+    rows = np.asarray(rows)
+    ttk_n = sim.ttk_count[rows].sum(axis=0)
+    ttk = {name: round(float(total / n), 2)
+           for name, total, n in zip(sim.types, sim.ttk_sum[rows].sum(axis=0), ttk_n) if n}
+
+    def mean(values):
+        values = values[~np.isnan(values)]
+        return round(float(values.mean()), 1) if len(values) else None
+
+    return {
+        "runs": len(rows),
+        "victory": round(float((~np.isnan(sim.victory_time[rows])).mean()), 3),
+        "died": round(float((~np.isnan(sim.death_time[rows])).mean()), 3),
+        "victory_time": mean(sim.victory_time[rows]),
+        "death_time": mean(sim.death_time[rows]),
+        "boss_ttk": mean(sim.boss_ttk[rows]),
+        "ttk": ttk,
+        "final_level": round(float(sim.level[rows].mean()), 1),
+        "kills": round(float(sim.kills[rows].mean()), 1),
+        "dps": [round(float(v), 1) for v in sim.dealt[rows].mean(axis=0) / BUCKET],
+        "xp_per_min": [round(float(v), 1) for v in sim.gained[rows].mean(axis=0) * 60 / BUCKET],
+    }
+
+
+def simulate(weapon: str, books, runs: int = 16, seed: int = 0, game_data_path="game_data.json",
+             html_path="index.html", **options) -> dict:
+    """{book: summary} for `runs` runs of each weapon + book loadout, all in one batch"""
+    with open(game_data_path, encoding="utf-8") as f:
+        game_data = json.load(f)
+    books = list(books)
+    per_run = [book for book in books for _ in range(runs)]
+    sim = BalanceSim(game_data, weapon, per_run, seed=seed, config=client_config(html_path), **options).run()
+    return {book or "none": summarize(sim, range(i * runs, (i + 1) * runs)) for i, book in enumerate(books)}
+
+
+def _simulate_job(job):
+    weapon, books, runs, seed, options = job
+    start = time.perf_counter()
+    return weapon, simulate(weapon, books, runs, seed, **options), time.perf_counter() - start
+
+
+def sweep(weapons=None, books=None, runs: int = 16, seed: int = 0, jobs: int = None,
+          game_data_path="game_data.json", **options) -> dict:
+    """Every weapon x book combination; one process-pool job per weapon batches all its books"""
+    with open(game_data_path, encoding="utf-8") as f:
+        game_data = json.load(f)
+    weapons = weapons or list(game_data["WEAPONS"])
+    books = books or list(game_data["BOOKS"])
+    options = dict(options, game_data_path=game_data_path)
+    work = [(weapon, books, runs, seed + i, options) for i, weapon in enumerate(weapons)]
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for weapon, by_book, elapsed in pool.map(_simulate_job, work):
+            results[weapon] = by_book
+            print(f"  {weapon:<10} {len(books)} books x {runs} runs in {elapsed:.1f}s")
+    return results
+
+
+def print_table(results: dict):
+    print(f"\n  {'weapon':<10} {'book':<8} {'win':>5} {'died':>5} {'boss ttk':>9} {'level':>6} "
+          f"{'kills':>7} {'peak dps':>9} {'xp/min':>7}")
+    for weapon, by_book in results.items():
+        for book, s in by_book.items():
+            boss = f"{s['boss_ttk']:.0f}s" if s["boss_ttk"] is not None else "-"
+            print(f"  {weapon:<10} {book:<8} {s['victory']:>5.0%} {s['died']:>5.0%} {boss:>9} "
+                  f"{s['final_level']:>6.1f} {s['kills']:>7.0f} {max(s['dps']):>9.1f} "
+                  f"{np.mean([v for v in s['xp_per_min'] if v]) if any(s['xp_per_min']) else 0:>7.1f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulate whole runs to compare weapon and book balance")
+    parser.add_argument("--weapon", nargs="+", help="weapon ids (default: all)")
+    parser.add_argument("--book", nargs="+", help="book ids, or 'none' (default: all)")
+    parser.add_argument("--sweep", action="store_true", help="every weapon x book combination")
+    parser.add_argument("--runs", type=int, default=16, help="Monte Carlo runs per loadout")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes")
+    parser.add_argument("--duration", type=float, default=DURATION, help="run length cap in seconds")
+    parser.add_argument("--dt", type=float, default=DT, help="seconds per tick")
+    parser.add_argument("--character", help="CHARACTERS id for base stats (default: plain stats)")
+    parser.add_argument("--stand", action="store_true", help="player stands still instead of kiting")
+    parser.add_argument("--out", help="write the full results (curves included) as JSON")
+    args = parser.parse_args()
+
+    print("\n--- Simulating Balance ---\n")
+    start = time.perf_counter()
+    books = [None if b == "none" else b for b in args.book] if args.book else None
+    options = {"duration": args.duration, "dt": args.dt, "character": args.character, "kite": not args.stand}
+    if args.sweep or not args.weapon or len(args.weapon) > 1:
+        results = sweep(args.weapon, books, args.runs, args.seed, args.jobs, **options)
+    else:
+        results = {args.weapon[0]: simulate(args.weapon[0], books or [None], args.runs, args.seed, **options)}
+    print_table(results)
+    print(f"\n  {sum(len(b) for b in results.values()) * args.runs} runs in {time.perf_counter() - start:.1f}s")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+        print(f"  Results saved to: {args.out}")
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the asset generator with JSON baselines and regression thresholds
+Measures wall time, assets/second and peak traced memory (tracemalloc: Python and
+NumPy allocations, not Pillow's internal buffers) for each generate_assets.py
+stage and for the full build at several asset-count scales. Gemini is replaced by
+gemini_client.FakeImageModel with no latency, so the numbers reflect local work only.
+Every run happens in a scratch directory; the real assets/ tree is never touched.
+
+    python benchmark_assets.py                   # compare against the baseline
+    python benchmark_assets.py --save-baseline   # record a new baseline
+
+Baselines are machine-specific; record one on the machine that runs the check. Wall
+time is only compared when the CPU count and architecture match the baseline's (the
+parallel stages scale with cores); peak memory is compared everywhere.
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BASELINE_PATH = Path("benchmark_baseline.json")
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_THRESHOLD = 0.25
+# Differences smaller than these are timer and allocator noise, never regressions
+NOISE_FLOOR = {"wall_s": 0.01, "peak_bytes": 64 * 1024}
+# Environment fields that must match the baseline for wall times to be comparable
+HARDWARE_KEYS = ("machine", "cpus")
+GAME_DATA_PATH = Path("game_data.json").resolve()
+
+
+def _generator():
+    import generate_assets
+
+    return generate_assets
+
+
+def scaled_prompts(prompts: dict, scale: int) -> dict:
+    """ASSET_PROMPTS repeated `scale` times under distinct names and prompts"""
+    if scale == 1:
+        return prompts
+    return {
+        category: {
+            f"{name}_{i}": dict(info, prompt=f"{info['prompt']} (variant {i})")
+            for i in range(scale) for name, info in assets.items()
+        }
+        for category, assets in prompts.items()
+    }
+
+
+# Each stage takes a scale and returns how many assets it produced
+
+def stage_fallback_sprite(scale: int) -> int:
+    ga = _generator()
+    count = 0
+    for i in range(scale):
+        for category, assets in ga.ASSET_PROMPTS.items():
+            for name, info in assets.items():
+                ga.create_fallback_sprite(name, info["size"], category, seed=i)
+                count += 1
+    return count
+
+
+def stage_enhanced_pixel_sprites(scale: int) -> int:
+    ga = _generator()
+    return sum(len(ga.create_enhanced_pixel_sprites()) for _ in range(scale))
+
+
+def stage_enemy_sprites(scale: int) -> int:
+    ga = _generator()
+    return sum(len(ga.create_enemy_sprites(str(GAME_DATA_PATH))) for _ in range(scale))
+
+
+def stage_pickup_sprites(scale: int) -> int:
+    ga = _generator()
+    return sum(len(ga.create_pickup_sprites()) for _ in range(scale))
+
+
+def stage_background_tile(scale: int) -> int:
+    ga = _generator()
+    for i in range(scale):
+        ga.create_background_tile(seed=i)
+    return scale
+
+
+def stage_generate_all_assets(scale: int) -> int:
+    from gemini_client import FakeImageModel, GeminiClient
+
+    ga = _generator()
+    client = GeminiClient(model=FakeImageModel(latency=0.0, jitter=0.0, image_size=256, seed=0))
+    prompts = scaled_prompts(ga.ASSET_PROMPTS, scale)
+    ga.generate_all_assets(client=client, force=True, rate=1e6, workers=8,
+                           response_cache_dir=Path(".cache") / "gemini", prompts=prompts)
+    return sum(len(assets) for assets in prompts.values())
+
+
+def stage_full_build(scale: int) -> int:
+    return sum(stage(scale) for name, stage in STAGES.items() if name != "full_build")
+
+
+STAGES = {
+    "fallback_sprite": stage_fallback_sprite,
+    "enhanced_pixel_sprites": stage_enhanced_pixel_sprites,
+    "enemy_sprites": stage_enemy_sprites,
+    "pickup_sprites": stage_pickup_sprites,
+    "background_tile": stage_background_tile,
+    "generate_all_assets": stage_generate_all_assets,
+    "full_build": stage_full_build,
+}
+
+
+@contextlib.contextmanager
+def scratch_dir():
+    """Run inside a throwaway working directory with stdout silenced"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="asset-bench-") as tmp:
+        os.chdir(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield Path(tmp)
+        finally:
+            os.chdir(cwd)
+
+
+def measure(stage, scale: int, repeat: int = 5) -> dict:
+    """Best wall time over `repeat` untraced runs, then one traced run for peak memory"""
+    # Warm-up pays for lazy imports and first-call caches outside the timed runs
+    with scratch_dir():
+        count = stage(scale)
+
+    best = float("inf")
+    for _ in range(repeat):
+        with scratch_dir():
+            start = time.perf_counter()
+            count = stage(scale)
+            best = min(best, time.perf_counter() - start)
+
+    with scratch_dir():
+        tracemalloc.start()
+        try:
+            stage(scale)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "assets": count,
+        "wall_s": round(best, 4),
+        "assets_per_s": round(count / best, 1) if best else None,
+        "peak_bytes": peak,
+    }
+
+
+def run_suite(stages=None, scales=DEFAULT_SCALES, repeat: int = 5) -> dict:
+    results = {}
+    for name in stages or STAGES:
+        for scale in scales:
+            # Large scales are long enough to be stable with a single timed run
+            runs = 1 if scale >= 100 else repeat
+            result = measure(STAGES[name], scale, runs)
+            results[f"{name}@{scale}x"] = result
+            print(f"  {name + '@' + str(scale) + 'x':<30} {result['wall_s']:>9.3f}s "
+                  f"{result['assets_per_s']:>10,.1f} assets/s {result['peak_bytes'] / 1e6:>9.1f} MB peak")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+            metrics=("wall_s", "peak_bytes")) -> list:
+    """Human-readable regressions past the threshold (slower or more memory)"""
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        for metric in metrics:
+            before, after = reference[metric], current[metric]
+            if before and after > before * (1 + threshold) and after - before > NOISE_FLOOR[metric]:
+                regressions.append(f"{key} {metric}: {before:,} -> {after:,} (+{after / before - 1:.0%})")
+    return regressions
+
+
+def environment() -> dict:
+    return {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def load_baseline(path=BASELINE_PATH) -> dict:
+    if not Path(path).exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results: dict, path=BASELINE_PATH):
+    data = dict(environment(), created=time.strftime("%Y-%m-%dT%H:%M:%S"), results=results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the asset generator stages")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="default: all stages")
+    parser.add_argument("--scales", nargs="+", type=int, default=list(DEFAULT_SCALES))
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per measurement (best is kept)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown / memory growth before failing (0.25 = 25%%)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save-baseline", action="store_true", help="record this run as the new baseline")
+    args = parser.parse_args()
+
+    print("\n--- Benchmarking Asset Generator ---\n")
+    results = run_suite(args.stages, args.scales, args.repeat)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\n  Baseline saved to: {args.baseline}")
+        sys.exit(0)
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"\n  No baseline at {args.baseline}; run with --save-baseline to record one")
+        sys.exit(0)
+    recorded = {k: baseline.get(k) for k in environment()}
+    if recorded != environment():
+        print(f"\n  Warning: baseline was recorded on {recorded}, this is {environment()}")
+    metrics = ("wall_s", "peak_bytes")
+    if any(recorded[k] != environment()[k] for k in HARDWARE_KEYS):
+        metrics = ("peak_bytes",)
+        print("  Wall times are not comparable across hardware; checking peak memory only "
+              "(record a baseline here with --save-baseline)")
+
+    regressions = compare(results, baseline["results"], args.threshold, metrics)
+    for line in regressions:
+        print(f"  REGRESSION {line}")
+    print(f"\n  {len(regressions)} regressions past {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
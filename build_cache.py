@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Content-addressed incremental build cache for the asset generator
+Each generated asset is keyed by a hash of everything that can change its pixels:
+prompt, target size, generator version, generator mode and the fallback drawing code.
+Keys and output hashes live in assets/manifest.json next to the existing entries.
+When a Gemini request fails and the asset falls back, the attempted key is kept as a
+negative entry so the next builds don't retry the API for it until RETRY_FAILED_AFTER.
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+
+RETRY_FAILED_AFTER = 24 * 3600   # seconds before a failed build key is attempted again
+
+
+def hash_bytes(data: bytes) -> str:
+    """SHA-256 hex digest of a byte string"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path) -> str:
+    """SHA-256 hex digest of a file's contents"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def asset_key(category: str, name: str, info: dict, generator: str, version: str, code: str) -> str:
+    """Build key for one ASSET_PROMPTS entry"""
+    payload = json.dumps({
+        "category": category,
+        "name": name,
+        "prompt": info["prompt"],
+        "size": list(info["size"]),
+        "generator": generator,
+        "version": version,
+        "code": code,
+    }, sort_keys=True)
+    return hash_bytes(payload.encode("utf-8"))
+
+
+class BuildCache:
+    """Build keys recorded inside the asset manifest"""
+
+    def __init__(self, manifest_path):
+        self.manifest_path = Path(manifest_path)
+        self.manifest = {"version": "1.0", "assets": {}}
+        if self.manifest_path.exists():
+            try:
+                with open(self.manifest_path, encoding="utf-8") as f:
+                    self.manifest = json.load(f)
+            except (OSError, ValueError):
+                print(f"Warning: could not read {self.manifest_path}, starting a fresh manifest")
+        self.manifest.setdefault("assets", {})
+        self.dirty = False
+
+    def entry(self, category: str, name: str) -> dict:
+        return self.manifest["assets"].get(category, {}).get(name, {})
+
+    def failed_recently(self, category: str, name: str, key: str) -> bool:
+        """True if building from this key failed less than RETRY_FAILED_AFTER seconds ago"""
+        failed = self.entry(category, name).get("failed", {})
+        return failed.get("hash") == key and time.time() - failed.get("at", 0) < RETRY_FAILED_AFTER
+
+    def is_fresh(self, category: str, name: str, key: str, output_path) -> bool:
+        """True if the output exists, was built from this key (or is the fallback for a recent
+        failed attempt at it) and was not modified since"""
+        entry = self.entry(category, name)
+        if entry.get("hash") != key and not self.failed_recently(category, name, key):
+            return False
+        output_path = Path(output_path)
+        if not output_path.exists():
+            return False
+        return entry.get("sha256") == hash_file(output_path)
+
+    def record(self, category: str, name: str, key: str, output_path, attempted: str = None, **fields):
+        """Store the key and output hash for a freshly built asset
+
+        `attempted` is the key of a build that failed and fell back to `key`.
+        """
+        entry = self.manifest["assets"].setdefault(category, {}).setdefault(name, {})
+        entry.update(fields)
+        entry["hash"] = key
+        if attempted:
+            entry["failed"] = {"hash": attempted, "at": int(time.time())}
+        else:
+            entry.pop("failed", None)
+        entry["sha256"] = hash_file(output_path)
+        self.dirty = True
+
+    def save(self):
+        """Write the manifest, preserving entries this build does not manage"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        self.dirty = False
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Lightweight build instrumentation: timed spans written as JSON lines
+Each span records its name, start time, duration, any fields the caller attached
+(asset, bytes, outcome, ...) and the exception if it failed. Lines are appended as
+spans finish, so a crashed build still leaves its log behind.
+
+    python build_trace.py .cache/build_trace.jsonl   # summarize the last run
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+TRACE_PATH = Path(".cache") / "build_trace.jsonl"
+PROFILE_PATH = Path(".cache") / "build_profile.prof"
+
+
+class Tracer:
+    """Thread-safe span recorder; with path=None spans are only kept in memory"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.run = uuid.uuid4().hex[:12]
+        self.spans = []
+        self.lock = threading.Lock()
+        self.file = None
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.path, "a", encoding="utf-8")
+
+    def _write(self, record: dict):
+        with self.lock:
+            self.spans.append(record)
+            if self.file:
+                self.file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                self.file.flush()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **fields):
+        """Time a block; the yielded dict can be updated with more fields before it closes"""
+        record = {"run": self.run, "span": name, "start": round(time.time(), 6), **fields}
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self._write(record)
+
+    def event(self, name: str, **fields):
+        """Record a zero-duration span, e.g. an asset skipped by the build cache"""
+        self._write({"run": self.run, "span": name, "start": round(time.time(), 6), "ms": 0.0, **fields})
+
+    def summary(self) -> dict:
+        return summarize(self.spans)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def summarize(spans) -> dict:
+    """{span name: count, total/p50/max ms, bytes, outcomes, errors}"""
+    groups = {}
+    for record in spans:
+        groups.setdefault(record["span"], []).append(record)
+
+    summary = {}
+    for name, records in groups.items():
+        durations = sorted(r["ms"] for r in records)
+        outcomes = {}
+        for r in records:
+            if "outcome" in r:
+                outcomes[r["outcome"]] = outcomes.get(r["outcome"], 0) + 1
+        summary[name] = {
+            "count": len(records),
+            "total_ms": round(sum(durations), 3),
+            "p50_ms": durations[len(durations) // 2],
+            "max_ms": durations[-1],
+            "bytes": sum(r.get("bytes", 0) for r in records),
+            "outcomes": outcomes,
+            "errors": sum(1 for r in records if "error" in r),
+        }
+    return summary
+
+
+def print_summary(summary: dict):
+    print(f"\n  {'span':<16} {'count':>6} {'total ms':>11} {'p50 ms':>9} {'max ms':>9} {'bytes':>12}  outcomes")
+    for name, s in sorted(summary.items(), key=lambda item: item[1]["total_ms"], reverse=True):
+        outcomes = ", ".join(f"{k}={v}" for k, v in sorted(s["outcomes"].items()))
+        if s["errors"]:
+            outcomes = f"{outcomes}, errors={s['errors']}".lstrip(", ")
+        print(f"  {name:<16} {s['count']:>6} {s['total_ms']:>11.1f} {s['p50_ms']:>9.2f} "
+              f"{s['max_ms']:>9.2f} {s['bytes']:>12,}  {outcomes}")
+
+
+def load_run(path=TRACE_PATH, run: str = None) -> list:
+    """Spans of one run from a trace log (the last run by default)"""
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not records:
+        return []
+    run = run or records[-1]["run"]
+    return [r for r in records if r["run"] == run]
+
+
+@contextlib.contextmanager
+def profiled(path=PROFILE_PATH, top: int = 25):
+    """cProfile the block, dump stats to path and print the hottest functions
+
+    The .prof file opens in snakeviz, or flameprof/gprof2dot for a flame graph.
+    """
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(os.fspath(path))
+        print(f"\n  Profile saved to: {path}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize a build trace log")
+    parser.add_argument("path", nargs="?", default=str(TRACE_PATH))
+    parser.add_argument("--run", help="run id (default: the last run in the log)")
+    args = parser.parse_args()
+
+    spans = load_run(args.path, args.run)
+    if spans:
+        print(f"  Run {spans[0]['run']}: {len(spans)} spans")
+        print_summary(summarize(spans))
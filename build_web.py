@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Build the web client into dist/ with content-hashed, minified bundles
+index.html is split into styles.<hash>.css, data.<hash>.js (the pure-literal data
+tables: CONFIG, WEAPONS, ENEMIES, ...) and game.<hash>.js. Every referenced asset is
+copied to a content-hashed path after applying the dedupe rewrite map, so a tweak
+to the game logic no longer invalidates the data, the styles or any sprite. Only the
+small index.html has to be revalidated; everything else can be cached forever.
+
+Optional inputs from earlier stages, used when present:
+- assets/dedupe_report.json: duplicate paths point at their canonical copy
+- assets/font/*.subset.woff2: @font-face rules use the subset fonts
+- assets/atlas/atlas_index.json (with --atlas): packed sprites load from atlas pages
+
+dist/ is what the Pages workflows deploy; STATIC_PAGES are copied alongside.
+
+    python build_web.py            # writes dist/
+    python build_web.py --atlas    # also serve packed sprites from the atlases
+"""
+
+import json
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from build_cache import hash_bytes
+
+DIST_DIR = Path("dist")
+MANIFEST_NAME = "build_manifest.json"
+HASH_LENGTH = 10
+DEDUPE_REPORT = Path("assets") / "dedupe_report.json"
+ATLAS_INDEX = Path("assets") / "atlas" / "atlas_index.json"
+# Standalone pages published next to the game, copied as-is under their own URLs
+STATIC_PAGES = ("tiny_swords_game.html",)
+
+# Whitespace next to these never matters in JS ('+', '-', '/' and '.' are left alone)
+JS_TIGHT = set("{}()[];,:=<>!?&|*%^~")
+# A newline after these can never end a statement early
+JS_JOIN_AFTER = set("{;,")
+REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^")
+REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw"}
+LITERAL_WORDS = {"true", "false", "null", "undefined", "Infinity", "NaN"}
+CSS_TIGHT = set("{};,>")
+
+ASSET_REF = re.compile(r"""'(assets/[^'\n]+)'|"(assets/[^"\n]+)"|`(assets/[^`$\n]+)`|url\((assets/[^)'"\n]+)\)""")
+INLINE_BLOCK = re.compile(r"<(script|style)>(.*?)</\1>", re.S)
+CACHE_BUSTER = re.compile(r"""'\?v=' \+ Date\.now\(\)""")
+FONT_FACE_SRC = re.compile(r"""url\('(assets/font/[^']+)\.ttf'\) format\('truetype'\)""")
+
+# Injected after game.js with --atlas: packed sprites become canvases cut from a shared atlas page
+ATLAS_SHIM = """(() => {
+    const frames = window.ASSET_ATLAS || {};
+    const pages = {};
+    const load = AssetLoader.prototype.loadImage;
+    AssetLoader.prototype.loadImage = function (name, src) {
+        const frame = frames[src];
+        if (!frame) return load.call(this, name, src);
+        pages[frame.atlas] = pages[frame.atlas] || load.call({ images: {} }, frame.atlas, frame.atlas);
+        return pages[frame.atlas].then(page => {
+            const canvas = document.createElement('canvas');
+            canvas.width = frame.w;
+            canvas.height = frame.h;
+            canvas.getContext('2d').drawImage(page, frame.x, frame.y, frame.w, frame.h, 0, 0, frame.w, frame.h);
+            this.images[name] = canvas;
+            return canvas;
+        });
+    };
+})();
+"""
+
+
+# ---------------------------------------------------------------- JS tokenizer
+
+def _skip_quoted(src: str, i: int) -> int:
+    """Index after the string literal opening at i"""
+    quote, i = src[i], i + 1
+    while i < len(src):
+        if src[i] == "\\":
+            i += 2
+        elif src[i] == quote or src[i] == "\n":
+            return i + 1
+        else:
+            i += 1
+    return i
+
+
+def _skip_template(src: str, i: int) -> int:
+    """Index after the template literal opening at i, including nested ${...} code"""
+    i += 1
+    while i < len(src):
+        if src[i] == "\\":
+            i += 2
+        elif src[i] == "`":
+            return i + 1
+        elif src.startswith("${", i):
+            i = _skip_code(src, i + 2)
+        else:
+            i += 1
+    return i
+
+
+def _skip_code(src: str, i: int) -> int:
+    """Index after the '}' closing a template expression that starts at i"""
+    depth = 0
+    for kind, start, end in js_tokens(src, i):
+        if kind == "punct" and src[start] == "{":
+            depth += 1
+        elif kind == "punct" and src[start] == "}":
+            if depth == 0:
+                return end
+            depth -= 1
+    return len(src)
+
+
+def _skip_regex(src: str, i: int):
+    """Index after the regex literal opening at i, or None if it is really a division"""
+    i += 1
+    in_class = False
+    while i < len(src):
+        c = src[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "\n":
+            return None
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            i += 1
+            while i < len(src) and (src[i].isalnum() or src[i] == "_"):
+                i += 1
+            return i
+        i += 1
+    return None
+
+
+def js_tokens(src: str, i: int = 0):
+    """Yield (kind, start, end) for space, comment, string, regex, word and punct tokens"""
+    n = len(src)
+    previous = None  # last significant token as (kind, text), for regex detection
+    while i < n:
+        c = src[i]
+        if c.isspace():
+            end = i + 1
+            while end < n and src[end].isspace():
+                end += 1
+            kind = "space"
+        elif src.startswith("//", i):
+            end = src.find("\n", i)
+            end = n if end == -1 else end
+            kind = "comment"
+        elif src.startswith("/*", i):
+            end = src.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            kind = "comment"
+        elif c in "'\"":
+            end, kind = _skip_quoted(src, i), "string"
+        elif c == "`":
+            end, kind = _skip_template(src, i), "template"
+        elif c.isalnum() or c in "_$":
+            end = i + 1
+            while end < n and (src[end].isalnum() or src[end] in "_$"):
+                end += 1
+            kind = "word"
+        else:
+            end, kind = i + 1, "punct"
+            if c == "/" and (previous is None or (previous[0] == "punct" and previous[1] in REGEX_AFTER)
+                             or (previous[0] == "word" and previous[1] in REGEX_KEYWORDS)):
+                regex_end = _skip_regex(src, i)
+                if regex_end is not None:
+                    end, kind = regex_end, "regex"
+        if kind not in ("space", "comment"):
+            previous = (kind, src[i:end])
+        yield kind, i, end
+        i = end
+
+
+def minify_js(src: str) -> str:
+    """Drop comments and collapse whitespace; newlines are kept wherever ASI could need them"""
+    out = []
+    pending = None  # None, " " or "\n" for the whitespace run before the next token
+    for kind, start, end in js_tokens(src):
+        text = src[start:end]
+        if kind in ("space", "comment"):
+            if "\n" in text or pending == "\n":
+                pending = "\n"
+            elif kind == "space" or pending is None:
+                pending = pending or " "
+            continue
+        if pending and out:
+            last, first = out[-1][-1], text[0]
+            if pending == "\n" and last not in JS_JOIN_AFTER:
+                out.append("\n")
+            elif pending == " " and last not in JS_TIGHT and first not in JS_TIGHT:
+                out.append(" ")
+        pending = None
+        out.append(text)
+    return "".join(out) + "\n"
+
+
+def minify_css(src: str) -> str:
+    """Drop comments, collapse whitespace and trim it around braces, ';', ',', '>' and after ':'"""
+    out = []
+    i, n = 0, len(src)
+    while i < n:
+        c = src[i]
+        if src.startswith("/*", i):
+            end = src.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if c in "'\"":
+            end = _skip_quoted(src, i)
+            out.append(src[i:end])
+            i = end
+            continue
+        if c.isspace():
+            while i < n and src[i].isspace():
+                i += 1
+            if out and out[-1][-1] not in CSS_TIGHT and out[-1][-1] != ":" and i < n and src[i] not in CSS_TIGHT:
+                out.append(" ")
+            continue
+        if c == "}" and out and out[-1] == ";":
+            out.pop()
+        if c in CSS_TIGHT and out and out[-1] == " ":
+            out.pop()
+        out.append(c)
+        i += 1
+    return "".join(out).strip() + "\n"
+
+
+def minify_html(src: str) -> str:
+    """Strip indentation and blank lines (the page has no <pre> or <textarea>)"""
+    return "\n".join(line.strip() for line in src.splitlines() if line.strip()) + "\n"
+
+
+# ------------------------------------------------------------- data tables
+
+def _literal_table(src: str, tokens: list, names: set) -> bool:
+    """True if the tokens form a pure data literal (no calls, functions or unknown identifiers)"""
+    significant = [(kind, src[s:e]) for kind, s, e in tokens if kind not in ("space", "comment")]
+    for index, (kind, text) in enumerate(significant):
+        if kind in ("template", "regex") or (kind == "punct" and text == "("):
+            return False
+        if kind != "word" or text[0].isdigit() or text in LITERAL_WORDS or text in names:
+            continue
+        following = significant[index + 1][1] if index + 1 < len(significant) else ""
+        preceding = significant[index - 1][1] if index else ""
+        if following != ":" and preceding != ".":
+            return False
+    return True
+
+
+def extract_data_tables(script: str):
+    """Split top-level `const NAME = {...};` / `[...]` literals out of a script
+
+    Returns (data script, remaining script, table names). Tables keep their order;
+    top-level const bindings are shared between classic scripts, so the game code
+    still sees them once data.js is loaded first.
+    """
+    tokens = list(js_tokens(script))
+    significant = [t for t in tokens if t[0] not in ("space", "comment")]
+    position = {t[1]: i for i, t in enumerate(tokens)}
+    tables, names, depth = [], set(), 0
+    i = 0
+    while i < len(significant):
+        kind, start, end = significant[i]
+        text = script[start:end]
+        if (depth == 0 and text == "const" and i + 3 < len(significant)
+                and re.fullmatch(r"[A-Z][A-Z0-9_]*", script[significant[i + 1][1]:significant[i + 1][2]])
+                and script[significant[i + 2][1]:significant[i + 2][2]] == "="
+                and script[significant[i + 3][1]:significant[i + 3][2]] in "{["):
+            name = script[significant[i + 1][1]:significant[i + 1][2]]
+            inner = 0
+            for j in range(i + 3, len(significant)):
+                char = script[significant[j][1]:significant[j][2]]
+                if significant[j][0] == "punct" and char in "{[(":
+                    inner += 1
+                elif significant[j][0] == "punct" and char in "}])":
+                    inner -= 1
+                    if inner == 0:
+                        break
+            close = j + 1 if j + 1 < len(significant) and script[significant[j + 1][1]] == ";" else j
+            body = tokens[position[significant[i + 3][1]]:position[significant[j][1]] + 1]
+            if _literal_table(script, body, names):
+                tables.append((name, start, significant[close][2]))
+                names.add(name)
+                i = close + 1
+                continue
+        if kind == "punct" and text in "{[(":
+            depth += 1
+        elif kind == "punct" and text in "}])":
+            depth -= 1
+        i += 1
+
+    data, rest, cursor = [], [], 0
+    for name, start, end in tables:
+        rest.append(script[cursor:start])
+        data.append(script[start:end])
+        cursor = end
+    rest.append(script[cursor:])
+    return "\n\n".join(data) + "\n", "".join(rest), [name for name, _, _ in tables]
+
+
+# ------------------------------------------------------------------- assets
+
+def hashed_name(path: str, data: bytes) -> str:
+    """assets/enemies/bat.png -> assets/enemies/bat.<hash>.png"""
+    p = Path(path)
+    return (p.parent / f"{p.stem}.{hash_bytes(data)[:HASH_LENGTH]}{p.suffix}").as_posix()
+
+
+def asset_refs(text: str) -> set:
+    return {next(g for g in m.groups() if g) for m in ASSET_REF.finditer(text)}
+
+
+def rewrite_asset_refs(text: str, mapping: dict) -> str:
+    """Replace every quoted or url() asset path found in mapping"""
+    def replace(match):
+        group = next(i for i, g in enumerate(match.groups(), 1) if g)
+        ref = match.group(group)
+        if ref not in mapping:
+            return match.group(0)
+        s, e = match.span(group)
+        whole = match.group(0)
+        return whole[:s - match.start()] + mapping[ref] + whole[e - match.start():]
+    return ASSET_REF.sub(replace, text)
+
+
+def use_subset_fonts(css: str) -> str:
+    """Point @font-face rules at the subset fonts from font_subset.py when they exist"""
+    def replace(match):
+        for flavor in ("woff2", "woff"):
+            subset = Path(f"{match.group(1)}.subset.{flavor}")
+            if subset.exists():
+                return f"url('{subset.as_posix()}') format('{flavor}')"
+        return match.group(0)
+    return FONT_FACE_SRC.sub(replace, css)
+
+
+def atlas_frames(index_path=ATLAS_INDEX) -> dict:
+    """{source path: {atlas, x, y, w, h}} for untrimmed frames (the shim draws whole frames)"""
+    index_path = Path(index_path)
+    with open(index_path, encoding="utf-8") as f:
+        index = json.load(f)
+    frames = {}
+    for page in index["atlases"]:
+        with open(index_path.parent / Path(page["image"]).with_suffix(".json"), encoding="utf-8") as f:
+            page_frames = json.load(f)["frames"]
+        for name, frame in page_frames.items():
+            if not frame["trimmed"]:
+                frames[name] = {"atlas": (index_path.parent / page["image"]).as_posix(), **frame["frame"]}
+    return frames
+
+
+# -------------------------------------------------------------------- build
+
+def _clean_dist(dist: Path):
+    """Empty a previous build; refuses to delete a directory this script did not write"""
+    if dist.exists():
+        if any(dist.iterdir()) and not (dist / MANIFEST_NAME).exists():
+            raise RuntimeError(f"{dist} exists and is not a build_web output; pick another --out")
+        shutil.rmtree(dist)
+    dist.mkdir(parents=True)
+
+
+def build_web(html_path="index.html", dist=DIST_DIR, atlas: bool = False, minify: bool = True) -> dict:
+    """Write dist/ and return its build manifest"""
+    print("\n--- Building Web Client ---\n")
+    start = time.perf_counter()
+    dist = Path(dist)
+    html = Path(html_path).read_text(encoding="utf-8")
+    original_bytes = len(html.encode("utf-8"))
+
+    # Duplicates point at their canonical copy before anything is hashed
+    if DEDUPE_REPORT.exists():
+        from dedupe_assets import rewrite_references
+        with open(DEDUPE_REPORT, encoding="utf-8") as f:
+            html = rewrite_references(html, json.load(f).get("rewrite", {}))
+    html = use_subset_fonts(html)
+
+    _clean_dist(dist)
+    files = {}
+
+    def emit(name: str, text: str, source: str) -> str:
+        data = text.encode("utf-8")
+        path = hashed_name(name, data)
+        (dist / path).parent.mkdir(parents=True, exist_ok=True)
+        (dist / path).write_bytes(data)
+        files[path] = {"source": source, "bytes": len(data), "sha256": hash_bytes(data)}
+        return path
+
+    blocks = [(m.group(1), m.group(2), m.span()) for m in INLINE_BLOCK.finditer(html)]
+    frames = {}
+    if atlas:
+        frames = {ref: frame for ref, frame in atlas_frames().items() if ref in asset_refs(html)}
+        print(f"  {len(frames)} sprites served from atlas pages")
+
+    # Hash and copy every referenced asset that exists on disk
+    refs = sorted(asset_refs(html) | {f["atlas"] for f in frames.values()})
+    present = [ref for ref in refs if Path(ref).is_file() and ref not in frames]
+    mapping = {}
+
+    def copy(ref):
+        data = Path(ref).read_bytes()
+        path = hashed_name(ref, data)
+        (dist / path).parent.mkdir(parents=True, exist_ok=True)
+        (dist / path).write_bytes(data)
+        return ref, path, len(data), hash_bytes(data)
+
+    with ThreadPoolExecutor() as pool:
+        for ref, path, size, digest in pool.map(copy, present):
+            mapping[ref] = path
+            files[path] = {"source": ref, "bytes": size, "sha256": digest}
+    frames = {ref: dict(frame, atlas=mapping[frame["atlas"]]) for ref, frame in frames.items()}
+    missing = [ref for ref in refs if ref not in mapping and ref not in frames]
+
+    # Minify and hash the bundles, then splice their <link>/<script> tags into the page
+    replacements = []
+    style_no = script_no = 0
+    for tag, body, span in blocks:
+        if tag == "style":
+            style_no += 1
+            css = rewrite_asset_refs(body, mapping)
+            name = "styles.css" if style_no == 1 else f"styles-{style_no}.css"
+            path = emit(name, minify_css(css) if minify else css, f"{html_path}:<style>")
+            replacements.append((span, f'<link rel="stylesheet" href="{path}">'))
+            continue
+
+        script_no += 1
+        suffix = "" if script_no == 1 else f"-{script_no}"
+        script = rewrite_asset_refs(body, mapping)
+        # Hashed names make the per-load cache buster pointless; it only defeats caching
+        script, busters = CACHE_BUSTER.subn("''", script)
+        data_js, game_js, tables = extract_data_tables(script)
+        tags = []
+        if tables:
+            if frames:
+                data_js += f"\nwindow.ASSET_ATLAS = {json.dumps(frames, separators=(',', ':'))};\n"
+            path = emit(f"data{suffix}.js", minify_js(data_js) if minify else data_js, f"{html_path}:<script>")
+            tags.append(f'<script src="{path}"></script>')
+        path = emit(f"game{suffix}.js", minify_js(game_js) if minify else game_js, f"{html_path}:<script>")
+        tags.append(f'<script src="{path}"></script>')
+        if frames and script_no == 1:
+            tags.append(f'<script src="{emit("atlas.js", ATLAS_SHIM, "build_web.ATLAS_SHIM")}"></script>')
+        replacements.append((span, "\n".join(tags)))
+        print(f"  script {script_no}: {len(tables)} data tables split out ({', '.join(tables)}), "
+              f"{busters} cache busters removed")
+
+    page = html
+    for (s, e), replacement in sorted(replacements, reverse=True):
+        page = page[:s] + replacement + page[e:]
+    page = rewrite_asset_refs(page, mapping)
+    page = minify_html(page) if minify else page
+    (dist / "index.html").write_text(page, encoding="utf-8")
+    files["index.html"] = {"source": str(html_path), "bytes": len(page.encode("utf-8")),
+                           "sha256": hash_bytes(page.encode("utf-8"))}
+
+    for name in STATIC_PAGES:
+        if Path(name).is_file():
+            data = Path(name).read_bytes()
+            (dist / name).write_bytes(data)
+            files[name] = {"source": name, "bytes": len(data), "sha256": hash_bytes(data)}
+
+    manifest = {"entry": "index.html", "atlas": bool(frames), "files": files, "missing": missing}
+    with open(dist / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+
+    bundles = {p: e for p, e in files.items() if not e["source"].startswith("assets/")}
+    for path, entry in sorted(bundles.items()):
+        print(f"  {path:<32} {entry['bytes']:>9,} bytes")
+    print(f"\n  index.html {original_bytes:,} bytes -> {sum(e['bytes'] for e in bundles.values()):,} "
+          f"across {len(bundles)} files")
+    print(f"  {len(mapping)} assets copied with hashed names, {len(missing)} referenced paths missing")
+    print(f"  Built {dist}/ in {time.perf_counter() - start:.2f}s")
+    return manifest
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the web client into a content-hashed dist/")
+    parser.add_argument("--html", default="index.html")
+    parser.add_argument("--out", default=str(DIST_DIR))
+    parser.add_argument("--atlas", action="store_true", help=f"serve packed sprites from {ATLAS_INDEX.parent}")
+    parser.add_argument("--no-minify", action="store_true", help="split and hash only (easier debugging)")
+    args = parser.parse_args()
+
+    build_web(args.html, args.out, args.atlas, not args.no_minify)
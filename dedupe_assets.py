@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Exact and perceptual duplicate detection across the assets tree
+- Exact: files are bucketed by size, then only same-size files are hashed (in parallel).
+- Zips: archive members are matched to extracted files by (size, CRC-32) without decompressing.
+- Near: 64-bit dHash per image, looked up through a 4-band index (pigeonhole: any pair within
+  Hamming distance 3 shares a band), so candidates are never compared all-pairs.
+Emits a rewrite map {duplicate path: canonical path} for manifest and index.html references.
+"""
+
+import json
+import re
+import time
+import zipfile
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from build_cache import hash_file
+
+REPORT_PATH = Path("assets") / "dedupe_report.json"
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"}
+BANDS = 4
+# Transparent pixels are hashed as this color, so hidden RGB under alpha 0 doesn't count
+# and sprites that differ only in their alpha mask don't collide
+DHASH_BACKGROUND = (255, 0, 255)
+BAND_BITS = 64 // BANDS
+
+
+def scan_files(root) -> list:
+    return sorted(p for p in Path(root).rglob("*") if p.is_file())
+
+
+def exact_duplicates(paths, workers: int = 8) -> list:
+    """Groups of byte-identical files (each group sorted, groups sorted by wasted bytes)"""
+    by_size = defaultdict(list)
+    for path in paths:
+        by_size[path.stat().st_size].append(path)
+    candidates = [p for size, group in by_size.items() if len(group) > 1 and size > 0 for p in group]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        digests = dict(zip(candidates, pool.map(hash_file, candidates)))
+
+    by_hash = defaultdict(list)
+    for path, digest in digests.items():
+        by_hash[digest].append(path)
+    groups = [sorted(g) for g in by_hash.values() if len(g) > 1]
+    return sorted(groups, key=lambda g: g[0].stat().st_size * (len(g) - 1), reverse=True)
+
+
+def file_crc32(path) -> int:
+    crc = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def zip_coverage(paths, workers: int = 8) -> dict:
+    """For each zip, how many members already exist as extracted files on disk"""
+    zips = [p for p in paths if p.suffix.lower() == ".zip"]
+    members = {}
+    for zip_path in zips:
+        try:
+            with zipfile.ZipFile(zip_path) as zf:
+                members[zip_path] = [(i.filename, i.file_size, i.CRC) for i in zf.infolist() if not i.is_dir()]
+        except zipfile.BadZipFile:
+            print(f"  Warning: {zip_path} is not a valid zip")
+
+    wanted_sizes = {size for entries in members.values() for _, size, _ in entries}
+    by_size = defaultdict(list)
+    for path in paths:
+        if path.suffix.lower() != ".zip":
+            size = path.stat().st_size
+            if size in wanted_sizes:
+                by_size[size].append(path)
+
+    to_crc = [p for group in by_size.values() for p in group]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        crcs = dict(zip(to_crc, pool.map(file_crc32, to_crc)))
+    on_disk = defaultdict(list)
+    for path, crc in crcs.items():
+        on_disk[(path.stat().st_size, crc)].append(path)
+
+    report = {}
+    for zip_path, entries in members.items():
+        extracted = {name: on_disk[(size, crc)][0].as_posix()
+                     for name, size, crc in entries if (size, crc) in on_disk}
+        report[zip_path.as_posix()] = {
+            "members": len(entries),
+            "extracted": len(extracted),
+            "zip_bytes": zip_path.stat().st_size,
+            "fully_extracted": len(extracted) == len(entries),
+        }
+    return report
+
+
+def dhash(path) -> tuple:
+    """(path, 64-bit difference hash) of an image, or (path, None) if it cannot be decoded"""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            img.draft("RGB", (64, 64))
+            if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+                # PIL resizes RGBA with premultiplied alpha, so compositing the 9x8 result
+                # matches compositing the full image first
+                small = img.convert("RGBA").resize((9, 8), Image.BILINEAR)
+                small = Image.alpha_composite(Image.new("RGBA", small.size, DHASH_BACKGROUND + (255,)), small)
+            else:
+                small = img.convert("RGB").resize((9, 8), Image.BILINEAR)
+            small = small.convert("L")
+    except Exception:
+        return str(path), None
+    px = small.tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return str(path), bits
+
+
+def near_duplicates(paths, max_distance: int = 3, jobs: int = None, exclude=()) -> list:
+    """Pairs of visually similar images found through the band index
+
+    max_distance must be < BANDS for the band index to be exhaustive.
+    """
+    if max_distance >= BANDS:
+        raise ValueError(f"max_distance must be below {BANDS} for the band index to find every pair")
+    images = [p for p in paths if p.suffix.lower() in IMAGE_SUFFIXES and p not in exclude]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        hashes = {Path(p): h for p, h in pool.map(dhash, images, chunksize=32) if h is not None}
+
+    # Flat images (solid fills, empty frames) all hash to 0/all-ones and would match everything
+    flat = {0, (1 << 64) - 1}
+    index = defaultdict(list)
+    for path, h in hashes.items():
+        if h in flat:
+            continue
+        for band in range(BANDS):
+            index[(band, (h >> (band * BAND_BITS)) & ((1 << BAND_BITS) - 1))].append(path)
+
+    pairs = set()
+    for bucket in index.values():
+        for i, a in enumerate(bucket):
+            for b in bucket[i + 1:]:
+                distance = bin(hashes[a] ^ hashes[b]).count("1")
+                if distance <= max_distance:
+                    pairs.add((min(a, b), max(a, b), distance))
+    return sorted(pairs, key=lambda p: (p[2], str(p[0]), str(p[1])))
+
+
+def html_refs(html_path="index.html") -> set:
+    if not Path(html_path).exists():
+        return set()
+    text = Path(html_path).read_text(encoding="utf-8")
+    return set(re.findall(r"""['"`](assets/[^'"`]+?)['"`]""", text))
+
+
+def choose_canonical(group, referenced: set) -> Path:
+    """Prefer paths the game already references, then the shallowest, then alphabetical"""
+    return min(group, key=lambda p: (p.as_posix() not in referenced, len(p.parts), p.as_posix()))
+
+
+def rewrite_references(text: str, rewrite: dict) -> str:
+    """Point every duplicate path referenced in text at its canonical copy
+
+    Only whole quoted paths are replaced, matching the references html_refs finds, so a
+    duplicate that is a prefix of another path (a.png vs a.png.bak) is left alone.
+    """
+    if not rewrite:
+        return text
+    keys = "|".join(re.escape(k) for k in sorted(rewrite, key=len, reverse=True))
+    pattern = re.compile(f"""(?<=['"`])(?:{keys})(?=['"`])""")
+    return pattern.sub(lambda m: rewrite[m.group(0)], text)
+
+
+def dedupe(root="assets", html_path="index.html", max_distance: int = 3, jobs: int = None,
+           report_path=REPORT_PATH) -> dict:
+    print("\n--- Finding Duplicate Assets ---\n")
+    start = time.perf_counter()
+
+    paths = scan_files(root)
+    referenced = html_refs(html_path)
+
+    groups = exact_duplicates(paths)
+    rewrite = {}
+    wasted = 0
+    for group in groups:
+        canonical = choose_canonical(group, referenced)
+        for path in group:
+            if path != canonical:
+                rewrite[path.as_posix()] = canonical.as_posix()
+                wasted += path.stat().st_size
+
+    # Exact duplicates are already resolved; only hash one copy of each for the near pass
+    near = near_duplicates(paths, max_distance, jobs, exclude={Path(p) for p in rewrite})
+    zips = zip_coverage(paths)
+
+    report = {
+        "files": len(paths),
+        "exact_groups": [[p.as_posix() for p in g] for g in groups],
+        "redundant_bytes": wasted,
+        "near_duplicates": [{"a": a.as_posix(), "b": b.as_posix(), "distance": d} for a, b, d in near],
+        "zips": zips,
+        "zip_redundant_bytes": sum(z["zip_bytes"] for z in zips.values() if z["fully_extracted"]),
+        "rewrite": rewrite,
+    }
+    if report_path:
+        Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1, ensure_ascii=False)
+
+    print(f"  {len(paths)} files scanned in {time.perf_counter() - start:.1f}s")
+    print(f"  {len(groups)} exact duplicate groups, {wasted:,} redundant bytes")
+    print(f"  {len(near)} near-duplicate image pairs (dHash distance <= {max_distance})")
+    for zip_path, z in zips.items():
+        print(f"  {zip_path}: {z['extracted']}/{z['members']} members already extracted")
+    if report_path:
+        print(f"  Report saved to: {report_path}")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find exact and near-duplicate assets")
+    parser.add_argument("root", nargs="?", default="assets")
+    parser.add_argument("--html", default="index.html", help="references here win canonical selection")
+    parser.add_argument("--max-distance", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--report", default=str(REPORT_PATH))
+    args = parser.parse_args()
+
+    dedupe(args.root, args.html, args.max_distance, args.jobs, args.report)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Subset the PixelAE fonts to the glyphs the game actually shows, as WOFF2
+The text comes from game_data.json (every string value: names, descriptions, ...)
+and index.html (UI labels and script strings). Arabic letters are shaped by the
+font's GSUB init/medi/fina/rlig features, so the subset keeps every layout feature
+and fontTools pulls in the contextual forms and alternates those features reach.
+The presentation-form code points (U+FB50-U+FEFF) of every used letter are kept
+too. Arabic letters come from the scanned text only; a letter typed into a player
+name that the game never shows falls back to the next font in the CSS stack.
+
+Requires fontTools (pip install fonttools brotli); without it the stage is skipped
+with a warning and the original TTFs stay in use.
+"""
+
+import json
+import time
+import unicodedata
+from pathlib import Path
+
+FONT_DIR = Path("assets") / "font"
+FONTS = ("PixelAE-Regular.ttf", "PixelAE-Bold.ttf")
+REPORT_NAME = "subset.json"
+
+# Always kept: printable ASCII, Arabic comma/semicolon/question mark, Arabic-Indic digits and separators
+BASE_RANGES = [(0x20, 0x7E), (0x060C, 0x060C), (0x061B, 0x061F), (0x0660, 0x066C)]
+PRESENTATION_FORMS = [(0xFB50, 0xFDFF), (0xFE70, 0xFEFF)]
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def used_text(game_data_path="game_data.json", html_path="index.html") -> str:
+    """All text the client can draw: game_data.json strings plus the whole of index.html"""
+    with open(game_data_path, encoding="utf-8") as f:
+        game_data = json.load(f)
+    return "".join(_strings(game_data)) + Path(html_path).read_text(encoding="utf-8")
+
+
+def _base_letters(code: int) -> set:
+    """Letters a presentation form decomposes to, e.g. U+FEE3 (meem initial) -> {U+0645}"""
+    decomposition = unicodedata.decomposition(chr(code)).split()
+    return {int(part, 16) for part in decomposition if not part.startswith("<")}
+
+
+def used_codepoints(text: str) -> set:
+    """Code points in `text`, the always-kept ranges and matching Arabic presentation forms"""
+    codepoints = {ord(ch) for ch in text if ch.isprintable() or ch == " "}
+    for start, end in BASE_RANGES:
+        codepoints.update(range(start, end + 1))
+    for start, end in PRESENTATION_FORMS:
+        for code in range(start, end + 1):
+            letters = _base_letters(code)
+            if letters and letters <= codepoints:
+                codepoints.add(code)
+    return codepoints
+
+
+def subset_font(source, output, codepoints: set, flavor: str = "woff2") -> dict:
+    """Write one subset font; returns glyph and byte counts for the report"""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    options = subset.Options()
+    options.flavor = flavor
+    options.layout_features = ["*"]   # keep init/medi/fina/rlig and whatever they reach
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    options.hinting = False           # pixel outlines render the same without bytecode
+    options.desubroutinize = True     # compresses better under Brotli
+
+    font = TTFont(source)
+    available = set(font.getBestCmap())
+    glyphs_before = len(font.getGlyphOrder())
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints & available)
+    subsetter.subset(font)
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    subset.save_font(font, str(output), options)
+
+    return {
+        "source": Path(source).as_posix(),
+        "output": Path(output).as_posix(),
+        "glyphs": len(font.getGlyphOrder()),
+        "glyphs_before": glyphs_before,
+        "codepoints": len(codepoints & available),
+        "missing": sorted(f"U+{c:04X}" for c in codepoints - available if c > 0x7F),
+        "bytes": Path(output).stat().st_size,
+        "bytes_before": Path(source).stat().st_size,
+    }
+
+
+def flavor_available() -> str:
+    """'woff2' if Brotli is installed, 'woff' (zlib) otherwise, None without fontTools"""
+    from importlib.util import find_spec
+
+    if find_spec("fontTools") is None:
+        return None
+    return "woff2" if find_spec("brotli") is not None else "woff"
+
+
+def build_subsets(fonts=FONTS, font_dir=FONT_DIR, game_data_path="game_data.json",
+                  html_path="index.html", force: bool = False) -> dict:
+    """Subset every font in `fonts`; skipped when the fonts and the used text are unchanged"""
+    from build_cache import hash_bytes, hash_file
+
+    print("\n--- Subsetting Fonts ---\n")
+    flavor = flavor_available()
+    if flavor is None:
+        print("  Warning: fontTools is not installed (pip install fonttools brotli), keeping the full TTFs")
+        return {}
+    if flavor != "woff2":
+        print("  Warning: brotli is not installed, writing WOFF (zlib) instead of WOFF2")
+
+    start = time.perf_counter()
+    font_dir = Path(font_dir)
+    codepoints = used_codepoints(used_text(game_data_path, html_path))
+    report_path = font_dir / REPORT_NAME
+    previous = {}
+    if report_path.exists():
+        with open(report_path, encoding="utf-8") as f:
+            previous = json.load(f).get("fonts", {})
+
+    results = {}
+    for name in fonts:
+        source = font_dir / name
+        if not source.exists():
+            print(f"  Skipped {source}: not found")
+            continue
+        output = font_dir / f"{source.stem}.subset.{flavor}"
+        key = hash_bytes(json.dumps([hash_file(source), sorted(codepoints), flavor]).encode("utf-8"))
+        entry = previous.get(name)
+        if not force and entry and entry.get("key") == key and output.exists():
+            results[name] = entry
+            print(f"  {name:<24} unchanged")
+            continue
+        entry = dict(subset_font(source, output, codepoints, flavor), key=key)
+        results[name] = entry
+        print(f"  {name:<24} {entry['glyphs_before']:>4} -> {entry['glyphs']:>4} glyphs, "
+              f"{entry['bytes_before']:>7,} -> {entry['bytes']:>7,} bytes ({entry['bytes'] / entry['bytes_before']:.0%})")
+
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"codepoints": len(codepoints), "fonts": results}, f, indent=2)
+    total_before = sum(r["bytes_before"] for r in results.values())
+    total = sum(r["bytes"] for r in results.values())
+    print(f"\n  {len(codepoints)} code points used, {total_before:,} -> {total:,} bytes "
+          f"in {time.perf_counter() - start:.2f}s")
+    print(f"  Subset report saved to: {report_path}")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Subset the game fonts to the glyphs the game uses")
+    parser.add_argument("fonts", nargs="*", default=list(FONTS), help="font files in --font-dir")
+    parser.add_argument("--font-dir", default=str(FONT_DIR))
+    parser.add_argument("--game-data", default="game_data.json")
+    parser.add_argument("--html", default="index.html")
+    parser.add_argument("--force", action="store_true", help="rebuild even if nothing changed")
+    parser.add_argument("--list", action="store_true", help="print the used code points and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        used = used_codepoints(used_text(args.game_data, args.html))
+        print(" ".join(f"U+{c:04X}" for c in sorted(used)))
+    else:
+        build_subsets(args.fonts, args.font_dir, args.game_data, args.html, args.force)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Concurrent Gemini/Imagen generation for the asset generator
+One configured client shared by a thread pool, a token-bucket rate limit,
+and jittered exponential backoff on transient errors.
+Run directly to exercise the scheduler against the local fake model.
+"""
+
+import contextlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MODEL = "imagen-3.0-generate-001"
+
+# Request parameters sent with every prompt; part of the raw response cache key
+GENERATION_PARAMS = {
+    "number_of_images": 1,
+    "aspect_ratio": "1:1",
+    "safety_filter_level": "block_only_high",
+    "person_generation": "allow_adult",
+}
+
+# google.api_core exception names worth retrying; matched by name so the
+# google packages are not needed to classify errors from the fake model
+TRANSIENT_ERROR_NAMES = {
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "GatewayTimeout",
+    "Aborted",
+}
+
+
+def is_transient(exc: Exception) -> bool:
+    """True for rate-limit, timeout and server-side errors that are worth retrying"""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: int = 1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+
+class GeminiClient:
+    """A single configured Imagen model, safe to share across worker threads"""
+
+    def __init__(self, api_key: str = None, model_name: str = DEFAULT_MODEL, model=None):
+        self.model_name = model_name
+        if model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            model = genai.ImageGenerationModel(model_name)
+        self.model = model
+
+    def generate(self, prompt: str):
+        """Return the full-resolution PIL image for a prompt"""
+        result = self.model.generate_images(prompt=prompt, **GENERATION_PARAMS)
+        if not result.images:
+            raise RuntimeError("Gemini returned no images")
+        return result.images[0]._pil_image
+
+
+class GenerationScheduler:
+    """Runs many prompts concurrently against one client"""
+
+    def __init__(self, client: GeminiClient, workers: int = 4, rate: float = 2.0, burst: int = 4,
+                 max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 16.0,
+                 sleep=time.sleep, rng=None, tracer=None):
+        self.client = client
+        self.workers = workers
+        self.bucket = TokenBucket(rate, burst, sleep=sleep)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.tracer = tracer
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a retry attempt (0-based)"""
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def generate(self, prompt: str, job=None):
+        """Generate one image, retrying transient failures"""
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            span = self.tracer.span("generate", job=job, attempt=attempt, outcome="gemini") if self.tracer else contextlib.nullcontext()
+            try:
+                with span:
+                    return self.client.generate(prompt)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient(e):
+                    raise
+                self.sleep(self.backoff(attempt))
+                attempt += 1
+
+    def run(self, prompts: dict) -> dict:
+        """Generate every {job_id: prompt}; returns {job_id: image or the final exception}"""
+        results = {}
+        if not prompts:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(prompts))) as pool:
+            futures = {job_id: pool.submit(self.generate, prompt, job_id) for job_id, prompt in prompts.items()}
+            for job_id, future in futures.items():
+                try:
+                    results[job_id] = future.result()
+                except Exception as e:
+                    results[job_id] = e
+        return results
+
+
+class FakeTransientError(ConnectionError):
+    """Injected by FakeImageModel to simulate a retryable API failure"""
+
+
+class FakeImageModel:
+    """Local stand-in for ImageGenerationModel with injected latency and errors"""
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.1, error_rate: float = 0.0,
+                 fatal_prompts=(), image_size: int = 1024, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fatal_prompts = set(fatal_prompts)
+        self.image_size = image_size
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def generate_images(self, prompt: str, number_of_images: int = 1, **kwargs):
+        from PIL import Image
+
+        with self.lock:
+            self.calls += 1
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            fail = self.rng.random() < self.error_rate
+        time.sleep(delay)
+
+        if prompt in self.fatal_prompts:
+            raise ValueError(f"Prompt rejected: {prompt[:40]}")
+        if fail:
+            raise FakeTransientError("503 Service Unavailable (injected)")
+
+        # Deterministic solid color per prompt so results can be checked
+        color = tuple(b for b in prompt.encode("utf-8")[:3].ljust(3, b"\0")) + (255,)
+        image = Image.new("RGBA", (self.image_size, self.image_size), color)
+
+        class _Generated:
+            _pil_image = image
+
+        class _Result:
+            images = [_Generated() for _ in range(number_of_images)]
+
+        return _Result()
+
+
+if __name__ == "__main__":
+    import sys
+
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    model = FakeImageModel(latency=0.3, jitter=0.2, error_rate=0.2, seed=1, image_size=256)
+    scheduler = GenerationScheduler(GeminiClient(model=model), workers=jobs, rate=50, burst=jobs,
+                                    base_delay=0.05, rng=random.Random(1))
+
+    start = time.perf_counter()
+    results = scheduler.run({f"asset_{i}": f"prompt {i}" for i in range(jobs)})
+    elapsed = time.perf_counter() - start
+
+    failed = [job for job, r in results.items() if isinstance(r, Exception)]
+    print(f"  {jobs} jobs, {model.calls} model calls, {len(failed)} failed")
+    print(f"  wall time {elapsed:.2f}s vs ~{jobs * 0.4:.2f}s sequential")
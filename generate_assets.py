@@ -4,30 +4,31 @@ Game Asset Generator using Google Gemini AI
 Generates pixel art style images for the Arabic survival game "Gold or Blood"
 """
 
+from __future__ import annotations
+
 import os
-import base64
 import io
-import json
+from importlib.util import find_spec
 from pathlib import Path
 
-try:
-    import google.generativeai as genai
-    from PIL import Image
-    GENAI_AVAILABLE = True
-except ImportError:
-    GENAI_AVAILABLE = False
-    print("Warning: google-generativeai or PIL not available, using fallback generation")
-
-# Asset output directories
+# Asset output directories (created when something is written to them)
 ASSETS_DIR = Path("assets")
 CHARACTERS_DIR = ASSETS_DIR / "characters"
 ENEMIES_DIR = ASSETS_DIR / "enemies"
 PICKUPS_DIR = ASSETS_DIR / "pickups"
 BACKGROUNDS_DIR = ASSETS_DIR / "backgrounds"
 
-# Create directories
-for dir_path in [CHARACTERS_DIR, ENEMIES_DIR, PICKUPS_DIR, BACKGROUNDS_DIR]:
-    dir_path.mkdir(parents=True, exist_ok=True)
+
+def genai_available() -> bool:
+    """True if google-generativeai and PIL are installed (checked without importing them)"""
+    try:
+        return find_spec("google.generativeai") is not None and find_spec("PIL") is not None
+    except ModuleNotFoundError:
+        return False
+
+
+# Bump when a change to the generator should invalidate every cached asset
+GENERATOR_VERSION = "1.2"
 
 # Asset definitions with detailed prompts for Gemini
 ASSET_PROMPTS = {
@@ -87,7 +88,7 @@ ASSET_PROMPTS = {
 }
 
 
-def create_fallback_sprite(name: str, size: tuple, category: str) -> Image.Image:
+def create_fallback_sprite(name: str, size: tuple, category: str, seed=None) -> Image.Image:
     """Create a simple fallback sprite using PIL when Gemini is not available"""
     from PIL import Image, ImageDraw
     
@@ -124,7 +125,8 @@ def create_fallback_sprite(name: str, size: tuple, category: str) -> Image.Image
         
         # Body
         body_top = head_y + head_size
-        body_height = height // 2
+        # Leave room for the legs above the bottom margin
+        body_height = height // 3
         draw.rectangle([width//4, body_top, 3*width//4, body_top + body_height], 
                       fill=colors["primary"])
         
@@ -206,595 +208,293 @@ def create_fallback_sprite(name: str, size: tuple, category: str) -> Image.Image
             
     elif category == "backgrounds":
         # Sand tile with noise
-        import random
-        for y in range(height):
-            for x in range(width):
-                noise = random.randint(-20, 20)
-                r = min(255, max(0, colors["primary"][0] + noise))
-                g = min(255, max(0, colors["primary"][1] + noise))
-                b = min(255, max(0, colors["primary"][2] + noise))
-                img.putpixel((x, y), (r, g, b, 255))
+        from texture_noise import sand_texture
+        img = sand_texture(size, colors["primary"], amplitude=20, seed=seed)
     
     return img
 
 
+# One configured client per API key, shared by every generation call
+_GEMINI_CLIENTS = {}
+
+
+def get_gemini_client(api_key: str):
+    """Return the shared Gemini client for an API key, configuring it on first use"""
+    from gemini_client import GeminiClient
+    
+    if api_key not in _GEMINI_CLIENTS:
+        _GEMINI_CLIENTS[api_key] = GeminiClient(api_key)
+    return _GEMINI_CLIENTS[api_key]
+
+
 def generate_with_gemini(prompt: str, size: tuple, api_key: str) -> Image.Image:
     """Generate an image using Google Gemini"""
-    if not GENAI_AVAILABLE:
-        raise RuntimeError("Google Generative AI not available")
-    
-    genai.configure(api_key=api_key)
+    from pixel_downsample import downsample
     
-    # Use Gemini's image generation capability
-    # Note: As of the knowledge cutoff, Gemini's image generation might be limited
-    # We'll use the model to generate a detailed description and then create pixel art
+    if not genai_available():
+        raise RuntimeError("Google Generative AI not available")
     
     try:
-        # Try using Imagen through Gemini if available
-        model = genai.ImageGenerationModel("imagen-3.0-generate-001")
-        
-        result = model.generate_images(
-            prompt=prompt,
-            number_of_images=1,
-            aspect_ratio="1:1",
-            safety_filter_level="block_only_high",
-            person_generation="allow_adult"
-        )
-        
-        if result.images:
-            image = result.images[0]._pil_image
-            # Resize to desired size
-            image = image.resize(size, Image.NEAREST)
-            return image
-            
+        image = get_gemini_client(api_key).generate(prompt)
+        # Dominant color per block, so one stray sample cannot decide a pixel
+        return downsample(image, size)
     except Exception as e:
         print(f"Gemini image generation failed: {e}")
         raise
 
 
-def generate_all_assets(api_key: str = None):
-    """Generate all game assets"""
+def fallback_fingerprint() -> str:
+    """Hash of the fallback drawing code, so editing it invalidates cached fallback assets"""
+    import inspect
+    import texture_noise
+    from build_cache import hash_bytes
+    
+    source = inspect.getsource(create_fallback_sprite) + inspect.getsource(texture_noise)
+    return hash_bytes(source.encode("utf-8"))
+
+
+def generate_all_assets(api_key: str = None, force: bool = False, workers: int = 4,
+                        rate: float = 2.0, client=None, offline: bool = False,
+                        response_cache_dir=None, prompts: dict = None, tracer=None):
+    """Generate all game assets, skipping those whose build key is unchanged
+    
+    Stale assets are requested from Gemini concurrently (`workers` threads sharing one
+    client, at most `rate` requests per second). Pass `client` to use a preconfigured
+    GeminiClient, e.g. one wrapping gemini_client.FakeImageModel.
+    
+    Raw responses are kept in the response store, so changing a size in ASSET_PROMPTS
+    re-derives from disk. With offline=True no API calls are made at all.
+    
+    `prompts` overrides ASSET_PROMPTS (same category -> name -> info layout).
+    
+    Every asset and stage (generate, resize, encode, save) is recorded as a span in
+    `tracer` (a build_trace.Tracer); by default spans go to build_trace.TRACE_PATH.
+    """
+    from build_cache import BuildCache, asset_key
+    from build_trace import TRACE_PATH, Tracer, print_summary
+    from gemini_client import GenerationScheduler
+    from pixel_downsample import downsample
+    from response_store import RESPONSE_CACHE_DIR, CachingClient, ResponseStore
     
     print("=" * 60)
     print("  Game Asset Generator - Gold or Blood")
     print("=" * 60)
     
-    use_gemini = api_key is not None and GENAI_AVAILABLE
+    use_gemini = offline or client is not None or (api_key is not None and genai_available())
     
-    if use_gemini:
-        print(f"\nUsing Gemini AI for image generation")
+    if offline:
+        print(f"\nRe-deriving Gemini assets from the response cache (offline)")
+    elif use_gemini:
+        print(f"\nUsing Gemini AI for image generation ({workers} workers, {rate:g} req/s)")
     else:
         print(f"\nUsing fallback pixel art generation")
         print("(Set GEMINI_API_KEY environment variable for AI generation)")
     
-    generated_assets = []
-    
-    for category, assets in ASSET_PROMPTS.items():
-        print(f"\n--- Generating {category} ---")
-        
-        output_dir = ASSETS_DIR / category
-        
-        for asset_name, asset_info in assets.items():
-            output_path = output_dir / f"{asset_name}.png"
-            print(f"  Creating {asset_info['description']}...", end=" ")
+    owns_tracer = tracer is None
+    tracer = tracer or Tracer(TRACE_PATH)
+    cache = BuildCache(ASSETS_DIR / "manifest.json")
+    code = fallback_fingerprint()
+    generator = "gemini" if use_gemini else "fallback"
+    
+    def key_for(category, asset_name, asset_info, generator):
+        return asset_key(category, asset_name, asset_info, generator, GENERATOR_VERSION, code)
+    
+    # Work out what needs rebuilding before spending any API calls
+    stale = []
+    skipped = 0
+    with tracer.span("plan") as plan_span:
+        for category, assets in (ASSET_PROMPTS if prompts is None else prompts).items():
+            output_dir = ASSETS_DIR / category
+            output_dir.mkdir(parents=True, exist_ok=True)
             
-            try:
-                if use_gemini:
-                    try:
-                        img = generate_with_gemini(
-                            asset_info["prompt"],
-                            asset_info["size"],
-                            api_key
-                        )
-                    except Exception as e:
-                        print(f"(Gemini failed, using fallback)")
-                        img = create_fallback_sprite(asset_name, asset_info["size"], category)
+            for asset_name, asset_info in assets.items():
+                output_path = output_dir / f"{asset_name}.png"
+                key = key_for(category, asset_name, asset_info, generator)
+                if not force and cache.is_fresh(category, asset_name, key, output_path):
+                    skipped += 1
+                    tracer.event("asset", asset=f"{category}/{asset_name}", outcome="cached")
                 else:
-                    img = create_fallback_sprite(asset_name, asset_info["size"], category)
-                
-                # Save the image
-                img.save(output_path, "PNG")
-                generated_assets.append(str(output_path))
-                print("✓")
+                    stale.append((category, asset_name, asset_info, output_path, key))
+        plan_span.update(stale=len(stale), cached=skipped)
+    
+    # Serve what we can from stored raw responses, then fan the rest out to Gemini;
+    # total time ~ the slowest request
+    gemini_results = {}
+    stored = set()
+    if use_gemini and stale:
+        if client is None and not offline:
+            client = get_gemini_client(api_key)
+        caching_client = CachingClient(None if offline else client,
+                                       ResponseStore(response_cache_dir or RESPONSE_CACHE_DIR))
+        
+        misses = {}
+        with tracer.span("lookup") as lookup_span:
+            for category, asset_name, asset_info, _, _ in stale:
+                image = caching_client.lookup(asset_info["prompt"])
+                if image is not None:
+                    gemini_results[(category, asset_name)] = image
+                    stored.add((category, asset_name))
+                else:
+                    misses[(category, asset_name)] = asset_info["prompt"]
+            lookup_span.update(hits=len(stored), misses=len(misses))
+        print(f"\n{len(gemini_results)} raw responses cached, requesting {len(misses)} from Gemini...")
+        
+        if misses:
+            scheduler = GenerationScheduler(caching_client, workers=workers, rate=rate, tracer=tracer)
+            with tracer.span("fetch", requests=len(misses)):
+                gemini_results.update(scheduler.run(misses))
+        caching_client.store.flush()
+    
+    generated_assets = []
+    current_category = None
+    
+    for category, asset_name, asset_info, output_path, key in stale:
+        if category != current_category:
+            print(f"\n--- Generating {category} ---")
+            current_category = category
+        print(f"  Creating {asset_info['description']}...", end=" ")
+        asset_id = f"{category}/{asset_name}"
+        
+        try:
+            with tracer.span("asset", asset=asset_id) as asset_span:
+                asset_generator = generator
+                attempted = None
+                result = gemini_results.get((category, asset_name))
+                if use_gemini and not isinstance(result, Exception) and result is not None:
+                    outcome = "response_cache" if (category, asset_name) in stored else "gemini"
+                    # One response at a time, released once downsampled, so memory stays flat
+                    with tracer.span("resize", asset=asset_id, source=list(result.size)):
+                        img = downsample(result, asset_info["size"])
+                    del gemini_results[(category, asset_name)]
+                else:
+                    outcome = "fallback"
+                    with tracer.span("generate", asset=asset_id, outcome=outcome) as generate_span:
+                        if use_gemini:
+                            print(f"(Gemini failed: {result}, using fallback)", end=" ")
+                            generate_span["reason"] = f"{type(result).__name__}: {result}" if result else "no result"
+                            asset_generator = "fallback"
+                            attempted, key = key, key_for(category, asset_name, asset_info, asset_generator)
+                        # Derive the seed from the fallback key so rebuilds are reproducible
+                        img = create_fallback_sprite(asset_name, asset_info["size"], category, int(key[:8], 16))
                 
-            except Exception as e:
-                print(f"✗ Error: {e}")
+                # Encode and write separately so the trace shows which one is slow
+                with tracer.span("encode", asset=asset_id) as encode_span:
+                    buffer = io.BytesIO()
+                    img.save(buffer, "PNG")
+                    data = buffer.getvalue()
+                    encode_span["bytes"] = len(data)
+                with tracer.span("save", asset=asset_id, bytes=len(data)):
+                    output_path.write_bytes(data)
+                asset_span.update(outcome=outcome, bytes=len(data))
+            
+            cache.record(
+                category, asset_name, key, output_path, attempted,
+                path=f"assets/{category}/{asset_name}.png",
+                size=list(asset_info["size"]),
+                description=asset_info["description"],
+                generator=asset_generator,
+            )
+            generated_assets.append(str(output_path))
+            print("✓")
+            
+        except Exception as e:
+            print(f"✗ Error: {e}")
     
     print(f"\n{'=' * 60}")
-    print(f"  Generated {len(generated_assets)} assets")
+    print(f"  Generated {len(generated_assets)} assets, {skipped} unchanged")
     print(f"{'=' * 60}")
     
-    # Create an asset manifest
-    manifest = {
-        "version": "1.0",
-        "assets": {}
-    }
-    
-    for category, assets in ASSET_PROMPTS.items():
-        manifest["assets"][category] = {}
-        for asset_name, asset_info in assets.items():
-            manifest["assets"][category][asset_name] = {
-                "path": f"assets/{category}/{asset_name}.png",
-                "size": asset_info["size"],
-                "description": asset_info["description"]
-            }
-    
+    # Update the asset manifest in place; entries not in ASSET_PROMPTS are kept
     manifest_path = ASSETS_DIR / "manifest.json"
-    with open(manifest_path, "w") as f:
-        json.dump(manifest, f, indent=2)
+    if cache.dirty or not manifest_path.exists():
+        from asset_manifest import write_manifest
+        with tracer.span("manifest"):
+            cache.save()
+            write_manifest(manifest_path=manifest_path)
     
-    print(f"\nAsset manifest saved to: {manifest_path}")
+    print_summary(tracer.summary())
+    if owns_tracer:
+        tracer.close()
+        print(f"\n  Build trace appended to: {TRACE_PATH}")
     
     return generated_assets
 
 
-def create_enhanced_pixel_sprites():
+def _select(specs: dict, names=None) -> dict:
+    """Subset of a spec dict; unknown names are an error rather than a silent no-op"""
+    if names is None:
+        return specs
+    unknown = set(names) - set(specs)
+    if unknown:
+        raise KeyError(f"Unknown sprite(s): {', '.join(sorted(unknown))}")
+    return {name: specs[name] for name in specs if name in names}
+
+
+def _save_sprites(sprites: dict, output_dir: Path, label: str):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, img in sprites.items():
+        output_path = output_dir / f"{name}.png"
+        img.save(output_path, "PNG")
+        print(f"  Created {label}: {output_path}")
+
+
+def create_enhanced_pixel_sprites(names=None):
     """Create enhanced pixel art sprites with more detail"""
-    from PIL import Image, ImageDraw
+    from sprite_dsl import SPRITE_SPECS, render_batch
     
     print("\n--- Creating Enhanced Pixel Art Sprites ---\n")
     
-    # Abu Sulaiman - Wealthy Merchant with detailed sprite
-    def create_abu_sulaiman():
-        img = Image.new('RGBA', (64, 64), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # Define pixel colors
-        colors = {
-            'black_agal': (26, 26, 26),
-            'red_shemagh': (204, 0, 0),
-            'skin': (212, 165, 116),
-            'skin_shadow': (196, 149, 106),
-            'eyes': (42, 42, 42),
-            'beard': (58, 42, 26),
-            'white_thobe': (245, 245, 245),
-            'bisht': (139, 105, 20),
-            'sandals': (42, 42, 42),
-        }
-        
-        # Pixel matrix (simplified for brevity - actual game uses full matrix)
-        # Draw the sprite using the defined colors
-        
-        # Head/Shemagh area
-        for y in range(8, 16):
-            for x in range(24, 40):
-                draw.point((x, y), colors['red_shemagh'])
-        
-        # Agal (black ring)
-        for x in range(22, 42):
-            draw.point((x, 6), colors['black_agal'])
-            draw.point((x, 7), colors['black_agal'])
-        
-        # Face
-        for y in range(16, 24):
-            for x in range(26, 38):
-                draw.point((x, y), colors['skin'])
-        
-        # Eyes
-        draw.point((29, 18), colors['eyes'])
-        draw.point((35, 18), colors['eyes'])
-        
-        # Beard
-        for y in range(22, 26):
-            for x in range(28, 36):
-                draw.point((x, y), colors['beard'])
-        
-        # White Thobe (body)
-        for y in range(26, 52):
-            for x in range(20, 44):
-                draw.point((x, y), colors['white_thobe'])
-        
-        # Bisht (cloak) on sides
-        for y in range(30, 48):
-            for x in range(16, 22):
-                draw.point((x, y), colors['bisht'])
-            for x in range(42, 48):
-                draw.point((x, y), colors['bisht'])
-        
-        # Arms
-        for y in range(30, 44):
-            for x in range(18, 22):
-                draw.point((x, y), colors['skin'])
-            for x in range(42, 46):
-                draw.point((x, y), colors['skin'])
-        
-        # Feet/Sandals
-        for y in range(52, 58):
-            for x in range(24, 32):
-                draw.point((x, y), colors['sandals'])
-            for x in range(32, 40):
-                draw.point((x, y), colors['sandals'])
-        
-        return img
-    
-    # Jayzen - Tough Fighter
-    def create_jayzen():
-        img = Image.new('RGBA', (64, 64), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        colors = {
-            'afro': (42, 26, 10),
-            'red_shemagh': (204, 51, 51),
-            'skin': (212, 165, 116),
-            'sunglasses': (26, 26, 26),
-            'sunglasses_lens': (51, 51, 51),
-            'purple_shirt': (106, 27, 154),
-            'grey_pants': (85, 85, 85),
-            'shoes': (58, 58, 58),
-        }
-        
-        # Afro hair
-        for y in range(4, 14):
-            for x in range(22, 42):
-                if (x - 32) ** 2 + (y - 9) ** 2 < 100:
-                    draw.point((x, y), colors['afro'])
-        
-        # Face
-        for y in range(14, 24):
-            for x in range(26, 38):
-                draw.point((x, y), colors['skin'])
-        
-        # Messy shemagh
-        for y in range(10, 16):
-            for x in range(20, 26):
-                draw.point((x, y), colors['red_shemagh'])
-            for x in range(38, 44):
-                draw.point((x, y), colors['red_shemagh'])
-        
-        # Sunglasses
-        for x in range(27, 32):
-            draw.point((x, 17), colors['sunglasses'])
-            draw.point((x, 18), colors['sunglasses_lens'])
-        for x in range(33, 38):
-            draw.point((x, 17), colors['sunglasses'])
-            draw.point((x, 18), colors['sunglasses_lens'])
-        
-        # Purple shirt
-        for y in range(26, 44):
-            for x in range(22, 42):
-                draw.point((x, y), colors['purple_shirt'])
-        
-        # Arms
-        for y in range(28, 42):
-            for x in range(18, 24):
-                draw.point((x, y), colors['skin'])
-            for x in range(40, 46):
-                draw.point((x, y), colors['skin'])
-        
-        # Grey pants
-        for y in range(44, 56):
-            for x in range(24, 40):
-                draw.point((x, y), colors['grey_pants'])
-        
-        # Shoes
-        for y in range(56, 60):
-            for x in range(24, 32):
-                draw.point((x, y), colors['shoes'])
-            for x in range(32, 40):
-                draw.point((x, y), colors['shoes'])
-        
-        return img
-    
-    # Noura - Strong Woman
-    def create_noura():
-        img = Image.new('RGBA', (64, 64), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        colors = {
-            'hijab': (245, 245, 245),
-            'skin': (232, 213, 196),
-            'eyes': (26, 26, 26),
-            'lips': (212, 164, 164),
-            'blue_dress': (30, 136, 229),
-            'shoes': (21, 101, 192),
-        }
-        
-        # Hijab
-        for y in range(4, 20):
-            for x in range(20, 44):
-                if (x - 32) ** 2 + (y - 12) ** 2 < 144:
-                    draw.point((x, y), colors['hijab'])
-        
-        # Face (visible through hijab)
-        for y in range(14, 22):
-            for x in range(26, 38):
-                draw.point((x, y), colors['skin'])
-        
-        # Eyes
-        draw.point((29, 17), colors['eyes'])
-        draw.point((35, 17), colors['eyes'])
-        
-        # Lips
-        for x in range(30, 34):
-            draw.point((x, 20), colors['lips'])
-        
-        # Hijab covering neck
-        for y in range(20, 28):
-            for x in range(22, 42):
-                draw.point((x, y), colors['hijab'])
-        
-        # Blue dress
-        for y in range(28, 54):
-            for x in range(18, 46):
-                draw.point((x, y), colors['blue_dress'])
-        
-        # Hands
-        for y in range(38, 44):
-            for x in range(16, 20):
-                draw.point((x, y), colors['skin'])
-            for x in range(44, 48):
-                draw.point((x, y), colors['skin'])
-        
-        # Shoes
-        for y in range(54, 60):
-            for x in range(24, 32):
-                draw.point((x, y), colors['shoes'])
-            for x in range(32, 40):
-                draw.point((x, y), colors['shoes'])
-        
-        return img
-    
-    # Create and save enhanced sprites
-    sprites = {
-        'abu_sulaiman': create_abu_sulaiman(),
-        'jayzen': create_jayzen(),
-        'noura': create_noura(),
-    }
-    
-    for name, img in sprites.items():
-        output_path = CHARACTERS_DIR / f"{name}.png"
-        img.save(output_path, "PNG")
-        print(f"  Created enhanced sprite: {output_path}")
+    # Abu Sulaiman, Jayzen and Noura are layer specs in sprite_dsl.SPRITE_SPECS
+    sprites = render_batch(_select(SPRITE_SPECS["characters"], names))
+    _save_sprites(sprites, CHARACTERS_DIR, "enhanced sprite")
     
     return sprites
 
 
-def create_enemy_sprites():
+def enemy_sprite_specs(game_data_path: str = "game_data.json") -> dict:
+    """Hand-authored specs for wolf/dhub/scorpion, generated ones for the rest of ENEMIES"""
+    from sprite_dsl import SPRITE_SPECS, game_data_enemy_specs
+    
+    specs = dict(SPRITE_SPECS["enemies"])
+    if Path(game_data_path).exists():
+        specs.update(game_data_enemy_specs(game_data_path))
+    return specs
+
+
+def create_enemy_sprites(game_data_path: str = "game_data.json", names=None):
     """Create detailed enemy sprites"""
-    from PIL import Image, ImageDraw
+    from sprite_dsl import render_batch
     
     print("\n--- Creating Enemy Sprites ---\n")
     
-    def create_wolf():
-        img = Image.new('RGBA', (48, 48), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        grey = (106, 106, 106)
-        dark_grey = (58, 58, 58)
-        yellow = (255, 255, 0)
-        
-        # Body
-        draw.ellipse([8, 18, 40, 40], fill=grey, outline=dark_grey)
-        
-        # Head
-        draw.ellipse([4, 8, 24, 28], fill=grey, outline=dark_grey)
-        
-        # Ears
-        draw.polygon([(6, 8), (10, 2), (14, 8)], fill=grey, outline=dark_grey)
-        draw.polygon([(14, 8), (18, 2), (22, 8)], fill=grey, outline=dark_grey)
-        
-        # Eyes
-        draw.ellipse([8, 14, 12, 18], fill=yellow)
-        draw.ellipse([14, 14, 18, 18], fill=yellow)
-        
-        # Nose
-        draw.ellipse([10, 20, 14, 24], fill=dark_grey)
-        
-        # Legs
-        for x_offset in [12, 20, 28, 36]:
-            draw.rectangle([x_offset, 38, x_offset + 4, 46], fill=grey, outline=dark_grey)
-        
-        # Tail
-        draw.arc([32, 20, 48, 36], 180, 360, fill=grey, width=4)
-        
-        return img
-    
-    def create_dhub():
-        img = Image.new('RGBA', (48, 48), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        green = (90, 138, 90)
-        dark_green = (58, 90, 58)
-        red = (255, 0, 0)
-        brown = (138, 106, 58)
-        
-        # Body
-        draw.ellipse([12, 16, 40, 32], fill=green, outline=dark_green)
-        
-        # Head
-        draw.ellipse([2, 18, 16, 30], fill=green, outline=dark_green)
-        
-        # Eye
-        draw.ellipse([6, 22, 10, 26], fill=red)
-        
-        # Tail with spikes
-        for i in range(4):
-            x = 36 + i * 3
-            draw.ellipse([x, 22, x + 4, 26], fill=brown)
-        
-        # Legs
-        for pos in [(14, 30), (22, 30), (30, 30), (38, 30)]:
-            draw.rectangle([pos[0], pos[1], pos[0] + 4, pos[1] + 8], fill=green, outline=dark_green)
-        
-        # Scales pattern
-        for y in range(18, 30, 4):
-            for x in range(16, 38, 4):
-                draw.point((x, y), dark_green)
-        
-        return img
-    
-    def create_scorpion():
-        img = Image.new('RGBA', (40, 40), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        orange = (255, 165, 0)
-        dark_orange = (138, 106, 0)
-        red = (255, 0, 0)
-        
-        # Body
-        draw.ellipse([12, 12, 28, 28], fill=orange, outline=dark_orange)
-        
-        # Head
-        draw.ellipse([14, 6, 26, 14], fill=orange, outline=dark_orange)
-        
-        # Eyes
-        draw.ellipse([16, 8, 19, 11], fill=red)
-        draw.ellipse([21, 8, 24, 11], fill=red)
-        
-        # Pincers
-        draw.ellipse([2, 8, 12, 18], fill=orange, outline=dark_orange)
-        draw.ellipse([28, 8, 38, 18], fill=orange, outline=dark_orange)
-        draw.line([(4, 10), (2, 8)], fill=dark_orange, width=2)
-        draw.line([(36, 10), (38, 8)], fill=dark_orange, width=2)
-        
-        # Tail segments
-        for i in range(4):
-            y = 26 + i * 3
-            draw.ellipse([18, y, 22, y + 4], fill=dark_orange)
-        
-        # Stinger
-        draw.polygon([(20, 38), (18, 40), (22, 40)], fill=red)
-        
-        # Legs
-        for i in range(3):
-            draw.line([(10 - i*2, 20 + i*2), (6 - i*2, 24 + i*2)], fill=dark_orange, width=2)
-            draw.line([(30 + i*2, 20 + i*2), (34 + i*2, 24 + i*2)], fill=dark_orange, width=2)
-        
-        return img
-    
-    sprites = {
-        'wolf': create_wolf(),
-        'dhub': create_dhub(),
-        'scorpion': create_scorpion(),
-    }
-    
-    for name, img in sprites.items():
-        output_path = ENEMIES_DIR / f"{name}.png"
-        img.save(output_path, "PNG")
-        print(f"  Created enemy sprite: {output_path}")
+    sprites = render_batch(_select(enemy_sprite_specs(game_data_path), names))
+    _save_sprites(sprites, ENEMIES_DIR, "enemy sprite")
     
     return sprites
 
 
-def create_pickup_sprites():
+def create_pickup_sprites(names=None):
     """Create pickup item sprites"""
-    from PIL import Image, ImageDraw
+    from sprite_dsl import SPRITE_SPECS, render_batch
     
     print("\n--- Creating Pickup Sprites ---\n")
     
-    def create_xp_gem():
-        img = Image.new('RGBA', (24, 24), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # Diamond shape with glow effect
-        center = (12, 12)
-        
-        # Outer glow
-        for offset in range(3, 0, -1):
-            alpha = 100 - offset * 30
-            points = [
-                (center[0], 2 - offset),
-                (22 + offset, center[1]),
-                (center[0], 22 + offset),
-                (2 - offset, center[1])
-            ]
-            draw.polygon(points, fill=(0, 255, 0, alpha))
-        
-        # Main gem
-        points = [
-            (center[0], 4),
-            (20, center[1]),
-            (center[0], 20),
-            (4, center[1])
-        ]
-        draw.polygon(points, fill=(0, 255, 0))
-        
-        # Inner highlight
-        inner_points = [
-            (center[0], 8),
-            (16, center[1]),
-            (center[0], 16),
-            (8, center[1])
-        ]
-        draw.polygon(inner_points, fill=(170, 255, 170))
-        
-        # Bright center
-        draw.ellipse([10, 10, 14, 14], fill=(255, 255, 255))
-        
-        return img
-    
-    def create_gold_coin():
-        img = Image.new('RGBA', (24, 24), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        gold = (255, 215, 0)
-        dark_gold = (170, 136, 0)
-        light_gold = (255, 235, 100)
-        
-        # Outer glow
-        draw.ellipse([1, 1, 23, 23], fill=(255, 215, 0, 100))
-        
-        # Outer ring
-        draw.ellipse([3, 3, 21, 21], fill=dark_gold)
-        
-        # Main coin
-        draw.ellipse([5, 5, 19, 19], fill=gold)
-        
-        # Inner detail
-        draw.ellipse([8, 8, 16, 16], fill=dark_gold)
-        draw.ellipse([9, 9, 15, 15], fill=gold)
-        
-        # Shine
-        draw.ellipse([6, 6, 10, 10], fill=light_gold)
-        draw.point((7, 7), (255, 255, 255))
-        
-        return img
-    
-    sprites = {
-        'xp_gem': create_xp_gem(),
-        'gold_coin': create_gold_coin(),
-    }
-    
-    for name, img in sprites.items():
-        output_path = PICKUPS_DIR / f"{name}.png"
-        img.save(output_path, "PNG")
-        print(f"  Created pickup sprite: {output_path}")
+    sprites = render_batch(_select(SPRITE_SPECS["pickups"], names))
+    _save_sprites(sprites, PICKUPS_DIR, "pickup sprite")
     
     return sprites
 
 
-def create_background_tile():
+def create_background_tile(size: tuple = (64, 64), seed=None):
     """Create sand background tile"""
-    from PIL import Image
-    import random
+    from texture_noise import sand_texture
     
     print("\n--- Creating Background Tile ---\n")
     
-    img = Image.new('RGBA', (64, 64), (0, 0, 0, 255))
-    
-    base_r, base_g, base_b = 210, 180, 140
-    
-    for y in range(64):
-        for x in range(64):
-            # Add noise for natural sand look
-            noise = random.randint(-15, 15)
-            r = min(255, max(0, base_r + noise))
-            g = min(255, max(0, base_g + noise))
-            b = min(255, max(0, base_b + noise))
-            img.putpixel((x, y), (r, g, b, 255))
-    
-    # Add some small rocks/pebbles
-    for _ in range(5):
-        rx = random.randint(4, 60)
-        ry = random.randint(4, 60)
-        rock_color = (90 + random.randint(-20, 20), 90 + random.randint(-20, 20), 90 + random.randint(-20, 20), 255)
-        for dy in range(-2, 3):
-            for dx in range(-2, 3):
-                if dx*dx + dy*dy <= 4:
-                    px, py = rx + dx, ry + dy
-                    if 0 <= px < 64 and 0 <= py < 64:
-                        img.putpixel((px, py), rock_color)
+    # Sand noise plus some small rocks/pebbles
+    img = sand_texture(size, (210, 180, 140), amplitude=15, pebbles=5, seed=seed)
     
+    BACKGROUNDS_DIR.mkdir(parents=True, exist_ok=True)
     output_path = BACKGROUNDS_DIR / "sand_tile.png"
     img.save(output_path, "PNG")
     print(f"  Created background tile: {output_path}")
@@ -802,62 +502,163 @@ def create_background_tile():
     return img
 
 
+def sprite_catalog(game_data_path: str = "game_data.json") -> dict:
+    """{category: [names]} the pixel-art sprite pipeline can build"""
+    from sprite_dsl import SPRITE_SPECS
+    
+    return {
+        "characters": list(SPRITE_SPECS["characters"]),
+        "enemies": list(enemy_sprite_specs(game_data_path)),
+        "pickups": list(SPRITE_SPECS["pickups"]),
+        "backgrounds": ["sand_tile"],
+    }
+
+
+def select_targets(catalog: dict, only=(), categories=()) -> dict:
+    """{category: [names]} picked by 'category/name' and 'category' selectors (all if none)"""
+    if not only and not categories:
+        return {category: list(names) for category, names in catalog.items()}
+    
+    selected = {}
+    for category in categories:
+        if category not in catalog:
+            raise KeyError(f"Unknown category '{category}' (have: {', '.join(catalog)})")
+        selected[category] = list(catalog[category])
+    for target in only:
+        category, _, name = target.partition("/")
+        if category not in catalog or name not in catalog[category]:
+            raise KeyError(f"Unknown asset '{target}'")
+        names = selected.setdefault(category, [])
+        if name not in names:
+            names.append(name)
+    return selected
+
+
+def build_sprites(selection: dict, game_data_path: str = "game_data.json", tracer=None) -> dict:
+    """Render the selected pixel-art sprites and register them in the manifest"""
+    from asset_manifest import write_manifest
+    from build_cache import BuildCache
+    from build_trace import Tracer
+    
+    tracer = tracer or Tracer()
+    builders = {
+        "characters": (CHARACTERS_DIR, lambda names: create_enhanced_pixel_sprites(names)),
+        "enemies": (ENEMIES_DIR, lambda names: create_enemy_sprites(game_data_path, names)),
+        "pickups": (PICKUPS_DIR, lambda names: create_pickup_sprites(names)),
+        "backgrounds": (BACKGROUNDS_DIR, lambda names: {"sand_tile": create_background_tile()}),
+    }
+    
+    built = {}
+    for category, names in selection.items():
+        directory, create = builders[category]
+        with tracer.span("stage", stage=category) as span:
+            sprites = create(names)
+            span["assets"] = len(sprites)
+        built[category] = (directory, sprites)
+    
+    # Register the sprites under their named entries, then rescan into the unified manifest
+    with tracer.span("manifest"):
+        cache = BuildCache(ASSETS_DIR / "manifest.json")
+        for category, (directory, sprites) in built.items():
+            for name, img in sprites.items():
+                entry = cache.manifest["assets"].setdefault(category, {}).setdefault(name, {})
+                entry.update(path=(directory / f"{name}.png").as_posix(), size=list(img.size),
+                             generator="pixel_art_fallback")
+        cache.save()
+        write_manifest()
+    return built
+
+
 if __name__ == "__main__":
+    import argparse
+    import contextlib
     import sys
-    
-    # Check for API key
-    api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
-    
-    if len(sys.argv) > 1:
-        api_key = sys.argv[1]
+    import time
+    from build_trace import PROFILE_PATH, TRACE_PATH, Tracer, print_summary, profiled
+    
+    COMMANDS = ("sprites", "generate", "list")
+    
+    parser = argparse.ArgumentParser(
+        description="Generate game assets",
+        epilog="Without a command: Gemini generation if an API key is set, pixel-art sprites otherwise.")
+    parser.add_argument("--trace", default=str(TRACE_PATH), help="JSON-lines span log to append to")
+    parser.add_argument("--profile", nargs="?", const=str(PROFILE_PATH), default=None,
+                        help=f"cProfile the build and dump stats (default: {PROFILE_PATH})")
+    sub = parser.add_subparsers(dest="command")
+    
+    def add_selectors(command):
+        command.add_argument("--only", action="append", default=[], metavar="CATEGORY/NAME",
+                             help="build just this asset, e.g. enemies/wolf (repeatable)")
+        command.add_argument("--category", action="append", default=[],
+                             help="build every asset in a category, e.g. pickups (repeatable)")
+    
+    sprites_cmd = sub.add_parser("sprites", help="render the pixel-art sprites (no API calls)")
+    add_selectors(sprites_cmd)
+    sprites_cmd.add_argument("--game-data", default="game_data.json")
+    
+    generate_cmd = sub.add_parser("generate", help="generate ASSET_PROMPTS via Gemini or the fallback")
+    add_selectors(generate_cmd)
+    generate_cmd.add_argument("--api-key", help="default: GEMINI_API_KEY / GOOGLE_API_KEY")
+    generate_cmd.add_argument("--fallback", action="store_true", help="use the fallback renderer even with a key")
+    generate_cmd.add_argument("--offline", action="store_true", help="re-derive from stored Gemini responses only")
+    generate_cmd.add_argument("--force", action="store_true", help="rebuild even if the build key is unchanged")
+    generate_cmd.add_argument("--workers", type=int, default=4)
+    generate_cmd.add_argument("--rate", type=float, default=2.0, help="max Gemini requests per second")
+    
+    list_cmd = sub.add_parser("list", help="list buildable assets")
+    list_cmd.add_argument("--category", action="append", default=[])
+    
+    # Keep the old 'generate_assets.py <api key>' form working
+    argv = sys.argv[1:]
+    if argv and not argv[0].startswith("-") and argv[0] not in COMMANDS:
+        argv = ["generate", "--api-key", argv[0]] + argv[1:]
+    args = parser.parse_args(argv)
+    
+    env_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+    if args.command is None:
+        args = parser.parse_args(argv + (["generate"] if env_key else ["sprites"]))
+    
+    if args.command == "list":
+        catalogs = {"sprites": sprite_catalog(), "generate": {c: list(a) for c, a in ASSET_PROMPTS.items()}}
+        for command, catalog in catalogs.items():
+            for category, names in catalog.items():
+                if args.category and category not in args.category:
+                    continue
+                for name in names:
+                    print(f"  {command:<9} {category}/{name}")
+        sys.exit(0)
+    
+    tracer = Tracer(args.trace)
+    start = time.perf_counter()
     
     print("\n" + "=" * 60)
     print("  Gold or Blood - Game Asset Generator")
     print("=" * 60)
     
-    if api_key:
-        print(f"\n  Using Gemini AI with provided API key")
-        print(f"  Generating AI-powered game assets...")
-        generate_all_assets(api_key)
-    else:
-        print(f"\n  No Gemini API key found")
-        print(f"  Creating enhanced pixel art sprites...")
-        
-        # Create all sprites using PIL
-        create_enhanced_pixel_sprites()
-        create_enemy_sprites()
-        create_pickup_sprites()
-        create_background_tile()
-        
-        # Create manifest
-        manifest = {
-            "version": "1.0",
-            "generator": "pixel_art_fallback",
-            "assets": {
-                "characters": {
-                    "abu_sulaiman": {"path": "assets/characters/abu_sulaiman.png", "size": [64, 64]},
-                    "jayzen": {"path": "assets/characters/jayzen.png", "size": [64, 64]},
-                    "noura": {"path": "assets/characters/noura.png", "size": [64, 64]}
-                },
-                "enemies": {
-                    "wolf": {"path": "assets/enemies/wolf.png", "size": [48, 48]},
-                    "dhub": {"path": "assets/enemies/dhub.png", "size": [48, 48]},
-                    "scorpion": {"path": "assets/enemies/scorpion.png", "size": [40, 40]}
-                },
-                "pickups": {
-                    "xp_gem": {"path": "assets/pickups/xp_gem.png", "size": [24, 24]},
-                    "gold_coin": {"path": "assets/pickups/gold_coin.png", "size": [24, 24]}
-                },
-                "backgrounds": {
-                    "sand_tile": {"path": "assets/backgrounds/sand_tile.png", "size": [64, 64]}
-                }
-            }
-        }
-        
-        with open(ASSETS_DIR / "manifest.json", "w") as f:
-            json.dump(manifest, f, indent=2)
+    with profiled(args.profile) if args.profile else contextlib.nullcontext():
+        if args.command == "generate":
+            catalog = {category: list(assets) for category, assets in ASSET_PROMPTS.items()}
+            try:
+                selection = select_targets(catalog, args.only, args.category)
+            except KeyError as e:
+                parser.error(e.args[0])
+            prompts = {c: {n: ASSET_PROMPTS[c][n] for n in names} for c, names in selection.items()}
+            api_key = None if args.fallback else (args.api_key or env_key)
+            if api_key and not genai_available():
+                print("\nWarning: google-generativeai or PIL not available, using fallback generation")
+            generate_all_assets(api_key, force=args.force, workers=args.workers, rate=args.rate,
+                                offline=args.offline, prompts=prompts, tracer=tracer)
+        else:
+            try:
+                selection = select_targets(sprite_catalog(args.game_data), args.only, args.category)
+            except KeyError as e:
+                parser.error(e.args[0])
+            build_sprites(selection, args.game_data, tracer)
+            print_summary(tracer.summary())
     
+    tracer.close()
     print("\n" + "=" * 60)
-    print("  Asset generation complete!")
+    print(f"  Asset generation complete in {time.perf_counter() - start:.2f}s")
     print("  Assets saved to: ./assets/")
+    print(f"  Build trace appended to: {args.trace}")
     print("=" * 60 + "\n")
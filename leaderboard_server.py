@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for worker/leaderboard-worker.js with a bounded top-K store
+Same contract as the worker: GET returns the top 100 as a JSON array sorted by
+kills, POST {name, kills, ...} stamps `date` (ms) and answers {success, rank}, bad
+entries get 400 {error: 'Invalid data'}, OPTIONS answers the CORS preflight.
+
+The worker reads, re-sorts and rewrites the whole array on every POST, so two
+concurrent POSTs can overwrite each other. Here submissions go through a queue to a
+single writer task instead:
+
+  - TopK keeps the best K in a min-heap, so an insert is one O(log K) push or
+    replace, and a score below the current K-th never touches the heap at all
+  - the writer drains whatever queued up while it wrote the previous batch (group
+    commit, up to MAX_BATCH), inserts it all, then sorts and serializes the
+    snapshot once per batch; GETs serve that pre-encoded snapshot
+  - the store file is written once per batch (atomic replace, under a lock file).
+    If another process changed it since our last write, its entries are merged in
+    first; entries are identified by (date, name), so merging is idempotent and
+    nothing is lost
+
+Ranks are taken from the snapshot at the end of the submission's batch.
+
+    python leaderboard_server.py                    # serve on :8787
+    python leaderboard_server.py --load-test        # in-process server + load generator
+    python leaderboard_server.py --load-test --url http://127.0.0.1:8787/
+"""
+
+import asyncio
+import heapq
+import json
+import math
+import os
+import random
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+TOP_K = 100
+DEFAULT_PORT = 8787
+STORE_PATH = Path(".cache") / "leaderboard.json"
+FLUSH_INTERVAL = 0.0    # extra seconds the writer waits to grow a batch
+MAX_BATCH = 512
+MAX_BODY = 16 * 1024
+LOCK_TIMEOUT = 5        # seconds before a store lock is treated as stale
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type",
+    "Content-Type": "application/json",
+}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def valid_entry(entry) -> bool:
+    """The worker's check: a truthy name and a numeric kills (JS typeof 'number')
+
+    kills must also be finite: 1e400 parses to inf, which sorts above everything and
+    can't be written back as JSON.
+    """
+    kills = entry.get("kills") if isinstance(entry, dict) else None
+    return (isinstance(entry, dict) and bool(entry.get("name"))
+            and isinstance(kills, (int, float)) and not isinstance(kills, bool) and math.isfinite(kills))
+
+
+def _reject_constant(name: str):
+    """json.loads hook: NaN/Infinity are not JSON, and JSON.parse in the worker rejects them too"""
+    raise ValueError(f"Unexpected token {name} in JSON")
+
+
+class TopK:
+    """The K best entries by kills; ties keep the earlier submission ahead, like the worker's stable sort"""
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self.heap = []   # min-heap of (kills, -date, name, entry); the root is the current K-th
+        self.ids = set()
+
+    def __len__(self):
+        return len(self.heap)
+
+    @staticmethod
+    def _item(entry) -> tuple:
+        return (entry["kills"], -entry["date"], str(entry["name"]), entry)
+
+    def add(self, entry: dict) -> bool:
+        """Insert one dated entry in O(log K); False if it did not make the top K"""
+        identity = (entry["date"], str(entry["name"]))
+        if identity in self.ids:
+            return True
+        item = self._item(entry)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item[:3] > self.heap[0][:3]:
+            dropped = heapq.heapreplace(self.heap, item)
+            self.ids.discard((-dropped[1], dropped[2]))
+        else:
+            return False
+        self.ids.add(identity)
+        return True
+
+    def merge(self, entries) -> int:
+        """Add entries from another copy of the board; already-known entries are skipped"""
+        return sum(self.add(entry) for entry in entries if valid_entry(entry) and "date" in entry)
+
+    def ranked(self) -> list:
+        """Entries best first"""
+        return [item[3] for item in sorted(self.heap, key=lambda item: item[:3], reverse=True)]
+
+
+class LeaderboardStore:
+    """TopK behind a single writer task that batches inserts and file writes"""
+
+    def __init__(self, path=STORE_PATH, k: int = TOP_K, flush_interval: float = FLUSH_INTERVAL):
+        self.path = Path(path) if path else None
+        self.board = TopK(k)
+        self.flush_interval = flush_interval
+        self.queue = None
+        self.writer = None
+        self.last_date = 0
+        self.file_mtime = None
+        self.stats = {"submitted": 0, "batches": 0, "writes": 0, "merged": 0}
+        if self.path and self.path.exists():
+            self.stats["merged"] += self._merge_file()
+        self._publish()
+
+    def _merge_file(self) -> int:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+            self.file_mtime = self.path.stat().st_mtime_ns
+        except (OSError, ValueError):
+            print(f"  Warning: could not read {self.path}, keeping the in-memory board")
+            return 0
+        return self.board.merge(entries if isinstance(entries, list) else [])
+
+    def _publish(self):
+        self.snapshot = self.board.ranked()
+        self.snapshot_bytes = json.dumps(self.snapshot, ensure_ascii=False, separators=(",", ":"),
+                                         allow_nan=False).encode("utf-8")
+        self.ranks = {(e["date"], str(e["name"])): i + 1 for i, e in enumerate(self.snapshot)}
+
+    def _persist(self):
+        """Merge concurrent writers' entries, then replace the store file atomically"""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock = self.path.with_name(f"{self.path.name}.lock")
+        self._acquire(lock)
+        try:
+            if self.path.exists() and self.path.stat().st_mtime_ns != self.file_mtime:
+                self.stats["merged"] += self._merge_file()
+                self._publish()
+            temp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            temp.write_bytes(self.snapshot_bytes)
+            os.replace(temp, self.path)
+            self.file_mtime = self.path.stat().st_mtime_ns
+            self.stats["writes"] += 1
+        finally:
+            lock.unlink(missing_ok=True)
+
+    @staticmethod
+    def _acquire(lock: Path):
+        """Exclusive-create lock file shared by every process using the store"""
+        while True:
+            try:
+                os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return
+            except FileExistsError:
+                try:
+                    if time.time() - lock.stat().st_mtime > LOCK_TIMEOUT:
+                        lock.unlink(missing_ok=True)  # left behind by a crashed process
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(0.001)
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.writer = asyncio.create_task(self._write_loop())
+
+    async def close(self):
+        if self.writer:
+            await self.queue.join()
+            self.writer.cancel()
+
+    async def submit(self, entry: dict) -> int:
+        """Queue one validated entry; resolves to its rank (0 if outside the top K)"""
+        # Unique, increasing ms timestamps keep (date, name) a stable identity
+        self.last_date = max(int(time.time() * 1000), self.last_date + 1)
+        entry = dict(entry, date=self.last_date)
+        done = asyncio.get_running_loop().create_future()
+        await self.queue.put((entry, done))
+        return await done
+
+    async def _write_loop(self):
+        while True:
+            batch = [await self.queue.get()]
+            await asyncio.sleep(self.flush_interval)  # 0 still lets ready submitters enqueue
+            while len(batch) < MAX_BATCH and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                for entry, _ in batch:
+                    self.board.add(entry)
+                self._publish()
+                await asyncio.to_thread(self._persist)
+                for entry, done in batch:
+                    if not done.done():
+                        done.set_result(self.ranks.get((entry["date"], str(entry["name"])), 0))
+            except Exception as e:
+                for _, done in batch:
+                    if not done.done():
+                        done.set_exception(e)
+            finally:
+                self.stats["submitted"] += len(batch)
+                self.stats["batches"] += 1
+                for _ in batch:
+                    self.queue.task_done()
+
+
+# ------------------------------------------------------------------ HTTP
+
+class RequestError(Exception):
+    """A request whose body can't be read; answered with `status` and the connection closed"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_request(reader):
+    """(method, headers, body) of one HTTP/1.1 request, or None at end of stream
+
+    Raises RequestError for a malformed or oversized Content-Length. The body is left
+    unread, so the caller must close the connection rather than parse it as a request.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    method = line.split(b" ", 1)[0].decode("latin-1").upper()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise RequestError(400, "Invalid Content-Length") from None
+    if length < 0:
+        raise RequestError(400, "Invalid Content-Length")
+    if length > MAX_BODY:
+        raise RequestError(413, "Payload too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, headers, body
+
+
+def _response(status: int, body: bytes = b"", keep_alive: bool = True) -> bytes:
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    head += [f"{name}: {value}" for name, value in CORS_HEADERS.items()]
+    head += [f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def _json(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+async def handle(store: LeaderboardStore, method: str, body: bytes) -> tuple:
+    """(status, body) for one request, following the worker's branches"""
+    if method == "OPTIONS":
+        return 200, b""
+    if method == "GET":
+        return 200, store.snapshot_bytes
+    if method == "POST":
+        try:
+            entry = json.loads(body or b"null", parse_constant=_reject_constant)
+        except ValueError as e:
+            return 500, _json({"error": str(e)})
+        if not valid_entry(entry):
+            return 400, _json({"error": "Invalid data"})
+        rank = await store.submit(entry)
+        return 200, _json({"success": True, "rank": rank})
+    return 404, b"Not Found"
+
+
+async def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, store: LeaderboardStore = None):
+    """Start the server; returns (asyncio server, store)"""
+    store = store or LeaderboardStore()
+    store.start()
+
+    async def connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except RequestError as e:
+                    writer.write(_response(e.status, _json({"error": str(e)}), keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, headers, body = request
+                status, payload = await handle(store, method, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(connection, host, port)
+    return server, store
+
+
+# ------------------------------------------------------------ load test
+
+async def _request(reader, writer, method: str, path: str, host: str, body: bytes = b"") -> tuple:
+    head = f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+    writer.write(f"{head}Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return int(status_line.split()[1]), await reader.readexactly(length)
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+async def load_test(url: str, clients: int = 64, requests: int = 5000, post_ratio: float = 0.5,
+                    seed: int = 0, top_k: int = TOP_K) -> dict:
+    """Hammer a leaderboard with keep-alive clients; latency percentiles, throughput and a lost-write check"""
+    parts = urlsplit(url)
+    host, port, path = parts.hostname, parts.port or 80, parts.path or "/"
+    rng = random.Random(seed)
+    plan = [("POST" if rng.random() < post_ratio else "GET", rng.randint(0, 5000)) for _ in range(requests)]
+    latencies = {"GET": [], "POST": []}
+    posted, errors = [], 0
+    cursor = iter(enumerate(plan))
+
+    async def client(number):
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i, (method, kills) in cursor:
+                body = b""
+                if method == "POST":
+                    entry = {"name": f"load-{seed}-{number}-{i}", "kills": kills, "mode": "normal", "level": 1}
+                    body = _json(entry)
+                start = time.perf_counter()
+                status, _ = await _request(reader, writer, method, path, host, body)
+                latencies[method].append(time.perf_counter() - start)
+                if status != 200:
+                    errors += 1
+                elif method == "POST":
+                    posted.append((entry["name"], kills))
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(clients)))
+    elapsed = time.perf_counter() - start
+    after = await _fetch_board(host, port, path)
+
+    # Every accepted POST that beats the final K-th score must be on the board, even
+    # when other clients or processes write to the same store concurrently
+    names = {e["name"] for e in after}
+    threshold = min((e["kills"] for e in after), default=0) if len(after) >= top_k else -1
+    lost = sum(1 for name, kills in posted if kills > threshold and name not in names)
+    report = {"clients": clients, "requests": requests, "seconds": round(elapsed, 3),
+              "throughput": round(requests / elapsed, 1), "errors": errors, "lost_writes": lost}
+    for method, values in latencies.items():
+        if values:
+            report[method] = {"count": len(values),
+                              "p50_ms": round(percentile(values, 50) * 1000, 2),
+                              "p99_ms": round(percentile(values, 99) * 1000, 2)}
+    return report
+
+
+async def _fetch_board(host, port, path) -> list:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return json.loads((await _request(reader, writer, "GET", path, host))[1])
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def _run_load_test(args):
+    server = store = None
+    url = args.url
+    if not url:
+        # In-process server on a free port with a throwaway store
+        scratch = Path(args.store).with_name("leaderboard.loadtest.json")
+        scratch.unlink(missing_ok=True)
+        store = LeaderboardStore(scratch, args.top_k)
+        server, store = await serve("127.0.0.1", 0, store)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+    print(f"  {args.clients} clients, {args.requests} requests ({args.post_ratio:.0%} POST) against {url}")
+    report = await load_test(url, args.clients, args.requests, args.post_ratio, args.seed, args.top_k)
+    for method in ("GET", "POST"):
+        if method in report:
+            r = report[method]
+            print(f"  {method:<5} {r['count']:>6} requests  p50 {r['p50_ms']:7.2f} ms  p99 {r['p99_ms']:7.2f} ms")
+    print(f"\n  {report['throughput']:,.0f} requests/s over {report['seconds']}s, "
+          f"{report['errors']} errors, {report['lost_writes']} lost writes")
+    if store:
+        print(f"  {store.stats['submitted']} submissions in {store.stats['batches']} batches, "
+              f"{store.stats['writes']} store writes")
+        await store.close()
+        server.close()
+        await server.wait_closed()
+        if store.path and store.path.exists():
+            store.path.unlink()
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=1))
+        print(f"  Report saved to: {args.out}")
+    return report
+
+
+async def _run_server(args):
+    store = LeaderboardStore(args.store, args.top_k)
+    server, store = await serve(args.host, args.port, store)
+    print(f"  Serving {len(store.board)} entries from {args.store} on http://{args.host}:{args.port}/")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local leaderboard server (worker contract) and load generator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--store", default=str(STORE_PATH), help="JSON file standing in for the KV namespace")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--load-test", action="store_true", help="run the load generator instead of serving")
+    parser.add_argument("--url", help="load-test this server instead of an in-process one")
+    parser.add_argument("--clients", type=int, default=64, help="concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--post-ratio", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the load-test report as JSON")
+    args = parser.parse_args()
+
+    if args.load_test:
+        print("\n--- Load Testing Leaderboard ---\n")
+        asyncio.run(_run_load_test(args))
+    else:
+        print("\n--- Leaderboard Server ---\n")
+        try:
+            asyncio.run(_run_server(args))
+        except KeyboardInterrupt:
+            pass
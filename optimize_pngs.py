@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Lossless PNG optimization pass for the assets tree
+Recompresses every PNG on a process pool, converts to indexed color when the image
+has 256 colors or fewer, strips metadata chunks, and writes a before/after size report.
+A result is only kept if it is smaller and decodes to exactly the same RGBA pixels.
+"""
+
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+REPORT_PATH = Path("assets") / "png_report.json"
+
+
+def to_indexed(img):
+    """Exact RGBA -> P conversion (palette + tRNS alpha), or None if over 256 colors"""
+    from PIL import Image
+
+    rgba = np.asarray(img.convert("RGBA"))
+    packed = rgba.reshape(-1, 4).copy().view(np.uint32).ravel()
+    colors, indices = np.unique(packed, return_inverse=True)
+    if len(colors) > 256:
+        return None
+
+    palette = colors.view(np.uint8).reshape(-1, 4)
+    indexed = Image.fromarray(indices.astype(np.uint8).reshape(rgba.shape[:2]), "P")
+    indexed.putpalette(palette[:, :3].tobytes(), "RGB")
+    if (palette[:, 3] != 255).any():
+        indexed.info["transparency"] = palette[:, 3].tobytes()
+    return indexed
+
+
+def _encode(img) -> bytes:
+    buf = io.BytesIO()
+    kwargs = {"optimize": True}
+    if "transparency" in img.info:
+        kwargs["transparency"] = img.info["transparency"]
+    img.save(buf, "PNG", **kwargs)
+    return buf.getvalue()
+
+
+def _rgba(data: bytes) -> np.ndarray:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        return np.asarray(img.convert("RGBA"))
+
+
+def optimize_png(path, dry_run: bool = False) -> dict:
+    """Optimize one PNG in place; returns its report row"""
+    from PIL import Image
+
+    path = Path(path)
+    original = path.read_bytes()
+    row = {"path": path.as_posix(), "before": len(original), "after": len(original), "mode": None}
+
+    try:
+        with Image.open(io.BytesIO(original)) as img:
+            img.load()
+            row["mode"] = img.mode
+            reference = np.asarray(img.convert("RGBA"))
+
+            # Drop every ancillary chunk (text, time, exif, icc) except transparency
+            stripped = img.copy()
+            stripped.info = {k: v for k, v in img.info.items() if k == "transparency"}
+
+            candidates = [("recompressed", stripped)]
+            indexed = to_indexed(img) if img.mode != "P" else None
+            if indexed is not None:
+                candidates.append(("indexed", indexed))
+
+        best_data, best_kind = original, None
+        for kind, candidate in candidates:
+            data = _encode(candidate)
+            if len(data) < len(best_data) and np.array_equal(_rgba(data), reference):
+                best_data, best_kind = data, kind
+    except Exception as e:
+        row["error"] = str(e)
+        return row
+
+    row["after"] = len(best_data)
+    row["result"] = best_kind or "unchanged"
+    if best_kind and not dry_run:
+        tmp_path = path.with_suffix(".png.tmp")
+        tmp_path.write_bytes(best_data)
+        os.replace(tmp_path, path)
+    return row
+
+
+def optimize_tree(root="assets", jobs: int = None, dry_run: bool = False, report_path=REPORT_PATH) -> dict:
+    """Optimize every PNG under root on a process pool and write the size report"""
+    print("\n--- Optimizing PNGs ---\n")
+    start = time.perf_counter()
+
+    paths = sorted(Path(root).rglob("*.png"))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        rows = list(pool.map(optimize_png, paths, [dry_run] * len(paths), chunksize=8))
+
+    before = sum(r["before"] for r in rows)
+    after = sum(r["after"] for r in rows)
+    report = {
+        "files": len(rows),
+        "changed": sum(1 for r in rows if r.get("result") not in (None, "unchanged")),
+        "errors": sum(1 for r in rows if "error" in r),
+        "bytes_before": before,
+        "bytes_after": after,
+        "dry_run": dry_run,
+        "rows": sorted(rows, key=lambda r: r["before"] - r["after"], reverse=True),
+    }
+
+    if report_path:
+        Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1, ensure_ascii=False)
+
+    for r in report["rows"][:10]:
+        if r["before"] > r["after"]:
+            print(f"  {r['before']:>9,} -> {r['after']:>9,}  {r['path']}")
+    saved = before - after
+    print(f"\n  {len(rows)} PNGs, {report['changed']} smaller: {before:,} -> {after:,} bytes "
+          f"({saved / max(before, 1):.1%} saved) in {time.perf_counter() - start:.1f}s")
+    if report_path:
+        print(f"  Report saved to: {report_path}")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Losslessly optimize PNG assets")
+    parser.add_argument("root", nargs="?", default="assets")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="report savings without rewriting files")
+    parser.add_argument("--report", default=str(REPORT_PATH))
+    args = parser.parse_args()
+
+    optimize_tree(args.root, args.jobs, args.dry_run, args.report)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Palette-swap engine for enemy variants (recolors, elites, boss tint, hit flash)
+Each sprite is split once into an index buffer and its exact RGBA palette (<= 256
+colors). Variants are computed on the palette only and applied as a lookup table
+(lut[indices]), so a variant costs N palette entries instead of a full RGBA image.
+For runtime swapping every sprite is exported as <name>_index.png (8-bit indices) and
+<name>_palette.png (one row per variant, one column per index) under assets/palettes.
+"""
+
+import io
+import json
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+
+from sprite_dsl import hex_to_rgb
+
+PALETTE_DIR = Path("assets") / "palettes"
+MAX_COLORS = 256
+
+# Luma weights for gradient maps
+LUMA = np.array([0.299, 0.587, 0.114])
+
+
+class PaletteError(ValueError):
+    """Raised for images that cannot be represented with an indexed palette"""
+
+
+def index_rgba(rgba: np.ndarray):
+    """Split an RGBA array into (uint8 index buffer, (N, 4) uint8 palette)
+
+    Fully transparent pixels are merged into one entry, which is always index 0.
+    """
+    rgba = np.ascontiguousarray(rgba, dtype=np.uint8).copy()
+    rgba[rgba[..., 3] == 0] = 0
+    packed = rgba.reshape(-1, 4).view(np.uint32).ravel()
+    colors, indices = np.unique(packed, return_inverse=True)
+    if len(colors) > MAX_COLORS:
+        raise PaletteError(f"{len(colors)} colors, an indexed palette holds at most {MAX_COLORS}")
+    palette = colors.view(np.uint8).reshape(-1, 4)
+    return indices.astype(np.uint8).reshape(rgba.shape[:2]), palette
+
+
+def apply_lut(indices: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    """RGBA image for an index buffer through a (N, 4) palette lookup table"""
+    return lut[indices]
+
+
+# Palette transforms: (N, 4) uint8 -> (N, 4) uint8, alpha is never changed
+
+def _with_rgb(palette: np.ndarray, rgb: np.ndarray) -> np.ndarray:
+    out = palette.copy()
+    out[:, :3] = np.clip(np.rint(rgb), 0, 255).astype(np.uint8)
+    return out
+
+
+def tint(palette: np.ndarray, color, amount: float) -> np.ndarray:
+    """Blend every color toward `color` by `amount` (0..1)"""
+    rgb = palette[:, :3].astype(np.float32)
+    return _with_rgb(palette, rgb + (np.asarray(color, np.float32) - rgb) * amount)
+
+
+def gradient_map(palette: np.ndarray, color) -> np.ndarray:
+    """Recolor by luminance: shadows to a dark shade of `color`, highlights toward white"""
+    luma = (palette[:, :3].astype(np.float32) @ LUMA / 255.0)[:, None]
+    color = np.asarray(color, np.float32)
+    dark, light = color * 0.25, color + (255 - color) * 0.6
+    rgb = np.where(luma < 0.5, dark + (color - dark) * (luma / 0.5), color + (light - color) * ((luma - 0.5) / 0.5))
+    return _with_rgb(palette, rgb)
+
+
+def saturate(palette: np.ndarray, amount: float, brightness: float = 1.0) -> np.ndarray:
+    """Scale saturation around each color's luma, then brightness"""
+    rgb = palette[:, :3].astype(np.float32)
+    luma = (rgb @ LUMA)[:, None]
+    return _with_rgb(palette, (luma + (rgb - luma) * amount) * brightness)
+
+
+def flash(palette: np.ndarray, color=(255, 255, 255)) -> np.ndarray:
+    """Every opaque color replaced by a flat flash color (hit feedback)"""
+    return _with_rgb(palette, np.broadcast_to(np.asarray(color, np.float32), palette[:, :3].shape))
+
+
+def variant_palettes(palette: np.ndarray, game_data: dict, enemy: str = None) -> dict:
+    """{variant name: palette}; 'base' is always first and reproduces the source exactly"""
+    variants = {"base": palette}
+    enemy_color = game_data.get("ENEMIES", {}).get(enemy, {}).get("color") if enemy else None
+    if enemy_color:
+        variants["recolor"] = gradient_map(palette, hex_to_rgb(enemy_color))
+    elite_color = game_data.get("RARITY_COLORS", {}).get("LEGENDARY", "#ff8000")
+    variants["elite"] = tint(saturate(palette, 1.35, 1.1), hex_to_rgb(elite_color), 0.2)
+    boss_color = game_data.get("BOSS", {}).get("color", "#8b0000")
+    variants["boss"] = tint(saturate(palette, 1.2, 0.9), hex_to_rgb(boss_color), 0.45)
+    variants["hit_flash"] = flash(palette)
+    return variants
+
+
+def _png_bytes(img) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, "PNG", optimize=True)
+    return buf.getvalue()
+
+
+def export_sprite(name: str, rgba: np.ndarray, game_data: dict, out_dir=PALETTE_DIR, enemy: str = None) -> dict:
+    """Write <name>_index.png and <name>_palette.png; returns sizes for the report"""
+    from PIL import Image
+
+    indices, palette = index_rgba(rgba)
+    variants = variant_palettes(palette, game_data, enemy)
+    table = np.stack(list(variants.values()))  # (variants, N, 4)
+
+    # The base row must reproduce the source pixel for pixel
+    source = rgba.copy()
+    source[source[..., 3] == 0] = 0
+    if not np.array_equal(apply_lut(indices, table[0]), source):
+        raise PaletteError(f"{name}: base palette does not reproduce the source")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index_png = _png_bytes(Image.fromarray(indices, "L"))
+    palette_png = _png_bytes(Image.fromarray(np.ascontiguousarray(table), "RGBA"))
+    (out_dir / f"{name}_index.png").write_bytes(index_png)
+    (out_dir / f"{name}_palette.png").write_bytes(palette_png)
+
+    # What the same variants cost as separate RGBA PNGs
+    rgba_png = sum(len(_png_bytes(Image.fromarray(apply_lut(indices, lut), "RGBA"))) for lut in table)
+    height, width = indices.shape
+    return {
+        "index": f"{name}_index.png",
+        "palette": f"{name}_palette.png",
+        "size": [width, height],
+        "colors": len(palette),
+        "variants": list(variants),
+        "enemy": enemy,
+        "bytes": len(index_png) + len(palette_png),
+        "rgba_bytes": rgba_png,
+        "memory": width * height + table.size,
+        "rgba_memory": width * height * 4 * len(table),
+    }
+
+
+def remove_white_background(rgba: np.ndarray) -> np.ndarray:
+    """Same keying as AssetLoader.removeWhiteBackground in index.html"""
+    rgb = rgba[..., :3].astype(np.int16)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    white = (r > 240) & (g > 240) & (b > 240)
+    gray = (r > 220) & (g > 220) & (b > 220) & (np.abs(r - g) < 15) & (np.abs(g - b) < 15)
+    out = rgba.copy()
+    out[white | gray, 3] = 0
+    return out
+
+
+def keyed_sprites(html_path="index.html") -> set:
+    """Loader keys the client strips white backgrounds from"""
+    match = re.search(r"const enemySprites = \[([^\]]*)\]", Path(html_path).read_text(encoding="utf-8"))
+    return set(re.findall(r"'(\w+)'", match.group(1))) if match else set()
+
+
+def enemy_sources(html_path="index.html") -> dict:
+    """{enemy id: (sprite path, white background keyed at runtime)} for the enemies index.html loads"""
+    from preload_plan import html_assets
+
+    keyed = keyed_sprites(html_path)
+    return {key[len("enemy_"):]: (path, key in keyed) for path, key in html_assets(html_path).items()
+            if key.startswith("enemy_") and path.lower().endswith(".png") and Path(path).exists()}
+
+
+def build_palettes(sources: dict = None, out_dir=PALETTE_DIR, game_data_path="game_data.json",
+                   html_path="index.html") -> dict:
+    """Export palette textures for {name: (PNG path, key white)} (default: the game's enemies)"""
+    from PIL import Image
+
+    print("\n--- Building Palette Swaps ---\n")
+    start = time.perf_counter()
+
+    with open(game_data_path, encoding="utf-8") as f:
+        game_data = json.load(f)
+    sources = sources if sources is not None else enemy_sources(html_path)
+    enemies = {name.lower(): name for name in game_data.get("ENEMIES", {})}
+
+    sprites = {}
+    for name, (path, key_white) in sorted(sources.items()):
+        with Image.open(path) as img:
+            rgba = np.asarray(img.convert("RGBA"))
+        if key_white:
+            rgba = remove_white_background(rgba)
+        try:
+            entry = export_sprite(name, rgba, game_data, out_dir, enemies.get(name.lower()))
+        except PaletteError as e:
+            print(f"  Skipped {path}: {e}")
+            continue
+        entry["source"] = Path(path).as_posix()
+        sprites[name] = entry
+        print(f"  {name:<12} {entry['colors']:>3} colors x {len(entry['variants'])} variants: "
+              f"{entry['bytes']:>7,} bytes (vs {entry['rgba_bytes']:>8,} as RGBA PNGs)")
+
+    index = {"rows": "one palette row per variant, in 'variants' order", "sprites": sprites}
+    with open(Path(out_dir) / "palettes.json", "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+
+    disk = sum(s["bytes"] for s in sprites.values())
+    disk_rgba = sum(s["rgba_bytes"] for s in sprites.values())
+    memory = sum(s["memory"] for s in sprites.values())
+    memory_rgba = sum(s["rgba_memory"] for s in sprites.values())
+    print(f"\n  {len(sprites)} sprites: {disk:,} bytes on disk vs {disk_rgba:,} "
+          f"({disk / max(disk_rgba, 1):.0%}), {memory:,} bytes decoded vs {memory_rgba:,} "
+          f"({memory / max(memory_rgba, 1):.0%}) in {time.perf_counter() - start:.1f}s")
+    print(f"  Palette index saved to: {Path(out_dir) / 'palettes.json'}")
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export indexed sprites and palette-swap textures")
+    parser.add_argument("sources", nargs="*", help="PNG files (default: the enemy sprites index.html loads)")
+    parser.add_argument("--out", default=str(PALETTE_DIR))
+    parser.add_argument("--game-data", default="game_data.json")
+    parser.add_argument("--html", default="index.html")
+    parser.add_argument("--key-white", action="store_true", help="make white backgrounds transparent first")
+    args = parser.parse_args()
+
+    sources = {Path(p).stem: (p, args.key_white) for p in args.sources} if args.sources else None
+    build_palettes(sources, args.out, args.game_data, args.html)
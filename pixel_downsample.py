@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Pixel-art-aware batched downsampler for generated images
+Replaces Image.NEAREST (one arbitrary sample per block) with the dominant color of
+each block: colors are quantized, the most common one wins, and the output pixel
+is the mean of the block's pixels in that color. Optionally snaps to a palette and
+cleans up the alpha edge (hard 0/255 alpha, orphan pixels removed). Images of the
+same source and target size are processed together in chunks of CHUNK images,
+with no per-pixel loops.
+"""
+
+import time
+
+import numpy as np
+
+QUANT_BITS = 5
+ALPHA_THRESHOLD = 0.5
+CHUNK = 8  # images per array pass; the temporaries are several times the source size
+
+
+def _blocks(batch: np.ndarray, size: tuple) -> np.ndarray:
+    """(B, H, W, 4) -> (B * th * tw, k_y * k_x, 4) blocks, cropping the remainder evenly"""
+    count, height, width, _ = batch.shape
+    tw, th = size
+    ky, kx = max(1, height // th), max(1, width // tw)
+    if height < th or width < tw:
+        # Upscaling: repeat pixels so every output pixel maps to a whole block
+        batch = batch.repeat(-(-th // height), axis=1).repeat(-(-tw // width), axis=2)
+        count, height, width, _ = batch.shape
+        ky, kx = height // th, width // tw
+    oy, ox = (height - ky * th) // 2, (width - kx * tw) // 2
+    batch = batch[:, oy:oy + ky * th, ox:ox + kx * tw]
+    blocks = batch.reshape(count, th, ky, tw, kx, 4).transpose(0, 1, 3, 2, 4, 5)
+    return blocks.reshape(count * th * tw, ky * kx, 4)
+
+
+def _mode(codes: np.ndarray) -> np.ndarray:
+    """Most common value per row (ties go to the smaller value), fully vectorized"""
+    ordered = np.sort(codes, axis=1)
+    rows, width = ordered.shape
+    positions = np.broadcast_to(np.arange(width, dtype=np.int32), ordered.shape)
+    new_run = np.ones(ordered.shape, dtype=bool)
+    new_run[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    run_start = np.maximum.accumulate(np.where(new_run, positions, 0), axis=1)
+    run_length = positions - run_start + 1
+    return ordered[np.arange(rows), run_length.argmax(axis=1)]
+
+
+def dominant_colors(blocks: np.ndarray, alpha_threshold: float = ALPHA_THRESHOLD,
+                    bits: int = QUANT_BITS) -> np.ndarray:
+    """(N, K, 4) blocks -> (N, 4) colors with hard alpha"""
+    opaque = blocks[..., 3] >= 128
+    # Transparent pixels get unique codes above every color, so they never form a run
+    sentinel = (1 << (3 * bits)) + np.arange(blocks.shape[1])
+    dtype = np.uint16 if sentinel[-1] <= np.iinfo(np.uint16).max else np.int32
+    # Built one channel at a time, in place, so no (N, K, 3) temporary is needed
+    codes = (blocks[..., 0] >> (8 - bits)).astype(dtype)
+    for channel in (1, 2):
+        codes <<= bits
+        codes |= blocks[..., channel] >> (8 - bits)
+    np.copyto(codes, np.broadcast_to(sentinel.astype(dtype), codes.shape), where=~opaque)
+
+    # Flat blocks (common in pixel art) already know their winner; only mixed ones are sorted
+    winner = codes[:, 0].copy()
+    mixed = ~(codes == codes[:, :1]).all(axis=1)
+    if mixed.any():
+        winner[mixed] = _mode(codes[mixed])
+    members = codes == winner[:, None]
+    # Mean of the pixels that share the winning color, in integers to keep temporaries small
+    sums = np.stack([np.where(members, blocks[..., c], 0).sum(axis=1, dtype=np.uint32) for c in range(3)], axis=1)
+    mean = sums / np.maximum(members.sum(axis=1), 1)[:, None]
+
+    colors = np.zeros((len(blocks), 4), dtype=np.uint8)
+    colors[:, :3] = np.rint(mean).astype(np.uint8)
+    colors[:, 3] = np.where(opaque.mean(axis=1) >= alpha_threshold, 255, 0)
+    colors[colors[:, 3] == 0] = 0
+    return colors
+
+
+def snap_to_palette(rgba: np.ndarray, palette) -> np.ndarray:
+    """Replace every opaque color with the nearest palette color (squared RGB distance)"""
+    palette = np.asarray(palette, dtype=np.int32).reshape(-1, 3)
+    flat = rgba.reshape(-1, 4)
+    distance = ((flat[:, None, :3].astype(np.int32) - palette[None]) ** 2).sum(axis=2)
+    out = flat.copy()
+    opaque = out[:, 3] > 0
+    out[opaque, :3] = palette[distance[opaque].argmin(axis=1)]
+    return out.reshape(rgba.shape)
+
+
+def despeckle(rgba: np.ndarray) -> np.ndarray:
+    """Clear opaque pixels with no opaque 4-neighbour (noise left on the alpha edge)"""
+    opaque = rgba[..., 3] > 0
+    padded = np.pad(opaque, [(0, 0)] * (opaque.ndim - 2) + [(1, 1), (1, 1)])
+    neighbours = (padded[..., :-2, 1:-1] | padded[..., 2:, 1:-1] | padded[..., 1:-1, :-2] | padded[..., 1:-1, 2:])
+    out = rgba.copy()
+    out[opaque & ~neighbours] = 0
+    return out
+
+
+def key_background(batch: np.ndarray, tolerance: int = 24) -> np.ndarray:
+    """Make the border's dominant color transparent (for models that ignore 'transparent background')"""
+    border = np.concatenate([batch[:, 0], batch[:, -1], batch[:, :, 0], batch[:, :, -1]], axis=1)
+    background = dominant_colors(border, alpha_threshold=0.0)
+    distance = np.abs(batch[..., :3].astype(np.int16) - background[:, None, None, :3].astype(np.int16)).max(axis=3)
+    out = batch.copy()
+    out[distance <= tolerance, 3] = 0
+    return out
+
+
+def downsample_array(batch: np.ndarray, size: tuple, palette=None, alpha_threshold: float = ALPHA_THRESHOLD,
+                     clean_edges: bool = True, keyed: bool = False) -> np.ndarray:
+    """(B, H, W, 4) uint8 -> (B, th, tw, 4) uint8"""
+    if keyed:
+        batch = key_background(batch)
+    tw, th = size
+    colors = dominant_colors(_blocks(batch, size), alpha_threshold).reshape(len(batch), th, tw, 4)
+    if palette is not None:
+        colors = snap_to_palette(colors, palette)
+    if clean_edges:
+        colors = despeckle(colors)
+    return colors
+
+
+def downsample_batch(images, sizes, palette=None, alpha_threshold: float = ALPHA_THRESHOLD,
+                     clean_edges: bool = True, keyed: bool = False, chunk: int = CHUNK) -> list:
+    """Downsample PIL images to their target sizes; same-shaped jobs share array passes of `chunk`"""
+    from PIL import Image
+
+    images = list(images)
+    sizes = [tuple(s) for s in sizes]
+    groups = {}
+    for i, (img, size) in enumerate(zip(images, sizes)):
+        groups.setdefault((img.size, size), []).append(i)
+
+    results = [None] * len(images)
+    for (_, size), members in groups.items():
+        for start in range(0, len(members), chunk):
+            part = members[start:start + chunk]
+            batch = np.stack([np.asarray(images[i].convert("RGBA")) for i in part])
+            out = downsample_array(batch, size, palette, alpha_threshold, clean_edges, keyed)
+            for i, array in zip(part, out):
+                results[i] = Image.fromarray(array, "RGBA")
+    return results
+
+
+def downsample(img, size: tuple, **kwargs):
+    """Single-image convenience wrapper around downsample_batch"""
+    return downsample_batch([img], [size], **kwargs)[0]
+
+
+def load_palette(path) -> np.ndarray:
+    """(N, 3) palette from the distinct opaque colors of an image (e.g. a palette texture)"""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        rgba = np.asarray(img.convert("RGBA")).reshape(-1, 4)
+    return np.unique(rgba[rgba[:, 3] > 0, :3], axis=0)
+
+
+def benchmark(count: int = 16, source: int = 1024, target: int = 64, seed: int = 0):
+    """Compare against Image.NEAREST on synthetic noisy blocky images"""
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    block = source // target
+    base = rng.integers(0, 256, (count, target, target, 4), dtype=np.uint8)
+    base[..., 3] = np.where(rng.random((count, target, target)) < 0.7, 255, 0)
+    noisy = base.repeat(block, axis=1).repeat(block, axis=2).astype(np.int16)
+    # 20% of pixels replaced by random noise, like generated-image dithering and JPEG-ish artifacts
+    mask = rng.random(noisy.shape[:3]) < 0.2
+    noisy[mask, :3] = rng.integers(0, 256, (mask.sum(), 3))
+    images = [Image.fromarray(a.astype(np.uint8), "RGBA") for a in noisy]
+
+    start = time.perf_counter()
+    nearest = [img.resize((target, target), Image.NEAREST) for img in images]
+    t_nearest = time.perf_counter() - start
+    start = time.perf_counter()
+    ours = downsample_batch(images, [(target, target)] * count, clean_edges=False)
+    t_ours = time.perf_counter() - start
+
+    def pixel_accuracy(results):
+        return np.mean([(np.abs(np.asarray(r)[..., :3].astype(int) - b[..., :3]).max(axis=2) <= 8)[b[..., 3] > 0].mean()
+                        for r, b in zip(results, base)])
+
+    print(f"  {count} images {source}px -> {target}px")
+    print(f"  NEAREST:  {t_nearest * 1000:7.1f} ms, {pixel_accuracy(nearest):.1%} pixels correct")
+    print(f"  dominant: {t_ours * 1000:7.1f} ms, {pixel_accuracy(ours):.1%} pixels correct")
+
+
+if __name__ == "__main__":
+    import argparse
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Downsample generated images to pixel-art sprites")
+    parser.add_argument("images", nargs="*", help="images to downsample (omit to run the benchmark)")
+    parser.add_argument("--size", type=int, nargs=2, default=(64, 64), metavar=("W", "H"))
+    parser.add_argument("--palette", help="image whose colors form the target palette")
+    parser.add_argument("--key-background", action="store_true", help="make the border color transparent")
+    parser.add_argument("--out", default=".", help="output directory")
+    args = parser.parse_args()
+
+    if not args.images:
+        benchmark()
+    else:
+        from PIL import Image
+
+        palette = load_palette(args.palette) if args.palette else None
+        sources = [Image.open(p) for p in args.images]
+        results = downsample_batch(sources, [tuple(args.size)] * len(sources), palette, keyed=args.key_background)
+        Path(args.out).mkdir(parents=True, exist_ok=True)
+        for path, img in zip(args.images, results):
+            out_path = Path(args.out) / f"{Path(path).stem}_{args.size[0]}x{args.size[1]}.png"
+            img.save(out_path, "PNG")
+            print(f"  Created {out_path}")
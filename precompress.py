@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Precompressed static variants and a service-worker precache list for dist/
+Every compressible file (HTML, JS, CSS, JSON, MIDI, fonts, ...) gets a .gz (level 9)
+and, if the brotli package is installed, a .br (quality 11) sibling, compressed on
+a process pool. Variants that save less than MIN_SAVING are not written. Hosts that
+serve precompressed files (nginx gzip_static/brotli_static, Cloudflare, Netlify)
+pick them up as-is; GitHub Pages ignores them and keeps compressing on the fly.
+
+sw.js precaches every file build_web.py wrote, keyed by the content hashes in the
+asset manifest, under a cache named after the manifest version. Second visits are
+served from that cache with no network round trips. A new build changes the version:
+the browser installs the new worker, which takes over (and drops the old cache) once
+no open tab still runs the previous version.
+
+    python build_web.py && python precompress.py
+"""
+
+import gzip
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from pathlib import Path
+
+from build_cache import hash_bytes, hash_file
+
+DIST_DIR = Path("dist")
+ASSET_MANIFEST = Path("assets") / "manifest.json"
+PRECACHE_NAME = "precache_manifest.json"
+SERVICE_WORKER = "sw.js"
+COMPRESSIBLE = {".html", ".js", ".css", ".json", ".svg", ".txt", ".xml", ".mid", ".midi", ".ttf", ".otf", ".wasm"}
+MIN_BYTES = 256
+MIN_SAVING = 0.1
+
+SW_TEMPLATE = """// Generated by precompress.py; do not edit
+const VERSION = %(version)s;
+const PRECACHE = %(urls)s;
+const CACHE = 'gold-or-blood-' + VERSION;
+
+// The app shell: the page this worker was registered from
+const SHELL = new URL('index.html', self.registration.scope).pathname;
+const ROOT = new URL('./', self.registration.scope).pathname;
+
+// No skipWaiting/clients.claim: a new version waits until every tab on the old one
+// has closed, so a running page never loses the hashed files it was built against
+self.addEventListener('install', event => {
+    event.waitUntil(caches.open(CACHE).then(cache => cache.addAll(PRECACHE)));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(caches.keys()
+        .then(keys => Promise.all(keys.filter(key => key.startsWith('gold-or-blood-') && key !== CACHE)
+            .map(key => caches.delete(key)))));
+});
+
+self.addEventListener('fetch', event => {
+    if (event.request.method !== 'GET') return;
+    const url = new URL(event.request.url);
+    if (url.origin !== self.location.origin) return;
+    if (event.request.mode === 'navigate') {
+        // Only the app shell comes from the cache (the copy that matches this version's
+        // files); other pages always go to the network and are never stored
+        if (url.pathname !== ROOT && url.pathname !== SHELL) return;
+        event.respondWith(caches.open(CACHE)
+            .then(cache => cache.match('index.html'))
+            .then(cached => cached || fetch(event.request)));
+        return;
+    }
+    // Hashed files never change, so a cache hit is always current
+    event.respondWith(caches.match(event.request).then(cached => cached || fetch(event.request)));
+});
+"""
+
+REGISTER_SNIPPET = ("<script>if ('serviceWorker' in navigator) window.addEventListener('load', () => "
+                    "navigator.serviceWorker.register('sw.js'));</script>")
+
+
+def brotli_available() -> bool:
+    return find_spec("brotli") is not None
+
+
+def compress_file(path: str, use_brotli: bool) -> dict:
+    """Write path.gz (and path.br); module-level so the process pool can pickle it"""
+    source = Path(path)
+    data = source.read_bytes()
+    result = {"path": source.as_posix(), "bytes": len(data)}
+    encoders = {"gz": lambda d: gzip.compress(d, compresslevel=9, mtime=0)}
+    if use_brotli:
+        import brotli
+        encoders["br"] = lambda d: brotli.compress(d, quality=11)
+
+    for suffix, encode in encoders.items():
+        target = source.with_name(f"{source.name}.{suffix}")
+        if target.exists() and target.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+            result[suffix] = target.stat().st_size
+            continue
+        compressed = encode(data)
+        if len(compressed) <= len(data) * (1 - MIN_SAVING):
+            target.write_bytes(compressed)
+            result[suffix] = len(compressed)
+        elif target.exists():
+            target.unlink()
+    return result
+
+
+def compressible(root) -> list:
+    return sorted(p for p in Path(root).rglob("*")
+                  if p.is_file() and p.suffix.lower() in COMPRESSIBLE and p.stat().st_size >= MIN_BYTES)
+
+
+def precompress(root=DIST_DIR, jobs: int = None) -> list:
+    """Compress every compressible file under root in parallel"""
+    use_brotli = brotli_available()
+    if not use_brotli:
+        print("  Warning: brotli is not installed (pip install brotli), writing gzip variants only")
+    paths = compressible(root)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(compress_file, [p.as_posix() for p in paths], [use_brotli] * len(paths)))
+
+
+def precache_entries(root=DIST_DIR, asset_manifest_path=ASSET_MANIFEST) -> list:
+    """[{url, revision, bytes}] for every file in the build manifest
+
+    Revisions come from the asset manifest's SHA-256 for copied assets and from the
+    build manifest for generated bundles, so nothing is re-hashed.
+    """
+    from build_web import MANIFEST_NAME
+
+    root = Path(root)
+    with open(root / MANIFEST_NAME, encoding="utf-8") as f:
+        built = json.load(f)["files"]
+    assets = {}
+    if Path(asset_manifest_path).exists():
+        with open(asset_manifest_path, encoding="utf-8") as f:
+            assets = json.load(f).get("files", {})
+
+    entries = []
+    for url, entry in sorted(built.items()):
+        if url == "index.html":
+            continue  # changes with the service worker registration below; handled separately
+        revision = assets.get(entry["source"], {}).get("sha256") or entry["sha256"]
+        entries.append({"url": url, "revision": revision[:16], "bytes": entry["bytes"]})
+    return entries
+
+
+def write_service_worker(root=DIST_DIR, asset_manifest_path=ASSET_MANIFEST) -> dict:
+    """Register sw.js in index.html and write sw.js plus the versioned precache manifest"""
+    root = Path(root)
+    page = root / "index.html"
+    html = page.read_text(encoding="utf-8")
+    if REGISTER_SNIPPET not in html:
+        html = html.replace("</body>", f"{REGISTER_SNIPPET}\n</body>", 1)
+        page.write_text(html, encoding="utf-8")
+
+    entries = precache_entries(root, asset_manifest_path)
+    entries.append({"url": "index.html", "revision": hash_file(page)[:16], "bytes": page.stat().st_size})
+    version = hash_bytes(json.dumps([[e["url"], e["revision"]] for e in entries]).encode("utf-8"))[:12]
+    manifest = {"version": version, "cache": f"gold-or-blood-{version}",
+                "bytes": sum(e["bytes"] for e in entries), "entries": entries}
+    with open(root / PRECACHE_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    (root / SERVICE_WORKER).write_text(SW_TEMPLATE % {
+        "version": json.dumps(version),
+        "urls": json.dumps([e["url"] for e in entries], indent=4, ensure_ascii=False),
+    }, encoding="utf-8")
+    return manifest
+
+
+def build(root=DIST_DIR, asset_manifest_path=ASSET_MANIFEST, jobs: int = None, service_worker: bool = True) -> dict:
+    print("\n--- Precompressing Static Files ---\n")
+    start = time.perf_counter()
+    root = Path(root)
+
+    manifest = None
+    if service_worker:
+        # Written first so sw.js and the updated index.html are compressed too
+        manifest = write_service_worker(root, asset_manifest_path)
+        print(f"  {SERVICE_WORKER}: {len(manifest['entries'])} files precached ({manifest['bytes']:,} bytes), "
+              f"version {manifest['version']}")
+
+    results = precompress(root, jobs)
+    total = sum(r["bytes"] for r in results)
+    for suffix in ("gz", "br"):
+        done = [r for r in results if suffix in r]
+        if done:
+            before = sum(r["bytes"] for r in done)
+            after = sum(r[suffix] for r in done)
+            print(f"  .{suffix}: {len(done)} files, {before:,} -> {after:,} bytes ({after / before:.0%})")
+    print(f"\n  {len(results)} compressible files ({total:,} bytes) in {time.perf_counter() - start:.2f}s")
+    return {"precache": manifest, "compressed": results}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write .gz/.br variants and a service-worker precache list")
+    parser.add_argument("root", nargs="?", default=str(DIST_DIR), help="build output from build_web.py")
+    parser.add_argument("--asset-manifest", default=str(ASSET_MANIFEST))
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--no-service-worker", action="store_true", help="only write compressed variants")
+    args = parser.parse_args()
+
+    build(args.root, args.asset_manifest, args.jobs, not args.no_service_worker)
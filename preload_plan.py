@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Startup preload planner driven by game_data.json spawn timings
+Cross-references the assets index.html loads with when the game first needs them:
+enemies by ENEMIES.*.appearsAfterSeconds, the boss by BOSS.appearsAfterSeconds,
+non-starting weapons and items by the first level-up. Tier 0 is everything the first
+frame needs; later tiers are keyed to spawn times so the client can stream them in
+the background after the game starts.
+"""
+
+import json
+import re
+import time
+from pathlib import Path
+
+PLAN_PATH = Path("assets") / "preload_plan.json"
+
+# Seconds into a run before the first level-up screen can show weapon and item icons
+LEVEL_UP_SECONDS = 15
+# Start streaming a tier this many seconds before it is needed
+LEAD_SECONDS = 10
+# Slow mobile link used for the time-to-first-frame estimate (kbit/s)
+DEFAULT_KBPS = 1600
+
+ASSET_PAIR = re.compile(r"""\[\s*'(\w+)'\s*,\s*['"](assets/[^'"]+)['"]\s*\]""")
+AUDIO_ASSIGN = re.compile(r"""this\.(\w+)\s*=\s*new window\.Audio\(['"](assets/[^'"]+)['"]\)""")
+CSS_URL = re.compile(r"""url\(['"]?(assets/[^'")]+)['"]?\)""")
+CLIENT_ENEMY = re.compile(r"""(\w+):\s*\{[^{}]*?\btime:\s*(\d+)""")
+CLIENT_WEAPON = re.compile(r"""\bweapon:\s*'(\w+)'""")
+
+
+def html_assets(html_path="index.html") -> dict:
+    """{path: loader key} for every asset index.html loads"""
+    text = Path(html_path).read_text(encoding="utf-8")
+    assets = {}
+    for key, path in ASSET_PAIR.findall(text):
+        assets.setdefault(path, key)
+    for key, path in AUDIO_ASSIGN.findall(text):
+        assets.setdefault(path, key)
+    for path in CSS_URL.findall(text):
+        assets.setdefault(path, "font" if "/font/" in path else "css")
+    return assets
+
+
+def client_enemy_times(html_path="index.html") -> dict:
+    """Spawn times from the client's inline ENEMIES table ({id: time})"""
+    text = Path(html_path).read_text(encoding="utf-8")
+    match = re.search(r"const ENEMIES = \{(.*?)\n\};", text, re.S)
+    if not match:
+        return {}
+    return {name: int(seconds) for name, seconds in CLIENT_ENEMY.findall(match.group(1))}
+
+
+def spawn_timings(game_data: dict, html_path="index.html") -> dict:
+    """{lowercase enemy id: seconds}, from game_data.json first and the client table for the rest"""
+    timings = {name.lower(): seconds for name, seconds in client_enemy_times(html_path).items()}
+    for name, enemy in game_data.get("ENEMIES", {}).items():
+        timings[name.lower()] = enemy.get("appearsAfterSeconds", 0)
+    return timings
+
+
+def starting_weapons(game_data: dict, html_path="index.html") -> set:
+    weapons = {c["weapon"] for c in game_data.get("CHARACTERS", {}).values() if "weapon" in c}
+    text = Path(html_path).read_text(encoding="utf-8")
+    return weapons | set(CLIENT_WEAPON.findall(text))
+
+
+def first_needed(key: str, path: str, timings: dict, boss_seconds: int, start_weapons: set) -> int:
+    """Seconds into a run when an asset is first drawn or played"""
+    lower = key.lower()
+    if lower.startswith("boss") or "boss" in path.lower():
+        return boss_seconds
+    if lower.startswith("enemy_"):
+        return timings.get(lower[len("enemy_"):], 0)
+    if lower.startswith("weapon_"):
+        weapon = lower[len("weapon_"):].split("_")[0]
+        return 0 if weapon in start_weapons else LEVEL_UP_SECONDS
+    if lower.startswith("item_"):
+        return LEVEL_UP_SECONDS
+    return 0
+
+
+def build_plan(html_path="index.html", game_data_path="game_data.json", kbps: int = DEFAULT_KBPS) -> dict:
+    with open(game_data_path, encoding="utf-8") as f:
+        game_data = json.load(f)
+
+    timings = spawn_timings(game_data, html_path)
+    boss_seconds = game_data.get("BOSS", {}).get("appearsAfterSeconds", max(timings.values(), default=0))
+    start_weapons = starting_weapons(game_data, html_path)
+
+    by_time = {}
+    missing = []
+    for path, key in html_assets(html_path).items():
+        if not Path(path).is_file():
+            missing.append(path)
+            continue
+        seconds = first_needed(key, path, timings, boss_seconds, start_weapons)
+        by_time.setdefault(seconds, []).append({"key": key, "path": path, "bytes": Path(path).stat().st_size})
+
+    bytes_per_second = kbps * 1000 / 8
+    tiers = []
+    for index, seconds in enumerate(sorted(by_time)):
+        assets = sorted(by_time[seconds], key=lambda a: a["path"])
+        size = sum(a["bytes"] for a in assets)
+        tiers.append({
+            "tier": index,
+            "neededAt": seconds,
+            "prefetchAt": max(0, seconds - LEAD_SECONDS) if index else 0,
+            "bytes": size,
+            "downloadSeconds": round(size / bytes_per_second, 2),
+            "assets": assets,
+        })
+
+    total = sum(t["bytes"] for t in tiers)
+    return {
+        "kbps": kbps,
+        "totalBytes": total,
+        "firstFrameBytes": tiers[0]["bytes"] if tiers else 0,
+        "firstFrameSeconds": tiers[0]["downloadSeconds"] if tiers else 0,
+        "allUpFrontSeconds": round(total / bytes_per_second, 2),
+        "spawnTimings": dict(sorted(timings.items(), key=lambda t: (t[1], t[0]))),
+        "missing": sorted(missing),
+        "tiers": tiers,
+    }
+
+
+def write_plan(html_path="index.html", game_data_path="game_data.json", out_path=PLAN_PATH,
+               kbps: int = DEFAULT_KBPS) -> dict:
+    print("\n--- Building Preload Plan ---\n")
+    start = time.perf_counter()
+
+    plan = build_plan(html_path, game_data_path, kbps)
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=2, ensure_ascii=False)
+
+    for tier in plan["tiers"]:
+        print(f"  tier {tier['tier']} @ {tier['neededAt']:>4}s: {len(tier['assets']):>3} assets "
+              f"{tier['bytes']:>11,} bytes ({tier['downloadSeconds']:.1f}s at {kbps} kbps)")
+    print(f"\n  First frame: {plan['firstFrameSeconds']:.1f}s instead of {plan['allUpFrontSeconds']:.1f}s "
+          f"loading everything up front")
+    for path in plan["missing"]:
+        print(f"  Warning: {path} is referenced but missing")
+    print(f"  Plan saved to: {out_path} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return plan
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Plan tiered asset preloading from spawn timings")
+    parser.add_argument("--html", default="index.html")
+    parser.add_argument("--game-data", default="game_data.json")
+    parser.add_argument("--out", default=str(PLAN_PATH))
+    parser.add_argument("--kbps", type=int, default=DEFAULT_KBPS, help="link speed for the load-time estimate")
+    args = parser.parse_args()
+
+    write_plan(args.html, args.game_data, args.out, args.kbps)
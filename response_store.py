@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+On-disk store of raw (full-resolution) Gemini/Imagen responses
+Responses are content-addressed by prompt, model and generation parameters and
+kept as lossless PNGs, so sizes and downscaling can be re-derived offline.
+The store is bounded in bytes and evicts least recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+RESPONSE_CACHE_DIR = Path(".cache") / "gemini"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def response_key(prompt: str, model_name: str, params: dict) -> str:
+    """Content address of one generation request"""
+    payload = json.dumps({"prompt": prompt, "model": model_name, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseStore:
+    """Size-bounded LRU store of raw response images"""
+
+    def __init__(self, root=RESPONSE_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.index_path = self.root / "index.json"
+        self.lock = threading.Lock()
+        self.index = {}
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                print(f"Warning: could not read {self.index_path}, starting an empty response store")
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.png"
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry["bytes"] for entry in self.index.values())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index and self.path_for(key).exists()
+
+    def get(self, key: str):
+        """Return the stored PIL image for a key, or None"""
+        from PIL import Image
+
+        with self.lock:
+            if key not in self.index:
+                return None
+            path = self.path_for(key)
+            if not path.exists():
+                del self.index[key]
+                return None
+            self.index[key]["last_access"] = time.time()
+
+        with Image.open(path) as img:
+            img.load()
+            return img
+
+    def put(self, key: str, image, **meta):
+        """Store a raw response image under a key and evict if over budget"""
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        image.save(tmp_path, "PNG")
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            self.index[key] = dict(meta, bytes=path.stat().st_size, last_access=time.time())
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        total = self.total_bytes
+        for key in sorted(self.index, key=lambda k: self.index[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= self.index[key]["bytes"]
+            self.path_for(key).unlink(missing_ok=True)
+            del self.index[key]
+
+    def _save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def flush(self):
+        """Persist access times recorded by get()"""
+        with self.lock:
+            self._save_index()
+
+
+class CachingClient:
+    """Wraps a GeminiClient so every raw response is read from / written to a ResponseStore
+
+    With client=None the wrapper is offline: misses raise LookupError instead of calling the API.
+    """
+
+    def __init__(self, client, store: ResponseStore, model_name: str = None):
+        from gemini_client import DEFAULT_MODEL, GENERATION_PARAMS
+
+        self.client = client
+        self.store = store
+        self.model_name = model_name or getattr(client, "model_name", DEFAULT_MODEL)
+        self.params = GENERATION_PARAMS
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, prompt: str) -> str:
+        return response_key(prompt, self.model_name, self.params)
+
+    def lookup(self, prompt: str):
+        """Return the stored raw image for a prompt, or None, without touching the API"""
+        image = self.store.get(self.key(prompt))
+        if image is not None:
+            self.hits += 1
+        return image
+
+    def generate(self, prompt: str):
+        image = self.lookup(prompt)
+        if image is not None:
+            return image
+
+        self.misses += 1
+        if self.client is None:
+            raise LookupError("Not in the response cache (offline)")
+        image = self.client.generate(prompt)
+        self.store.put(self.key(prompt), image, prompt=prompt, model=self.model_name)
+        return image
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Uniform-grid spatial hash for enemy proximity queries, with a brute-force benchmark
+Reference implementation for the Godot port: plain dicts and sets, no NumPy, so
+every operation maps onto a GDScript Dictionary keyed by Vector2i cells.
+
+Entities live in square cells of `cell_size` pixels. move() only touches the grid
+when an entity crosses a cell border, and queries visit only the cells overlapping
+the search area, so their cost scales with the number of nearby enemies, not the
+total. The queries are:
+
+  query_radius   everything within a weapon's range (aura, orbit, item slows)
+  nearest        k closest, optionally capped at a range (projectile targeting)
+  chain          greedy hops to the closest not-yet-hit enemy (weapon_chain.gd)
+
+The benchmark replays one frame of the game at 100, 1,000 and 10,000 enemies:
+move every enemy, then run each WEAPONS range as a radius query and the targeting
+and chain queries from the player. It compares the timings against the brute-force
+scans the Godot scripts use today and checks that both return the same answers.
+
+    python spatial_hash.py                     # 100 / 1,000 / 10,000 enemies
+    python spatial_hash.py --counts 500 2000 --cell-size 96
+"""
+
+import heapq
+import json
+import math
+import random
+import time
+from pathlib import Path
+
+DEFAULT_CELL_SIZE = 128
+FRAME_BUDGET_MS = 1000 / 60
+DEFAULT_COUNTS = (100, 1000, 10000)
+SPAWN_AREA = 2400          # enemies spread over a square this wide around the player
+CHAIN_RANGE = 150          # weapon_chain.gd chain_range
+CHAIN_HOPS = 8             # weapon_chain.gd CHAINS_PER_LEVEL at max level
+
+
+class SpatialHash:
+    """Points keyed by id in a uniform grid of square cells"""
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = float(cell_size)
+        self.cells = {}       # (cx, cy) -> set of ids
+        self.positions = {}   # id -> (x, y)
+        self.cell_of = {}     # id -> (cx, cy)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def _cell(self, x: float, y: float) -> tuple:
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, key, x: float, y: float):
+        if key in self.positions:
+            raise KeyError(f"{key!r} is already in the spatial hash")
+        cell = self._cell(x, y)
+        self.cells.setdefault(cell, set()).add(key)
+        self.positions[key] = (x, y)
+        self.cell_of[key] = cell
+
+    def move(self, key, x: float, y: float):
+        """Update a position; the grid only changes when the entity changes cell"""
+        self.positions[key] = (x, y)
+        cell = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+        old = self.cell_of[key]
+        if cell != old:
+            self._discard(old, key)
+            self.cells.setdefault(cell, set()).add(key)
+            self.cell_of[key] = cell
+
+    def remove(self, key):
+        self._discard(self.cell_of.pop(key), key)
+        del self.positions[key]
+
+    def _discard(self, cell, key):
+        members = self.cells[cell]
+        members.discard(key)
+        if not members:
+            del self.cells[cell]
+
+    def _cells_in_box(self, x0: float, y0: float, x1: float, y1: float):
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            yield from self.cells.values()  # huge query: walking occupied cells is cheaper
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                members = self.cells.get((cx, cy))
+                if members:
+                    yield members
+
+    def query_radius(self, x: float, y: float, radius: float) -> list:
+        """Ids within `radius` of (x, y)"""
+        r2 = radius * radius
+        positions = self.positions
+        found = []
+        for members in self._cells_in_box(x - radius, y - radius, x + radius, y + radius):
+            for key in members:
+                px, py = positions[key]
+                if (px - x) ** 2 + (py - y) ** 2 <= r2:
+                    found.append(key)
+        return found
+
+    def nearest(self, x: float, y: float, k: int = 1, max_radius: float = math.inf, exclude=()) -> list:
+        """[(distance, id)] of the k closest ids within max_radius, closest first
+
+        Searches square rings of cells outward from (x, y) and stops once the next
+        ring cannot hold anything closer than the current k-th candidate.
+        """
+        if not self.positions or k <= 0:
+            return []
+        positions, size = self.positions, self.cell_size
+        cx, cy = self._cell(x, y)
+        heap = []  # max-heap of the k best as (-distance², id)
+        max_r2 = max_radius * max_radius
+        last_ring = math.ceil(max_radius / size) if max_radius != math.inf else math.inf
+        ring, seen = 0, 0
+        while ring <= last_ring and seen < len(positions):
+            for cell in self._ring(cx, cy, ring):
+                members = self.cells.get(cell)
+                if not members:
+                    continue
+                seen += len(members)
+                for key in members:
+                    if key in exclude:
+                        continue
+                    px, py = positions[key]
+                    d2 = (px - x) ** 2 + (py - y) ** 2
+                    if d2 > max_r2:
+                        continue
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d2, key))
+                    elif d2 < -heap[0][0]:
+                        heapq.heapreplace(heap, (-d2, key))
+            # Anything in ring + 1 is at least `ring` whole cells away from (x, y)
+            if len(heap) == k and (ring * size) ** 2 >= -heap[0][0]:
+                break
+            ring += 1
+        return [(math.sqrt(-d2), key) for d2, key in sorted(heap, reverse=True)]
+
+    @staticmethod
+    def _ring(cx: int, cy: int, ring: int):
+        if ring == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-ring, ring + 1):
+            yield (cx + dx, cy - ring)
+            yield (cx + dx, cy + ring)
+        for dy in range(-ring + 1, ring):
+            yield (cx - ring, cy + dy)
+            yield (cx + ring, cy + dy)
+
+    def chain(self, x: float, y: float, first_range: float, hops: int = CHAIN_HOPS,
+              chain_range: float = CHAIN_RANGE) -> list:
+        """Chain targets: the closest enemy within first_range, then up to `hops` jumps,
+        each to the closest enemy not yet hit within chain_range of the last one"""
+        first = self.nearest(x, y, 1, first_range)
+        if not first:
+            return []
+        hit = [first[0][1]]
+        seen = {hit[0]}
+        for _ in range(hops):
+            px, py = self.positions[hit[-1]]
+            step = self.nearest(px, py, 1, chain_range, exclude=seen)
+            if not step:
+                break
+            hit.append(step[0][1])
+            seen.add(step[0][1])
+        return hit
+
+
+class BruteForce:
+    """The same interface as SpatialHash, scanning every entity (today's Godot scripts)"""
+
+    def __init__(self):
+        self.positions = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def insert(self, key, x: float, y: float):
+        self.positions[key] = (x, y)
+
+    def move(self, key, x: float, y: float):
+        self.positions[key] = (x, y)
+
+    def remove(self, key):
+        del self.positions[key]
+
+    def query_radius(self, x: float, y: float, radius: float) -> list:
+        r2 = radius * radius
+        return [key for key, (px, py) in self.positions.items() if (px - x) ** 2 + (py - y) ** 2 <= r2]
+
+    def nearest(self, x: float, y: float, k: int = 1, max_radius: float = math.inf, exclude=()) -> list:
+        r2 = max_radius * max_radius
+        candidates = ((((px - x) ** 2 + (py - y) ** 2), key) for key, (px, py) in self.positions.items()
+                      if key not in exclude)
+        return [(math.sqrt(d2), key) for d2, key in heapq.nsmallest(k, (c for c in candidates if c[0] <= r2))]
+
+    chain = SpatialHash.chain
+
+
+def weapon_ranges(game_data_path="game_data.json") -> dict:
+    """{weapon id: range in pixels} from WEAPONS"""
+    with open(game_data_path, encoding="utf-8") as f:
+        return {key: weapon["range"] for key, weapon in json.load(f)["WEAPONS"].items()}
+
+
+def _frame(index, ranges: dict, moves: list, player=(0.0, 0.0)) -> dict:
+    """One frame of work: move every enemy, then each weapon's queries. Returns per-step ms"""
+    timings = {}
+    start = time.perf_counter()
+    for key, x, y in moves:
+        index.move(key, x, y)
+    timings["move"] = time.perf_counter() - start
+
+    results = {}
+    start = time.perf_counter()
+    for weapon, reach in ranges.items():
+        results[weapon] = sorted(index.query_radius(*player, reach))
+    timings["radius"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results["nearest"] = [d for d, _ in index.nearest(*player, 1, max(ranges.values()))]
+    results["nearest8"] = [d for d, _ in index.nearest(*player, 8)]
+    timings["nearest"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results["chain"] = index.chain(*player, ranges.get("lightning", max(ranges.values())))
+    timings["chain"] = time.perf_counter() - start
+    return {"ms": {step: seconds * 1000 for step, seconds in timings.items()}, "results": results}
+
+
+def benchmark(counts=DEFAULT_COUNTS, cell_size: float = DEFAULT_CELL_SIZE, frames: int = 20,
+              game_data_path="game_data.json", seed: int = 0) -> list:
+    """Frame timings for SpatialHash vs BruteForce at each enemy count"""
+    ranges = weapon_ranges(game_data_path)
+    rng = random.Random(seed)
+    half = SPAWN_AREA / 2
+    report = []
+    for count in counts:
+        spots = [(rng.uniform(-half, half), rng.uniform(-half, half)) for _ in range(count)]
+        velocity = [(rng.uniform(-1, 1) * 2, rng.uniform(-1, 1) * 2) for _ in range(count)]
+        grid, brute = SpatialHash(cell_size), BruteForce()
+        for key, (x, y) in enumerate(spots):
+            grid.insert(key, x, y)
+            brute.insert(key, x, y)
+
+        totals = {"grid": {}, "brute": {}}
+        for _ in range(frames):
+            spots = [(x + vx, y + vy) for (x, y), (vx, vy) in zip(spots, velocity)]
+            moves = [(key, x, y) for key, (x, y) in enumerate(spots)]
+            grid_frame = _frame(grid, ranges, moves)
+            brute_frame = _frame(brute, ranges, moves)
+            for weapon in ranges:
+                if grid_frame["results"][weapon] != brute_frame["results"][weapon]:
+                    raise AssertionError(f"{weapon} radius query differs from brute force at {count} enemies")
+            if grid_frame["results"]["chain"] != brute_frame["results"]["chain"]:
+                raise AssertionError(f"chain query differs from brute force at {count} enemies")
+            for query in ("nearest", "nearest8"):
+                if any(abs(a - b) > 1e-9 for a, b in zip(grid_frame["results"][query], brute_frame["results"][query])):
+                    raise AssertionError(f"{query} differs from brute force at {count} enemies")
+            for name, frame in (("grid", grid_frame), ("brute", brute_frame)):
+                for step, ms in frame["ms"].items():
+                    totals[name][step] = totals[name].get(step, 0) + ms / frames
+
+        entry = {"enemies": count, "cell_size": cell_size, "frames": frames,
+                 "grid_ms": totals["grid"], "brute_ms": totals["brute"],
+                 "grid_frame_ms": sum(totals["grid"].values()),
+                 "brute_frame_ms": sum(totals["brute"].values())}
+        report.append(entry)
+        print(f"  {count:>6} enemies: grid {entry['grid_frame_ms']:8.2f} ms/frame, "
+              f"brute force {entry['brute_frame_ms']:8.2f} ms/frame "
+              f"({entry['brute_frame_ms'] / max(entry['grid_frame_ms'], 1e-9):.1f}x)")
+        for step in totals["grid"]:
+            print(f"         {step:<8} {totals['grid'][step]:8.3f} ms vs {totals['brute'][step]:8.3f} ms")
+    return report
+
+
+def max_enemies(report: list, key: str, budget_ms: float = FRAME_BUDGET_MS) -> int:
+    """Largest enemy count whose proximity work fits the budget, interpolated linearly"""
+    best = 0
+    for entry in sorted(report, key=lambda e: e["enemies"]):
+        per_enemy = entry[key] / entry["enemies"]
+        if entry[key] <= budget_ms:
+            best = max(best, entry["enemies"])
+        else:
+            best = max(best, int(budget_ms / per_enemy))
+            break
+    else:
+        entry = max(report, key=lambda e: e["enemies"])
+        best = max(best, int(budget_ms / (entry[key] / entry["enemies"])))
+    return best
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the spatial hash against brute-force enemy scans")
+    parser.add_argument("--counts", type=int, nargs="+", default=list(DEFAULT_COUNTS), help="enemy counts")
+    parser.add_argument("--cell-size", type=float, default=DEFAULT_CELL_SIZE)
+    parser.add_argument("--frames", type=int, default=20, help="frames averaged per count")
+    parser.add_argument("--budget-ms", type=float, default=FRAME_BUDGET_MS,
+                        help="frame time allowed for proximity work")
+    parser.add_argument("--game-data", default="game_data.json")
+    parser.add_argument("--out", help="write the report as JSON")
+    args = parser.parse_args()
+
+    print("\n--- Benchmarking Spatial Hash ---\n")
+    report = benchmark(args.counts, args.cell_size, args.frames, args.game_data)
+    grid_max = max_enemies(report, "grid_frame_ms", args.budget_ms)
+    brute_max = max_enemies(report, "brute_frame_ms", args.budget_ms)
+    print(f"\n  Enemies within a {args.budget_ms:.1f} ms budget: grid ~{grid_max:,}, brute force ~{brute_max:,}")
+    if args.out:
+        Path(args.out).write_text(json.dumps({"budget_ms": args.budget_ms, "grid_max_enemies": grid_max,
+                                              "brute_max_enemies": brute_max, "counts": report}, indent=1))
+        print(f"  Report saved to: {args.out}")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Batched noise/texture engine for the asset generator
+Builds whole RGBA buffers as NumPy arrays in one pass instead of per-pixel putpixel calls
+"""
+
+import random
+import time
+
+import numpy as np
+
+
+def noise_batch(count: int, size: tuple, base_color: tuple, amplitude: int, seed=None) -> np.ndarray:
+    """Return a (count, height, width, 4) uint8 RGBA buffer of base_color plus per-pixel grey noise"""
+    width, height = size
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+    # One noise value per pixel, shared by R/G/B like the original putpixel loop
+    noise = rng.integers(-amplitude, amplitude + 1, size=(count, height, width, 1), dtype=np.int16)
+    rgb = np.clip(np.asarray(base_color[:3], dtype=np.int16) + noise, 0, 255)
+
+    buf = np.empty((count, height, width, 4), dtype=np.uint8)
+    buf[..., :3] = rgb
+    buf[..., 3] = 255
+    return buf
+
+
+def noise_buffer(size: tuple, base_color: tuple, amplitude: int, seed=None) -> np.ndarray:
+    """Return a single (height, width, 4) noise tile"""
+    return noise_batch(1, size, base_color, amplitude, seed)[0]
+
+
+def scatter_pebbles(buf: np.ndarray, count: int, seed=None, radius: int = 2, margin: int = 4,
+                    base_grey: int = 90, jitter: int = 20) -> np.ndarray:
+    """Stamp `count` small grey discs into an RGBA buffer in place"""
+    height, width = buf.shape[:2]
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+    centers_x = rng.integers(margin, width - margin + 1, size=count)
+    centers_y = rng.integers(margin, height - margin + 1, size=count)
+    colors = np.clip(base_grey + rng.integers(-jitter, jitter + 1, size=(count, 3)), 0, 255)
+
+    # Disc offsets, shared by every pebble
+    dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    inside = dx * dx + dy * dy <= radius * radius
+    dx, dy = dx[inside], dy[inside]
+
+    px = (centers_x[:, None] + dx[None, :]).ravel()
+    py = (centers_y[:, None] + dy[None, :]).ravel()
+    pixel_colors = np.repeat(colors, dx.size, axis=0)
+
+    valid = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    buf[py[valid], px[valid], :3] = pixel_colors[valid]
+    buf[py[valid], px[valid], 3] = 255
+    return buf
+
+
+def to_image(buf: np.ndarray):
+    """Wrap a contiguous (height, width, 4) uint8 buffer as a PIL image without copying"""
+    from PIL import Image
+
+    buf = np.ascontiguousarray(buf, dtype=np.uint8)
+    height, width = buf.shape[:2]
+    return Image.frombuffer("RGBA", (width, height), buf, "raw", "RGBA", 0, 1)
+
+
+def sand_texture(size: tuple, base_color: tuple = (210, 180, 140), amplitude: int = 15,
+                 pebbles: int = 0, seed=None):
+    """Create a sand texture image, optionally scattered with pebbles"""
+    rng = np.random.default_rng(seed)
+    buf = noise_buffer(size, base_color, amplitude, rng)
+    if pebbles:
+        scatter_pebbles(buf, pebbles, rng)
+    return to_image(buf)
+
+
+def _putpixel_tile(size: tuple, base_color: tuple, amplitude: int):
+    """The original per-pixel path, kept only as the benchmark reference"""
+    from PIL import Image
+
+    width, height = size
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 255))
+    for y in range(height):
+        for x in range(width):
+            noise = random.randint(-amplitude, amplitude)
+            r = min(255, max(0, base_color[0] + noise))
+            g = min(255, max(0, base_color[1] + noise))
+            b = min(255, max(0, base_color[2] + noise))
+            img.putpixel((x, y), (r, g, b, 255))
+    return img
+
+
+def benchmark(sizes=(64, 256, 1024), repeats: int = 3):
+    """Compare pixels/second of the putpixel path against the batched engine"""
+    print("=" * 60)
+    print("  Noise Engine Benchmark")
+    print("=" * 60)
+    print(f"  {'size':>10} {'putpixel px/s':>16} {'numpy px/s':>16} {'speedup':>9}")
+
+    results = []
+    for edge in sizes:
+        size = (edge, edge)
+        pixels = edge * edge
+
+        start = time.perf_counter()
+        _putpixel_tile(size, (210, 180, 140), 15)
+        legacy = pixels / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i in range(repeats):
+            sand_texture(size, seed=i)
+        vectorized = pixels * repeats / (time.perf_counter() - start)
+
+        results.append({"size": edge, "putpixel_px_s": legacy, "numpy_px_s": vectorized})
+        print(f"  {f'{edge}x{edge}':>10} {legacy:>16,.0f} {vectorized:>16,.0f} {vectorized / legacy:>8.1f}x")
+
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Watch mode for the asset generator: rebuild only what changed
+Tracks the generator's inputs (generate_assets.py / ASSET_PROMPTS, sprite_dsl.py,
+texture_noise.py, game_data.json, index.html and everything under assets/, including
+.aseprite sources and the tile sheets). Bursts of changes are debounced, then only the
+affected outputs are rebuilt: sprites whose spec or prompt fingerprint changed, the
+.aseprite files that were saved, the preload plan, and the manifest entries.
+
+Change detection is a stat snapshot diff; on Linux inotify (through libc, no extra
+packages) wakes the loop up, elsewhere it polls.
+"""
+
+import ctypes
+import ctypes.util
+import importlib
+import inspect
+import json
+import os
+import select
+import sys
+import time
+from pathlib import Path
+
+WATCHED_FILES = ("generate_assets.py", "sprite_dsl.py", "texture_noise.py", "game_data.json", "index.html")
+WATCHED_ROOT = Path("assets")
+CODE_FILES = {"generate_assets.py", "sprite_dsl.py", "texture_noise.py"}
+SOURCE_SUFFIXES = (".aseprite", ".ase")
+
+# Outputs the build itself writes; changes here never trigger a rebuild
+IGNORED_PREFIXES = ("assets/sheets/", "assets/atlas/", "assets/palettes/", "assets/tilesets/")
+IGNORED_SUFFIXES = (".subset.woff2", ".subset.woff")
+IGNORED_FILES = {"manifest.json", "preload_plan.json", "png_report.json", "dedupe_report.json", "subset.json",
+                 ".DS_Store"}
+# sprite_dsl functions that turn a spec into pixels; SPRITE_SPECS itself is fingerprinted per sprite
+RENDER_FUNCTIONS = ("_resolve", "compile_sprite", "rasterize", "render_sprite")
+
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_INTERVAL = 0.5
+MAX_BATCH_SECONDS = 5.0
+
+
+def _ignored(path: str) -> bool:
+    return (path.startswith(IGNORED_PREFIXES) or path.endswith(IGNORED_SUFFIXES)
+            or path.rsplit("/", 1)[-1] in IGNORED_FILES)
+
+
+def snapshot(files=WATCHED_FILES, root=WATCHED_ROOT) -> dict:
+    """{path: (mtime_ns, size)} for every watched file"""
+    state = {}
+    for name in files:
+        try:
+            st = os.stat(name)
+            state[name] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            pass
+
+    stack = [str(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                path = entry.path.replace(os.sep, "/")
+                if _ignored(path + ("/" if entry.is_dir(follow_symlinks=False) else "")):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat()
+                    state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+def diff(before: dict, after: dict) -> set:
+    """Paths added, removed or modified between two snapshots"""
+    return {p for p in before.keys() | after.keys() if before.get(p) != after.get(p)}
+
+
+class PollingWatcher:
+    """Wakes up every `interval` seconds; the snapshot diff finds the actual changes"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+
+    def refresh(self, directories):
+        pass
+
+    def wait(self, timeout: float) -> bool:
+        time.sleep(min(timeout, self.interval))
+        return True
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Blocks until the kernel reports activity in a watched directory (Linux only)"""
+
+    IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x002, 0x004, 0x008
+    IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x040, 0x080, 0x100, 0x200
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watched = set()
+
+    def refresh(self, directories):
+        """Watch any directory not watched yet (new directories appear between builds)"""
+        for directory in directories:
+            if directory in self.watched:
+                continue
+            if self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK) >= 0:
+                self.watched.add(directory)
+
+    def wait(self, timeout: float) -> bool:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        # Drain the queue; the events only say "look again", the snapshot says what changed
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(polling: bool = False, interval: float = DEFAULT_INTERVAL):
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError) as e:
+            print(f"  inotify unavailable ({e}), polling every {interval:g}s")
+    return PollingWatcher(interval)
+
+
+def watched_directories(state: dict) -> set:
+    dirs = {"."}
+    for path in state:
+        parent = path.rsplit("/", 1)[0] if "/" in path else "."
+        while parent not in dirs:
+            dirs.add(parent)
+            if "/" not in parent:
+                break
+            parent = parent.rsplit("/", 1)[0]
+    dirs.add(str(WATCHED_ROOT))
+    return dirs
+
+
+def _fingerprint(*parts) -> str:
+    from build_cache import hash_bytes
+
+    return hash_bytes(json.dumps(parts, sort_keys=True, default=str).encode("utf-8"))
+
+
+class Rebuilder:
+    """Works out which outputs a set of changed paths affects and rebuilds just those"""
+
+    def __init__(self, mode: str = "sprites", api_key: str = None, game_data_path: str = "game_data.json",
+                 atlas: bool = False, tracer=None):
+        from build_trace import Tracer
+
+        self.mode = mode
+        self.api_key = api_key
+        self.game_data_path = game_data_path
+        self.atlas = atlas
+        self.tracer = tracer or Tracer()
+        self.ga = None
+        self.fingerprints = self._fingerprints(reload=False)
+
+    def _fingerprints(self, reload: bool = True) -> dict:
+        """{category/name: fingerprint} of every output the current mode builds"""
+        import sprite_dsl
+        import texture_noise
+        import generate_assets
+
+        if reload:
+            for module in (texture_noise, sprite_dsl, generate_assets):
+                importlib.reload(module)
+        self.ga = generate_assets
+
+        if self.mode == "generate":
+            code = generate_assets.fallback_fingerprint()
+            return {f"{category}/{name}": _fingerprint(info, code)
+                    for category, assets in generate_assets.ASSET_PROMPTS.items()
+                    for name, info in assets.items()}
+
+        # Only the rendering code, so editing one spec rebuilds only that sprite
+        renderer = "".join(inspect.getsource(getattr(sprite_dsl, name)) for name in RENDER_FUNCTIONS)
+        specs = {
+            "characters": sprite_dsl.SPRITE_SPECS["characters"],
+            "enemies": generate_assets.enemy_sprite_specs(self.game_data_path),
+            "pickups": sprite_dsl.SPRITE_SPECS["pickups"],
+        }
+        prints = {f"{category}/{name}": _fingerprint(spec, renderer)
+                  for category, group in specs.items() for name, spec in group.items()}
+        prints["backgrounds/sand_tile"] = _fingerprint(
+            inspect.getsource(texture_noise), inspect.getsource(generate_assets.create_background_tile))
+        return prints
+
+    def plan(self, changed: set) -> dict:
+        """Which rebuild steps a batch of changed paths calls for"""
+        plan = {"targets": {}, "sheets": [], "preload": False, "manifest": False, "atlas": False}
+
+        if changed & (CODE_FILES | {self.game_data_path}):
+            try:
+                fingerprints = self._fingerprints()
+            except Exception as e:
+                # A half-saved edit; keep the last good state and wait for the next save
+                print(f"  ✗ Could not load the generator: {type(e).__name__}: {e}")
+                fingerprints = self.fingerprints
+            for target, value in fingerprints.items():
+                if self.fingerprints.get(target) != value:
+                    category, name = target.split("/", 1)
+                    plan["targets"].setdefault(category, []).append(name)
+            self.fingerprints = fingerprints
+
+        plan["sheets"] = sorted(p for p in changed if p.lower().endswith(SOURCE_SUFFIXES) and Path(p).exists())
+        plan["preload"] = bool(changed & {self.game_data_path, "index.html"})
+        plan["manifest"] = any(p.startswith(f"{WATCHED_ROOT}/") for p in changed) or bool(plan["targets"])
+        if self.atlas:
+            from atlas_packer import DEFAULT_SOURCES
+
+            roots = tuple(f"{Path(s).as_posix()}/" for s in DEFAULT_SOURCES)
+            plan["atlas"] = bool(plan["targets"]) or any(p.startswith(roots) and p.endswith(".png") for p in changed)
+        return plan
+
+    def run(self, plan: dict) -> list:
+        """Execute a plan; returns a short description of each thing rebuilt"""
+        done = []
+        wrote_manifest = False
+
+        if plan["targets"]:
+            with self.tracer.span("watch_targets", targets=plan["targets"]):
+                if self.mode == "generate":
+                    prompts = {category: {name: self.ga.ASSET_PROMPTS[category][name] for name in names}
+                               for category, names in plan["targets"].items()}
+                    self.ga.generate_all_assets(self.api_key, prompts=prompts, tracer=self.tracer)
+                else:
+                    self.ga.build_sprites(plan["targets"], self.game_data_path, self.tracer)
+            wrote_manifest = True
+            done += [f"{c}/{n}" for c, names in plan["targets"].items() for n in names]
+
+        if plan["sheets"]:
+            from aseprite_reader import SHEETS_DIR, export_sheet
+        for path in plan["sheets"]:
+            with self.tracer.span("watch_sheet", source=path) as span:
+                try:
+                    export_sheet(path, SHEETS_DIR, WATCHED_ROOT)
+                    done.append(f"sheet {Path(path).name}")
+                except Exception as e:
+                    span["error"] = f"{type(e).__name__}: {e}"
+                    print(f"  ✗ {path}: {e}")
+
+        if plan["atlas"]:
+            from atlas_packer import DEFAULT_SOURCES, build_atlases
+
+            with self.tracer.span("watch_atlas"):
+                build_atlases(DEFAULT_SOURCES)
+            done.append("atlases")
+
+        if plan["preload"]:
+            from preload_plan import write_plan
+
+            with self.tracer.span("watch_preload"):
+                write_plan(game_data_path=self.game_data_path)
+            done.append("preload plan")
+
+        if (plan["manifest"] or done) and not wrote_manifest:
+            from asset_manifest import write_manifest
+
+            with self.tracer.span("watch_manifest"):
+                write_manifest()
+            done.append("manifest")
+        return done
+
+
+def watch(mode: str = "sprites", api_key: str = None, debounce: float = DEFAULT_DEBOUNCE,
+          interval: float = DEFAULT_INTERVAL, polling: bool = False, atlas: bool = False,
+          game_data_path: str = "game_data.json", quiet: bool = True, trace_path=None, max_cycles: int = None):
+    """Watch the generator inputs and rebuild affected outputs until interrupted"""
+    import contextlib
+    import io
+
+    from build_trace import TRACE_PATH, Tracer
+
+    tracer = Tracer(trace_path or TRACE_PATH)
+    rebuilder = Rebuilder(mode, api_key, game_data_path, atlas, tracer)
+    watcher = make_watcher(polling, interval)
+
+    start = time.perf_counter()
+    state = snapshot()
+    watcher.refresh(watched_directories(state))
+    kind = type(watcher).__name__.replace("Watcher", "").lower()
+    print(f"  Watching {len(state)} files ({kind}, {(time.perf_counter() - start) * 1000:.0f} ms to scan), "
+          f"mode={mode}. Ctrl+C to stop.")
+
+    cycles = 0
+    try:
+        while max_cycles is None or cycles < max_cycles:
+            watcher.wait(interval)
+            current = snapshot()
+            if current == state:
+                continue
+            # Debounce: wait until two snapshots `debounce` apart agree (bounded for endless writers)
+            deadline = time.monotonic() + MAX_BATCH_SECONDS
+            while time.monotonic() < deadline:
+                watcher.wait(debounce)
+                settled = snapshot()
+                if settled == current:
+                    break
+                current = settled
+
+            changed = diff(state, current)
+            cycles += 1
+            build_start = time.perf_counter()
+            plan = rebuilder.plan(changed)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+                done = rebuilder.run(plan)
+            errors = [line.strip() for line in output.getvalue().splitlines() if "✗" in line]
+
+            stamp = time.strftime("%H:%M:%S")
+            print(f"  [{stamp}] {len(changed)} changed -> {', '.join(done) or 'nothing to rebuild'} "
+                  f"({time.perf_counter() - build_start:.2f}s)")
+            for line in errors:
+                print(f"  {line}")
+
+            # Absorb the build's own writes so they do not trigger another round
+            state = snapshot()
+            watcher.refresh(watched_directories(state))
+    except KeyboardInterrupt:
+        print("\n  Stopped watching")
+    finally:
+        watcher.close()
+        tracer.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild assets whenever their inputs change")
+    parser.add_argument("--mode", choices=("sprites", "generate"), default=None,
+                        help="sprites (pixel art, default) or generate (ASSET_PROMPTS via Gemini/fallback)")
+    parser.add_argument("--api-key", help="Gemini key for --mode generate (default: fallback renderer)")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, help="quiet period before a rebuild")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="polling interval")
+    parser.add_argument("--poll", action="store_true", help="poll even where inotify is available")
+    parser.add_argument("--atlas", action="store_true", help="also repack texture atlases when sprites change")
+    parser.add_argument("--game-data", default="game_data.json")
+    parser.add_argument("--verbose", action="store_true", help="show the build output")
+    args = parser.parse_args()
+
+    watch(args.mode or ("generate" if args.api_key else "sprites"), args.api_key, args.debounce,
+          args.interval, args.poll, args.atlas, args.game_data, not args.verbose)